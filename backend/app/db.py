@@ -1,34 +1,119 @@
+"""
+Engine DB dibikin lazy (waktu query pertama), bukan waktu import: cold start
+serverless yang nggak nyentuh DB (mis. /api/health) nggak bayar create_engine
++ nulis CA cert ke /tmp. `from app.db import engine` tetap jalan (lewat
+__getattr__ modul), tapi kode baru mending pakai get_engine()/get_async_engine().
+Setelan pool (profil serverless/server) ada di services/pool.py.
+"""
+
 import os
+import ssl
+import threading
+from typing import Optional
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 
 import pymysql
 pymysql.install_as_MySQLdb()
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise RuntimeError("DATABASE_URL belum diset di Vercel env.")
+from app.services import metrics, pool
+
+_lock = threading.Lock()
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_connect_args: Optional[tuple[dict, dict]] = None
+
+def database_url() -> str:
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        raise RuntimeError("DATABASE_URL belum diset di Vercel env.")
+
+    # pastiin driver bener
+    if url.startswith("mysql://"):
+        url = "mysql+pymysql://" + url[len("mysql://"):]
+    return url
+
+def async_database_url() -> str:
+    # driver async buat jalur chat/public (aiomysql)
+    return os.getenv("ASYNC_DATABASE_URL") or database_url().replace(
+        "mysql+pymysql://", "mysql+aiomysql://", 1
+    )
+
+def connect_args() -> tuple[dict, dict]:
+    """
+    (connect_args sync, connect_args async). CA cert dari env (yang 1 baris) --
+    cuma wajib buat MySQL (Aiven); URL lain (mis. sqlite buat bench/) tanpa TLS.
+    Cert ditulis ke /tmp sekali aja, dipakai bareng engine sync & async.
+    """
+    global _connect_args
+    if _connect_args is not None:
+        return _connect_args
 
-# pastiin driver bener
-if DATABASE_URL.startswith("mysql://"):
-    DATABASE_URL = "mysql+pymysql://" + DATABASE_URL[len("mysql://"):]
+    if not database_url().startswith("mysql"):
+        _connect_args = ({}, {})
+        return _connect_args
 
-# CA cert dari env (yang 1 baris)
-ca_pem = os.getenv("AIVEN_CA_CERT", "").replace("\\n", "\n").strip()
-if not ca_pem:
-    raise RuntimeError("AIVEN_CA_CERT belum diset di Vercel env.")
+    ca_pem = os.getenv("AIVEN_CA_CERT", "").replace("\\n", "\n").strip()
+    if not ca_pem:
+        raise RuntimeError("AIVEN_CA_CERT belum diset di Vercel env.")
 
-ca_path = "/tmp/aiven-ca.pem"
-with open(ca_path, "w") as f:
-    f.write(ca_pem)
+    ca_path = "/tmp/aiven-ca.pem"
+    with open(ca_path, "w") as f:
+        f.write(ca_pem)
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    connect_args={"ssl": {"ca": ca_path}},
-)
+    # aiomysql maunya SSLContext, bukan dict kayak pymysql
+    _connect_args = ({"ssl": {"ca": ca_path}}, {"ssl": ssl.create_default_context(cafile=ca_path)})
+    return _connect_args
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                eng = create_engine(
+                    database_url(),
+                    connect_args=connect_args()[0],
+                    **pool.engine_kwargs("sync"),
+                )
+                metrics.instrument_engine(eng)
+                pool.install(eng, "sync")
+                _engine = eng
+    return _engine
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        with _lock:
+            if _async_engine is None:
+                eng = create_async_engine(
+                    async_database_url(),
+                    connect_args=connect_args()[1],
+                    **pool.engine_kwargs("async"),
+                )
+                metrics.instrument_engine(eng.sync_engine)
+                pool.install(eng.sync_engine, "async")
+                _async_engine = eng
+    return _async_engine
+
+def __getattr__(name: str):
+    # kompatibilitas: app.db.engine / app.db.async_engine
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+_async_session_factory = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+def SessionLocal() -> Session:
+    return _session_factory(bind=get_engine())
+
+def AsyncSessionLocal() -> AsyncSession:
+    return _async_session_factory(bind=get_async_engine())
 
 def get_db():
     db = SessionLocal()
@@ -36,3 +121,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
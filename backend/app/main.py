@@ -1,25 +1,42 @@
 import os
 import json
-from datetime import datetime
-from typing import Optional, Any, Literal
+import base64
+import binascii
+import time
+from typing import Optional, Any, Literal, get_args
 
 from dotenv import load_dotenv
-from sqlalchemy import text
-from fastapi import FastAPI, Depends, HTTPException, Header, Query
+from sqlalchemy import text, bindparam
+from fastapi import FastAPI, Depends, HTTPException, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, ValidationError
 from sqlalchemy.orm import Session
-
-from app.db import get_db
-from app.services.guardrail import classify
-from app.services.answer import fetch_context
-from app.services.gemini import generate_answer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_db, get_async_db, AsyncSessionLocal, SessionLocal
+from app.services.pipeline import run_chat, stream_chat
+from app.services.router import router_stats
+from app.services.snapshot import snapshot_stats
+from app.services.retrieval import retrieval_stats
+from app.services.templates import template_stats
+from app.services.budget import usage_stats
+from app.services.singleflight import singleflight_stats
+from app.services.llm import llm_stats
+from app.services.sessions import session_stats
+from app.services.pool import pool_stats
+from app.services.tenants import Tenant, current_tenant, resolve_kost_id
+from app.services import metrics, versions
+from app.services.rooms import attach_facilities
+from app.services.serialize import dumps, dumps_str, ORJSONResponse
+from app.services import bulk, public_cache
 
 load_dotenv()
 if not os.getenv("VERCEL"):
     load_dotenv()
 
-app = FastAPI(title="Binara Kost API")
+app = FastAPI(title="Binara Kost API", default_response_class=ORJSONResponse)
 
 # =========================
 # CORS (Next.js local)
@@ -33,13 +50,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 # =========================
-# Helpers
+# Timing (metrics + Server-Timing)
 # =========================
-def json_safe(v: Any) -> Any:
-    if isinstance(v, datetime):
-        return v.isoformat()
-    return v
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") in ("1", "true", "True")
+
+@app.middleware("http")
+async def request_timing(request: Request, call_next):
+    timings = metrics.start_request_timing()
+    t0 = time.perf_counter()
+    response = await call_next(request)
+    dt = time.perf_counter() - t0
+
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    metrics.observe("http_request_duration_seconds", dt, route=route, method=request.method)
+
+    if SERVER_TIMING:
+        response.headers["Server-Timing"] = metrics.server_timing_header({**timings, "total": dt})
+    return response
 
+# =========================
+# Helpers
+# =========================
 def require_admin(authorization: Optional[str]) -> None:
     """
     Expect: Authorization: Bearer <ADMIN_TOKEN>
@@ -62,6 +93,55 @@ def paginate(page: int, page_size: int) -> tuple[int, int]:
     offset = (page - 1) * page_size
     return offset, page_size
 
+# keyset pagination (opt-in lewat ?cursor=): cursor = base64 JSON dari
+# nilai ORDER BY baris terakhir. Kosong = halaman pertama. Tanpa COUNT(*).
+def encode_cursor(values: list[Any]) -> str:
+    return base64.urlsafe_b64encode(dumps(values)).decode("ascii").rstrip("=")
+
+def _cursor_value_ok(v: Any, kind) -> bool:
+    # kind = tipe (int/str) atau tuple nilai yang boleh (mis. kategori ENUM)
+    if isinstance(kind, tuple):
+        return isinstance(v, str) and v in kind
+    if kind is int:
+        # bool itu subclass int, tapi bukan nilai cursor yang sah
+        return isinstance(v, int) and not isinstance(v, bool)
+    return isinstance(v, kind)
+
+def decode_cursor(cursor: str, *kinds) -> Optional[list[Any]]:
+    """
+    Cursor dari client nggak dipercaya: jumlah & tipe tiap nilai dicek sesuai
+    kolom ORDER BY endpoint-nya, cursor ngaco -> 400 (bukan 500 di SQL).
+    """
+    if not cursor:
+        return None
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + pad))
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+    if (
+        not isinstance(values, list)
+        or len(values) != len(kinds)
+        or not all(_cursor_value_ok(v, k) for v, k in zip(values, kinds))
+    ):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+    return values
+
+def keyset_page(rows: list, page_size: int, key) -> tuple[list, Optional[str]]:
+    # query ambil page_size + 1 baris; kalau lebih berarti masih ada halaman berikutnya
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(key(rows[-1]))
+
+def owner_kost_id(db: Session, table: str, row_id: int) -> Optional[int]:
+    """kost_id pemilik satu row (room/nearby_place/rule), buat invalidasi cache."""
+    row = db.execute(
+        text(f"SELECT kost_id FROM {table} WHERE id = :id LIMIT 1"),
+        {"id": row_id},
+    ).mappings().first()
+    return row["kost_id"] if row else None
+
 # =========================
 # Schemas
 # =========================
@@ -112,6 +192,7 @@ class FacilityUpdateIn(BaseModel):
     name: str = Field(..., max_length=120)
 
 # ---- NEARBY PLACE ----
+# urutan = urutan ENUM nearby_place.category (migration 0001), dipakai cursor admin_list_nearby
 NearbyCategory = Literal["laundry", "minimarket", "makan", "transport", "lainnya"]
 
 class NearbyPlaceIn(BaseModel):
@@ -159,127 +240,89 @@ def admin_login(payload: AdminLoginIn):
 # Health
 # =========================
 @app.get("/api/health")
-def health():
+async def health():
     return {"ok": True}
 
+@app.get("/api/metrics")
+def prometheus_metrics(authorization: Optional[str] = Header(default=None)):
+    # METRICS_TOKEN opsional; kalau diset, scraper wajib kirim Bearer token
+    token = os.getenv("METRICS_TOKEN")
+    if token and authorization != f"Bearer {token}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 # =========================
 # Public endpoints (landing/chatbot)
 # =========================
+# dilayani dari public_cache (bytes JSON + ETag), DB cuma disentuh waktu entry basi.
+# kost: ?kost_id= kalau ada, selain itu header X-Kost-Id / host (services/tenants.py)
 @app.get("/api/public/kost")
-def public_kost(db: Session = Depends(get_db), kost_id: int = Query(1)):
-    row = db.execute(
-        text("""
-            SELECT name, address, whatsapp, google_maps_url, visiting_hours
-            FROM kost
-            WHERE id = :kost_id
-            LIMIT 1
-        """),
-        {"kost_id": kost_id},
-    ).mappings().first()
-
-    if not row:
-        return {
-            "name": "Kost Binara",
-            "address": "Alamat belum diisi di database.",
-            "whatsapp": "",
-            "google_maps_url": "",
-            "visiting_hours": "",
-        }
-
-    return {k: json_safe(v) for k, v in dict(row).items()}
+async def public_kost(request: Request, kost_id: Optional[int] = Query(None)):
+    return await public_cache.respond(request, "kost", resolve_kost_id(request, kost_id))
 
 @app.get("/api/public/rooms")
-def public_rooms(db: Session = Depends(get_db), kost_id: int = Query(1)):
-    rows = db.execute(
-        text("""
-            SELECT id, kost_id, code, price_monthly, deposit, electricity_included, electricity_note,
-                   size_m2, is_available, notes
-            FROM room
-            WHERE kost_id = :kost_id
-            ORDER BY is_available DESC, id DESC
-        """),
-        {"kost_id": kost_id},
-    ).mappings().all()
-
-    result = []
-    for r in rows:
-        d = dict(r)
-        # facilities
-        fac = db.execute(
-            text("""
-                SELECT f.id, f.name
-                FROM room_facility rf
-                JOIN facility f ON f.id = rf.facility_id
-                WHERE rf.room_id = :room_id
-                ORDER BY f.name ASC
-            """),
-            {"room_id": d["id"]},
-        ).mappings().all()
-        d["facilities"] = [dict(x) for x in fac]
-        d = {k: json_safe(v) for k, v in d.items()}
-        result.append(d)
-
-    return {"items": result}
+async def public_rooms(request: Request, kost_id: Optional[int] = Query(None)):
+    return await public_cache.respond(request, "rooms", resolve_kost_id(request, kost_id))
 
 @app.get("/api/public/nearby")
-def public_nearby(db: Session = Depends(get_db), kost_id: int = Query(1)):
-    rows = db.execute(
-        text("""
-            SELECT id, kost_id, category, name, address, distance_m, maps_url, note
-            FROM nearby_place
-            WHERE kost_id = :kost_id
-            ORDER BY category ASC, COALESCE(distance_m, 999999) ASC, id DESC
-        """),
-        {"kost_id": kost_id},
-    ).mappings().all()
-    return {"items": [{k: json_safe(v) for k, v in dict(r).items()} for r in rows]}
+async def public_nearby(request: Request, kost_id: Optional[int] = Query(None)):
+    return await public_cache.respond(request, "nearby", resolve_kost_id(request, kost_id))
 
 @app.get("/api/public/rules")
-def public_rules(db: Session = Depends(get_db), kost_id: int = Query(1)):
-    rows = db.execute(
-        text("""
-            SELECT id, kost_id, title, description
-            FROM rule
-            WHERE kost_id = :kost_id
-            ORDER BY id ASC
-        """),
-        {"kost_id": kost_id},
-    ).mappings().all()
-    return {"items": [{k: json_safe(v) for k, v in dict(r).items()} for r in rows]}
+async def public_rules(request: Request, kost_id: Optional[int] = Query(None)):
+    return await public_cache.respond(request, "rules", resolve_kost_id(request, kost_id))
 
 # =========================
 # Chatbot Endpoint
 # =========================
+# kost dari path /api/kost/{kost_id}/..., header X-Kost-Id, atau host
 @app.post("/api/chat")
-def chat(payload: ChatIn, db: Session = Depends(get_db)):
-    g = classify(payload.message)
-
-    if not g.in_scope:
-        return {
-            "answer": (
-                "Aku fokus bantu info seputar Kost Binara ya 🙂\n\n"
-                "Contoh: kamar tersedia, harga, fasilitas, aturan, pembayaran, kontak/alamat, laundry terdekat."
-            ),
-            "intent": g.intent,
-            "in_scope": False,
-        }
-
-    ctx = fetch_context(db, intent=g.intent, kost_id=1)
-
-    try:
-        answer = generate_answer(payload.message, ctx)
-    except Exception:
-        answer = (
-            "Maaf, sistem AI lagi sibuk/kuota habis 🙏\n\n"
-            "Tapi aku masih bisa bantu info dasar: alamat, WA pemilik, jam kunjungan."
-        )
-
-    return {"answer": answer, "intent": g.intent, "in_scope": True}
+@app.post("/api/kost/{kost_id}/chat")
+async def chat(
+    payload: ChatIn,
+    db: AsyncSession = Depends(get_async_db),
+    tenant: Tenant = Depends(current_tenant),
+):
+    return await run_chat(db, payload.message, tenant, session_id=payload.session_id)
+
+@app.post("/api/chat/stream")
+@app.post("/api/kost/{kost_id}/chat/stream")
+async def chat_stream(payload: ChatIn, tenant: Tenant = Depends(current_tenant)):
+    # session dibuka di dalam generator: dependency yield udah ditutup
+    # sebelum body StreamingResponse selesai dikirim
+    async def events():
+        async with AsyncSessionLocal() as db:
+            async for event, data in stream_chat(db, payload.message, tenant, session_id=payload.session_id):
+                yield f"event: {event}\ndata: {dumps_str(data)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # ==========================================================
 # ===================== ADMIN ENDPOINTS =====================
 # ==========================================================
 
+# ---------- Admin: stats ----------
+@app.get("/api/admin/stats")
+def admin_stats(authorization: Optional[str] = Header(default=None)):
+    require_admin(authorization)
+    return {
+        "router": router_stats(),
+        "snapshots": snapshot_stats(),
+        "retrieval": retrieval_stats(),
+        "templates": template_stats(),
+        "usage": usage_stats(),
+        "singleflight": singleflight_stats(),
+        "llm": llm_stats(),
+        "sessions": session_stats(),
+        "db_pool": pool_stats(),
+        "public_cache": public_cache.public_cache_stats(),
+        "counters": metrics.counters(),
+    }
+
 # ---------- Admin: kost ----------
 @app.get("/api/admin/kost")
 def admin_get_kost(
@@ -302,7 +345,7 @@ def admin_get_kost(
     if not row:
         raise HTTPException(status_code=404, detail="Kost not found")
 
-    return {k: json_safe(v) for k, v in dict(row).items()}
+    return ORJSONResponse(row)
 
 @app.put("/api/admin/kost")
 def admin_update_kost(
@@ -327,6 +370,7 @@ def admin_update_kost(
         {**payload.model_dump(), "kost_id": kost_id},
     )
     db.commit()
+    versions.bump(kost_id, "kost")
     return {"ok": True}
 
 # ---------- Admin: facility ----------
@@ -336,27 +380,42 @@ def admin_list_facilities(
     authorization: Optional[str] = Header(default=None),
     page: int = Query(1),
     page_size: int = Query(10),
+    cursor: Optional[str] = Query(default=None),
 ):
     require_admin(authorization)
     offset, limit = paginate(page, page_size)
 
+    if cursor is not None:
+        after = decode_cursor(cursor, str, int)
+        where = "WHERE name > :c_name OR (name = :c_name AND id > :c_id)" if after else ""
+        params = {"limit": limit + 1}
+        if after:
+            params.update(c_name=after[0], c_id=after[1])
+        rows = db.execute(
+            text(f"""
+                SELECT id, name
+                FROM facility
+                {where}
+                ORDER BY name ASC, id ASC
+                LIMIT :limit
+            """),
+            params,
+        ).mappings().all()
+        rows, next_cursor = keyset_page(rows, limit, lambda r: [r["name"], r["id"]])
+        return ORJSONResponse({"items": rows, "page_size": limit, "next_cursor": next_cursor})
+
     total = db.execute(text("SELECT COUNT(*) AS c FROM facility")).mappings().first()["c"]
     rows = db.execute(
         text("""
             SELECT id, name
             FROM facility
-            ORDER BY name ASC
+            ORDER BY name ASC, id ASC
             LIMIT :limit OFFSET :offset
         """),
         {"limit": limit, "offset": offset},
     ).mappings().all()
 
-    return {
-        "items": [dict(r) for r in rows],
-        "page": page,
-        "page_size": limit,
-        "total": total,
-    }
+    return ORJSONResponse({"items": rows, "page": page, "page_size": limit, "total": total})
 
 @app.post("/api/admin/facilities")
 def admin_create_facility(
@@ -396,6 +455,9 @@ def admin_update_facility(
     if res.rowcount == 0:
         raise HTTPException(status_code=404, detail="Facility not found")
 
+    # facility dipakai lintas kost
+    versions.bump_all("rooms")
+
     return {"ok": True}
 
 @app.delete("/api/admin/facilities/{facility_id}")
@@ -418,6 +480,8 @@ def admin_delete_facility(
     if res.rowcount == 0:
         raise HTTPException(status_code=404, detail="Facility not found")
 
+    versions.bump_all("rooms")
+
     return {"ok": True}
 
 # ---------- Admin: rooms (with room_facility) ----------
@@ -428,10 +492,33 @@ def admin_list_rooms(
     kost_id: int = Query(1),
     page: int = Query(1),
     page_size: int = Query(10),
+    cursor: Optional[str] = Query(default=None),
 ):
     require_admin(authorization)
     offset, limit = paginate(page, page_size)
 
+    if cursor is not None:
+        after = decode_cursor(cursor, int, int)
+        params: dict[str, Any] = {"kost_id": kost_id, "limit": limit + 1}
+        seek = ""
+        if after:
+            # (is_available, id) DESC -> baris berikutnya yang "lebih kecil"
+            seek = "AND (is_available < :c_avail OR (is_available = :c_avail AND id < :c_id))"
+            params.update(c_avail=after[0], c_id=after[1])
+        rows = db.execute(
+            text(f"""
+                SELECT id, kost_id, code, price_monthly, deposit, electricity_included, electricity_note,
+                       size_m2, is_available, notes
+                FROM room
+                WHERE kost_id = :kost_id {seek}
+                ORDER BY is_available DESC, id DESC
+                LIMIT :limit
+            """),
+            params,
+        ).mappings().all()
+        rows, next_cursor = keyset_page(rows, limit, lambda r: [int(r["is_available"]), r["id"]])
+        return ORJSONResponse({"items": attach_facilities(db, rows), "page_size": limit, "next_cursor": next_cursor})
+
     total = db.execute(
         text("SELECT COUNT(*) AS c FROM room WHERE kost_id = :kost_id"),
         {"kost_id": kost_id},
@@ -449,24 +536,7 @@ def admin_list_rooms(
         {"kost_id": kost_id, "limit": limit, "offset": offset},
     ).mappings().all()
 
-    items = []
-    for r in rows:
-        d = dict(r)
-        fac = db.execute(
-            text("""
-                SELECT f.id, f.name
-                FROM room_facility rf
-                JOIN facility f ON f.id = rf.facility_id
-                WHERE rf.room_id = :room_id
-                ORDER BY f.name ASC
-            """),
-            {"room_id": d["id"]},
-        ).mappings().all()
-        d["facilities"] = [dict(x) for x in fac]
-        d = {k: json_safe(v) for k, v in d.items()}
-        items.append(d)
-
-    return {"items": items, "page": page, "page_size": limit, "total": total}
+    return ORJSONResponse({"items": attach_facilities(db, rows), "page": page, "page_size": limit, "total": total})
 
 @app.post("/api/admin/rooms")
 def admin_create_room(
@@ -477,7 +547,7 @@ def admin_create_room(
     require_admin(authorization)
 
     # insert room
-    db.execute(
+    res = db.execute(
         text("""
             INSERT INTO room
               (kost_id, code, price_monthly, deposit, electricity_included, electricity_note,
@@ -499,18 +569,19 @@ def admin_create_room(
         },
     )
 
-    # get last inserted id
-    room_id = db.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().first()["id"]
+    # id dari hasil INSERT-nya sendiri: LAST_INSERT_ID() terpisah bisa kena
+    # koneksi lain (NullPool / pool kecil) dan balikin 0
+    room_id = res.lastrowid
 
     # facilities
     if payload.facility_ids:
-        for fid in payload.facility_ids:
-            db.execute(
-                text("INSERT INTO room_facility (room_id, facility_id) VALUES (:room_id, :facility_id)"),
-                {"room_id": room_id, "facility_id": fid},
-            )
+        db.execute(
+            text("INSERT INTO room_facility (room_id, facility_id) VALUES (:room_id, :facility_id)"),
+            [{"room_id": room_id, "facility_id": fid} for fid in payload.facility_ids],
+        )
 
     db.commit()
+    versions.bump(payload.kost_id, "rooms")
     return {"ok": True, "id": room_id}
 
 @app.put("/api/admin/rooms/{room_id}")
@@ -526,6 +597,8 @@ def admin_update_room(
     if not fields:
         return {"ok": True, "message": "No changes"}
 
+    kost_id = owner_kost_id(db, "room", room_id)
+
     sets = []
     params: dict[str, Any] = {"room_id": room_id}
 
@@ -572,13 +645,15 @@ def admin_update_room(
     # facilities replace
     if "facility_ids" in fields and fields["facility_ids"] is not None:
         db.execute(text("DELETE FROM room_facility WHERE room_id = :room_id"), {"room_id": room_id})
-        for fid in fields["facility_ids"]:
+        if fields["facility_ids"]:
             db.execute(
                 text("INSERT INTO room_facility (room_id, facility_id) VALUES (:room_id, :facility_id)"),
-                {"room_id": room_id, "facility_id": fid},
+                [{"room_id": room_id, "facility_id": fid} for fid in fields["facility_ids"]],
             )
 
     db.commit()
+    if kost_id is not None:
+        versions.bump(kost_id, "rooms")
     return {"ok": True}
 
 @app.delete("/api/admin/rooms/{room_id}")
@@ -589,6 +664,7 @@ def admin_delete_room(
 ):
     require_admin(authorization)
 
+    kost_id = owner_kost_id(db, "room", room_id)
     db.execute(text("DELETE FROM room_facility WHERE room_id = :room_id"), {"room_id": room_id})
     res = db.execute(text("DELETE FROM room WHERE id = :room_id LIMIT 1"), {"room_id": room_id})
     db.commit()
@@ -596,6 +672,8 @@ def admin_delete_room(
     if res.rowcount == 0:
         raise HTTPException(status_code=404, detail="Room not found")
 
+    versions.bump(kost_id, "rooms")
+
     return {"ok": True}
 
 # ---------- Admin: nearby_place ----------
@@ -607,6 +685,7 @@ def admin_list_nearby(
     category: Optional[NearbyCategory] = Query(default=None),
     page: int = Query(1),
     page_size: int = Query(10),
+    cursor: Optional[str] = Query(default=None),
 ):
     require_admin(authorization)
     offset, limit = paginate(page, page_size)
@@ -617,6 +696,38 @@ def admin_list_nearby(
         where += " AND category = :category"
         params["category"] = category
 
+    if cursor is not None:
+        after = decode_cursor(cursor, get_args(NearbyCategory), int, int)
+        params["limit"] = limit + 1
+        params.pop("offset")
+        if after:
+            # urutan campur: category ASC, jarak ASC, id DESC.
+            # ORDER BY category di MySQL ngikut urutan ENUM (migration 0001), bukan
+            # abjad -> "category > :c_cat" bakal lompat baris. Kategori sesudahnya
+            # diambil dari urutan ENUM (= urutan NearbyCategory).
+            cats = get_args(NearbyCategory)
+            where += """ AND (category IN :c_later OR (category = :c_cat AND (
+                COALESCE(distance_m, 999999) > :c_dist
+                OR (COALESCE(distance_m, 999999) = :c_dist AND id < :c_id))))"""
+            params.update(
+                c_later=list(cats[cats.index(after[0]) + 1:]), c_cat=after[0], c_dist=after[1], c_id=after[2],
+            )
+        stmt = text(f"""
+            SELECT id, kost_id, category, name, address, distance_m, maps_url, note
+            FROM nearby_place
+            {where}
+            ORDER BY category ASC, COALESCE(distance_m, 999999) ASC, id DESC
+            LIMIT :limit
+        """)
+        if after:
+            stmt = stmt.bindparams(bindparam("c_later", expanding=True))
+        rows = db.execute(stmt, params).mappings().all()
+        rows, next_cursor = keyset_page(
+            rows, limit,
+            lambda r: [r["category"], 999999 if r["distance_m"] is None else r["distance_m"], r["id"]],
+        )
+        return ORJSONResponse({"items": rows, "page_size": limit, "next_cursor": next_cursor})
+
     total = db.execute(
         text(f"SELECT COUNT(*) AS c FROM nearby_place {where}"),
         params,
@@ -633,12 +744,7 @@ def admin_list_nearby(
         params,
     ).mappings().all()
 
-    return {
-        "items": [{k: json_safe(v) for k, v in dict(r).items()} for r in rows],
-        "page": page,
-        "page_size": limit,
-        "total": total,
-    }
+    return ORJSONResponse({"items": rows, "page": page, "page_size": limit, "total": total})
 
 @app.post("/api/admin/nearby")
 def admin_create_nearby(
@@ -648,7 +754,7 @@ def admin_create_nearby(
 ):
     require_admin(authorization)
 
-    db.execute(
+    res = db.execute(
         text("""
             INSERT INTO nearby_place (kost_id, category, name, address, distance_m, maps_url, note)
             VALUES (:kost_id, :category, :name, :address, :distance_m, :maps_url, :note)
@@ -663,8 +769,10 @@ def admin_create_nearby(
             "note": payload.note or "",
         },
     )
+    # ambil sebelum commit: habis commit koneksinya bisa udah balik ke pool
+    new_id = res.lastrowid
     db.commit()
-    new_id = db.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().first()["id"]
+    versions.bump(payload.kost_id, "nearby")
     return {"ok": True, "id": new_id}
 
 @app.put("/api/admin/nearby/{place_id}")
@@ -680,6 +788,8 @@ def admin_update_nearby(
     if not fields:
         return {"ok": True, "message": "No changes"}
 
+    kost_id = owner_kost_id(db, "nearby_place", place_id)
+
     sets = []
     params: dict[str, Any] = {"id": place_id}
     for k, v in fields.items():
@@ -692,6 +802,7 @@ def admin_update_nearby(
 
     if res.rowcount == 0:
         raise HTTPException(status_code=404, detail="Nearby place not found")
+    versions.bump(kost_id, "nearby")
     return {"ok": True}
 
 @app.delete("/api/admin/nearby/{place_id}")
@@ -702,10 +813,12 @@ def admin_delete_nearby(
 ):
     require_admin(authorization)
 
+    kost_id = owner_kost_id(db, "nearby_place", place_id)
     res = db.execute(text("DELETE FROM nearby_place WHERE id = :id LIMIT 1"), {"id": place_id})
     db.commit()
     if res.rowcount == 0:
         raise HTTPException(status_code=404, detail="Nearby place not found")
+    versions.bump(kost_id, "nearby")
     return {"ok": True}
 
 # ---------- Admin: rule ----------
@@ -716,10 +829,30 @@ def admin_list_rules(
     kost_id: int = Query(1),
     page: int = Query(1),
     page_size: int = Query(10),
+    cursor: Optional[str] = Query(default=None),
 ):
     require_admin(authorization)
     offset, limit = paginate(page, page_size)
 
+    if cursor is not None:
+        after = decode_cursor(cursor, int)
+        seek = "AND id > :c_id" if after else ""
+        params: dict[str, Any] = {"kost_id": kost_id, "limit": limit + 1}
+        if after:
+            params["c_id"] = after[0]
+        rows = db.execute(
+            text(f"""
+                SELECT id, kost_id, title, description
+                FROM rule
+                WHERE kost_id = :kost_id {seek}
+                ORDER BY id ASC
+                LIMIT :limit
+            """),
+            params,
+        ).mappings().all()
+        rows, next_cursor = keyset_page(rows, limit, lambda r: [r["id"]])
+        return ORJSONResponse({"items": rows, "page_size": limit, "next_cursor": next_cursor})
+
     total = db.execute(
         text("SELECT COUNT(*) AS c FROM rule WHERE kost_id = :kost_id"),
         {"kost_id": kost_id},
@@ -736,12 +869,7 @@ def admin_list_rules(
         {"kost_id": kost_id, "limit": limit, "offset": offset},
     ).mappings().all()
 
-    return {
-        "items": [{k: json_safe(v) for k, v in dict(r).items()} for r in rows],
-        "page": page,
-        "page_size": limit,
-        "total": total,
-    }
+    return ORJSONResponse({"items": rows, "page": page, "page_size": limit, "total": total})
 
 @app.post("/api/admin/rules")
 def admin_create_rule(
@@ -751,7 +879,7 @@ def admin_create_rule(
 ):
     require_admin(authorization)
 
-    db.execute(
+    res = db.execute(
         text("""
             INSERT INTO rule (kost_id, title, description)
             VALUES (:kost_id, :title, :description)
@@ -762,8 +890,9 @@ def admin_create_rule(
             "description": payload.description,
         },
     )
+    new_id = res.lastrowid
     db.commit()
-    new_id = db.execute(text("SELECT LAST_INSERT_ID() AS id")).mappings().first()["id"]
+    versions.bump(payload.kost_id, "rules")
     return {"ok": True, "id": new_id}
 
 @app.put("/api/admin/rules/{rule_id}")
@@ -779,6 +908,8 @@ def admin_update_rule(
     if not fields:
         return {"ok": True, "message": "No changes"}
 
+    kost_id = owner_kost_id(db, "rule", rule_id)
+
     sets = []
     params: dict[str, Any] = {"id": rule_id}
     for k, v in fields.items():
@@ -791,6 +922,7 @@ def admin_update_rule(
 
     if res.rowcount == 0:
         raise HTTPException(status_code=404, detail="Rule not found")
+    versions.bump(kost_id, "rules")
     return {"ok": True}
 
 @app.delete("/api/admin/rules/{rule_id}")
@@ -800,8 +932,131 @@ def admin_delete_rule(
     authorization: Optional[str] = Header(default=None),
 ):
     require_admin(authorization)
+    kost_id = owner_kost_id(db, "rule", rule_id)
     res = db.execute(text("DELETE FROM rule WHERE id = :id LIMIT 1"), {"id": rule_id})
     db.commit()
     if res.rowcount == 0:
         raise HTTPException(status_code=404, detail="Rule not found")
+    versions.bump(kost_id, "rules")
     return {"ok": True}
+
+# ---------- Admin: bulk import/export ----------
+BulkEntity = Literal["facilities", "rooms", "rules", "nearby"]
+
+BULK_MODELS = {
+    "facilities": FacilityIn,
+    "rooms": RoomIn,
+    "rules": RuleIn,
+    "nearby": NearbyPlaceIn,
+}
+
+# entity -> slice versi yang harus di-bump (facility: lihat admin_update_facility)
+BULK_VERSION_SLICE = {"rooms": "rooms", "rules": "rules", "nearby": "nearby"}
+
+def bulk_row(entity: str, m: BaseModel) -> dict:
+    d = {k: (v.strip() if isinstance(v, str) else v) for k, v in m.model_dump().items()}
+    if entity == "rooms":
+        d["electricity_included"] = 1 if d["electricity_included"] else 0
+        d["is_available"] = 1 if d["is_available"] else 0
+    return d
+
+def bulk_insert(entity: str, rows: list[dict]) -> int:
+    db = SessionLocal()
+    try:
+        n = bulk.insert_rows(db, entity, rows)
+        db.commit()
+        return n
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Gagal import {entity}: {str(e)}")
+    finally:
+        db.close()
+
+@app.post("/api/admin/import/{entity}")
+async def admin_import(
+    entity: BulkEntity,
+    request: Request,
+    authorization: Optional[str] = Header(default=None),
+    format: Optional[Literal["csv", "ndjson"]] = Query(default=None),
+):
+    """
+    Body CSV (Content-Type: text/csv) atau NDJSON (application/x-ndjson).
+    Semua baris divalidasi dulu; kalau ada yang salah, nggak ada yang di-insert.
+    """
+    require_admin(authorization)
+
+    body = await request.body()
+    fmt = bulk.detect_format(request.headers.get("content-type"), format)
+    model = BULK_MODELS[entity]
+
+    rows: list[dict] = []
+    errors: list[dict] = []
+    # facility_ids room di-link lewat (kost_id, code) -> code dobel di satu file bikin link nyasar
+    seen_codes: dict[tuple[int, str], int] = {}
+    try:
+        for line, rec in bulk.parse_records(body, fmt):
+            try:
+                row = bulk_row(entity, model.model_validate(rec))
+            except ValidationError as e:
+                errors.append({"line": line, "errors": e.errors(include_url=False, include_context=False)})
+                continue
+            if entity == "rooms":
+                key = (row["kost_id"], row["code"])
+                if key in seen_codes:
+                    errors.append({"line": line, "errors": [{
+                        "type": "duplicate", "loc": ["code"],
+                        "msg": f"Kode kamar {row['code']} dobel untuk kost {row['kost_id']} (baris {seen_codes[key]})",
+                    }]})
+                    continue
+                seen_codes[key] = line
+            rows.append(row)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Format {fmt} tidak valid: {str(e)}")
+
+    if errors:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Validasi gagal, tidak ada data yang di-import", "error_count": len(errors), "errors": errors[:20]},
+        )
+    if not rows:
+        return {"ok": True, "inserted": 0}
+
+    inserted = await run_in_threadpool(bulk_insert, entity, rows)
+
+    if entity == "facilities":
+        versions.bump_all("rooms")
+    else:
+        for kost_id in {r["kost_id"] for r in rows}:
+            versions.bump(kost_id, BULK_VERSION_SLICE[entity])
+
+    return {"ok": True, "inserted": inserted}
+
+@app.get("/api/admin/export/{entity}")
+def admin_export(
+    entity: BulkEntity,
+    authorization: Optional[str] = Header(default=None),
+    kost_id: Optional[int] = Query(default=None),
+    format: Literal["csv", "ndjson"] = Query(default="ndjson"),
+):
+    require_admin(authorization)
+
+    # session sendiri: dipakai selama body di-stream, ditutup di akhir generator
+    def pages():
+        db = SessionLocal()
+        try:
+            yield from bulk.export_pages(db, entity, kost_id)
+        finally:
+            db.close()
+
+    if format == "csv":
+        body = bulk.render_csv(pages(), bulk.export_columns(entity))
+        media = "text/csv; charset=utf-8"
+    else:
+        body = bulk.render_ndjson(pages())
+        media = "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media,
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{format}"'},
+    )
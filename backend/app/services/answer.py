@@ -1,16 +1,92 @@
+import os
+import time
+import threading
+from typing import Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-def fetch_context(db: Session, intent: str, kost_id: int = 1) -> dict:
+from app.services import versions, metrics
+from app.services.rooms import attach_facilities
 
-    ctx = {
+# intent -> potongan context yang dibutuhin (kost selalu ikut)
+ROOM_INTENTS = ["kamar_tersedia", "harga", "fasilitas", "biaya_tambahan"]
+
+INTENT_SLICES = {
+    **{i: ["rooms"] for i in ROOM_INTENTS},
+    "aturan": ["rules"],
+    "pembayaran": ["payments"],
+    "laundry_terdekat": ["nearby_laundry"],
+}
+
+ALL_SLICES = ["rooms", "rules", "payments", "nearby_laundry"]
+
+# slice context -> slice versi (tabel sumber)
+SLICE_VERSION = {
+    "rooms": "rooms",
+    "rules": "rules",
+    "payments": "payments",
+    "nearby_laundry": "nearby",
+}
+
+# cache context per (kost_id, intent). Dibuang kalau versi datanya naik
+# (lihat versions.bump di endpoint admin) atau kalau lewat TTL -- TTL ini
+# jaring pengaman buat deployment multi-instance yang nggak saling denger bump.
+_ctx_cache: dict[tuple[int, Optional[str]], tuple[tuple, float, dict]] = {}
+_ctx_lock = threading.Lock()
+
+def context_ttl() -> float:
+    return float(os.getenv("CONTEXT_CACHE_TTL", "300"))
+
+def empty_context() -> dict:
+    return {
         "kost": None,
         "rooms": [],
         "rules": [],
         "payments": [],
-        "nearby_laundry": []
+        "nearby_laundry": [],
+        # diisi services/retrieval.py (tempat terdekat semua kategori, intent lainnya)
+        "nearby": [],
     }
 
+def slices_for(intent: Optional[str]) -> list[str]:
+    # intent None = superset (dipakai mode single-pass)
+    if intent is None:
+        return ALL_SLICES
+    return INTENT_SLICES.get(intent, [])
+
+def context_version(intent: Optional[str], kost_id: int) -> tuple:
+    deps = ["kost"] + [SLICE_VERSION[s] for s in slices_for(intent)]
+    return versions.current(kost_id, deps)
+
+def fetch_context(db: Session, intent: Optional[str], kost_id: int = 1) -> dict:
+    """
+    Context buat prompt, di-cache per (kost_id, intent).
+    Hasilnya dishare antar request, jadi anggap read-only.
+    """
+    ttl = context_ttl()
+    key = (kost_id, intent)
+    ver = context_version(intent, kost_id)
+
+    if ttl > 0:
+        with _ctx_lock:
+            item = _ctx_cache.get(key)
+        if item is not None and item[0] == ver and time.time() - item[1] < ttl:
+            metrics.incr("context_cache_total", result="hit")
+            return item[2]
+        metrics.incr("context_cache_total", result="miss")
+
+    ctx = load_context(db, intent, kost_id)
+
+    if ttl > 0:
+        with _ctx_lock:
+            _ctx_cache[key] = (ver, time.time(), ctx)
+    return ctx
+
+def load_context(db: Session, intent: Optional[str], kost_id: int = 1) -> dict:
+
+    ctx = empty_context()
+    slices = slices_for(intent)
+
     # Kost info
     kost_row = db.execute(
         text("SELECT * FROM kost WHERE id=:id"),
@@ -19,21 +95,20 @@ def fetch_context(db: Session, intent: str, kost_id: int = 1) -> dict:
     ctx["kost"] = dict(kost_row) if kost_row else None
 
     # Rooms + facilities
-    if intent in ["kamar_tersedia", "harga", "fasilitas", "biaya_tambahan"]:
+    if "rooms" in slices:
         rooms = db.execute(text("""
-            SELECT r.*,
-                   GROUP_CONCAT(f.name SEPARATOR ', ') AS facilities
+            SELECT r.*
             FROM room r
-            LEFT JOIN room_facility rf ON rf.room_id = r.id
-            LEFT JOIN facility f ON f.id = rf.facility_id
             WHERE r.kost_id = :id
-            GROUP BY r.id
             ORDER BY r.is_available DESC, r.code ASC
         """), {"id": kost_id}).mappings().all()
-        ctx["rooms"] = [dict(r) for r in rooms]
+        ctx["rooms"] = attach_facilities(db, rooms)
+        # di prompt cukup nama facility, dipisah koma
+        for r in ctx["rooms"]:
+            r["facilities"] = ", ".join(f["name"] for f in r["facilities"]) or None
 
     # Rules
-    if intent == "aturan":
+    if "rules" in slices:
         rules = db.execute(
             text("SELECT title, description FROM rule WHERE kost_id=:id"),
             {"id": kost_id}
@@ -41,7 +116,7 @@ def fetch_context(db: Session, intent: str, kost_id: int = 1) -> dict:
         ctx["rules"] = [dict(r) for r in rules]
 
     # Payment schemes
-    if intent == "pembayaran":
+    if "payments" in slices:
         payments = db.execute(
             text("SELECT scheme, description FROM payment_scheme WHERE kost_id=:id"),
             {"id": kost_id}
@@ -49,7 +124,7 @@ def fetch_context(db: Session, intent: str, kost_id: int = 1) -> dict:
         ctx["payments"] = [dict(p) for p in payments]
 
     # Nearby laundry
-    if intent == "laundry_terdekat":
+    if "nearby_laundry" in slices:
         laundry = db.execute(text("""
             SELECT name, address, distance_m, maps_url, note
             FROM nearby_place
@@ -60,3 +135,11 @@ def fetch_context(db: Session, intent: str, kost_id: int = 1) -> dict:
         ctx["nearby_laundry"] = [dict(x) for x in laundry]
 
     return ctx
+
+def narrow_context(ctx: dict, intent: str) -> dict:
+    """Ambil bagian context superset yang relevan buat satu intent."""
+    out = empty_context()
+    out["kost"] = ctx.get("kost")
+    for s in slices_for(intent):
+        out[s] = ctx.get(s) or []
+    return out
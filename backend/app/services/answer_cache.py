@@ -0,0 +1,246 @@
+"""
+Cache jawaban Gemini.
+
+Key = pertanyaan yang dinormalisasi + intent + versi data kost yang dipakai
+(hash dari context), jadi begitu admin ubah data, key lama otomatis nggak
+kepakai lagi. Cache dipartisi per kost (tenant) di bawah satu batas global
+ANSWER_CACHE_MAX; kalau penuh, yang diusir jawaban paling lama dari kost yang
+entry-nya paling banyak, jadi kost yang rame ngusir jawabannya sendiri dulu.
+Backend bisa dipilih lewat env:
+
+  ANSWER_CACHE_BACKEND=memory (default) | sqlite | off
+  ANSWER_CACHE_PATH=/tmp/binara-answer-cache.sqlite3
+  ANSWER_CACHE_MAX=2000   (total semua kost)
+  ANSWER_CACHE_TTL=3600   (detik)
+  ANSWER_CACHE_TOUCH=60   (detik, sqlite) last_used baru ditulis ulang kalau udah segini lama
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.services import metrics
+
+# kata pengisi yang nggak ngubah maksud pertanyaan
+FILLERS = {
+    "kak", "ka", "min", "mimin", "gan", "sis", "bang", "dong", "deh", "ya", "yah",
+    "sih", "nih", "kah", "tuh", "nya", "halo", "hai", "permisi", "mau", "tanya",
+}
+
+def normalize_question(q: str) -> str:
+    s = re.sub(r"[^a-z0-9\s]", " ", q.lower())
+    toks = [t for t in s.split() if t not in FILLERS]
+    return " ".join(toks)
+
+def data_version(context) -> str:
+    # context bisa dict mentah atau teks snapshot yang udah di-compile
+    if isinstance(context, str):
+        raw = context
+    else:
+        raw = json.dumps(context, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+def cache_key(question: str, intent: str, context) -> str:
+    raw = f"{normalize_question(question)}|{intent}|{data_version(context)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class MemoryBackend:
+    def __init__(self, max_items: int, ttl: float):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            created, value = item
+            if time.time() - created > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def evict_oldest(self) -> bool:
+        with self._lock:
+            if not self._data:
+                return False
+            self._data.popitem(last=False)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+class PartitionedMemory:
+    """Satu MemoryBackend (LRU sendiri) per tenant, total item dibatasi global."""
+
+    blocking = False
+
+    def __init__(self, max_items: int, ttl: float):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._parts: dict[int, MemoryBackend] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, tenant: int = 0) -> Optional[str]:
+        part = self._parts.get(tenant)
+        return part.get(key) if part is not None else None
+
+    def set(self, key: str, value: str, tenant: int = 0) -> None:
+        with self._lock:
+            part = self._parts.get(tenant)
+            if part is None:
+                part = self._parts[tenant] = MemoryBackend(self.max_items, self.ttl)
+            part.set(key, value)
+            total = sum(len(p) for p in self._parts.values())
+            while total > self.max_items:
+                t, big = max(self._parts.items(), key=lambda kv: len(kv[1]))
+                if not big.evict_oldest():
+                    break
+                total -= 1
+                if not len(big):
+                    del self._parts[t]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._parts.clear()
+
+class SqliteBackend:
+    # disk I/O (commit = fsync): dipanggil lewat thread, bukan di event loop
+    blocking = True
+
+    def __init__(self, path: str, max_items: int, ttl: float, touch: float = 60.0):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.touch = touch
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS answer_cache (
+              key TEXT PRIMARY KEY,
+              value TEXT NOT NULL,
+              created_at REAL NOT NULL,
+              last_used REAL NOT NULL
+            )
+        """)
+        cols = {r[1] for r in self._conn.execute("PRAGMA table_info(answer_cache)")}
+        if "tenant" not in cols:
+            # file cache lama (sebelum multi-kost)
+            self._conn.execute("ALTER TABLE answer_cache ADD COLUMN tenant INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("DROP INDEX IF EXISTS ix_answer_cache_last_used")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_answer_cache_tenant_used ON answer_cache (tenant, last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, tenant: int = 0) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, last_used FROM answer_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created, last_used = row
+            if now - created > self.ttl:
+                # entry expired nggak perlu dihapus di sini, set() berikutnya yang bersihin
+                return None
+            # LRU cukup kasar: hit beruntun nggak perlu commit tiap kali
+            if now - last_used >= self.touch:
+                self._conn.execute("UPDATE answer_cache SET last_used = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str, tenant: int = 0) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answer_cache (key, value, created_at, last_used, tenant) VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, tenant),
+            )
+            # buang yang expired, lalu kalau total lewat batas: yang paling lama
+            # nggak dipakai dari kost yang entry-nya paling banyak
+            self._conn.execute("DELETE FROM answer_cache WHERE created_at < ?", (now - self.ttl,))
+            excess = self._conn.execute("SELECT COUNT(*) FROM answer_cache").fetchone()[0] - self.max_items
+            if excess > 0:
+                big = self._conn.execute(
+                    "SELECT tenant FROM answer_cache GROUP BY tenant ORDER BY COUNT(*) DESC LIMIT 1"
+                ).fetchone()[0]
+                self._conn.execute("""
+                    DELETE FROM answer_cache WHERE key IN (
+                      SELECT key FROM answer_cache WHERE tenant = ? ORDER BY last_used ASC LIMIT ?
+                    )
+                """, (big, excess))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM answer_cache")
+            self._conn.commit()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Backend cache sesuai env, None kalau dimatiin."""
+    global _cache
+    if _cache is not None:
+        return _cache or None
+
+    with _cache_lock:
+        if _cache is None:
+            kind = os.getenv("ANSWER_CACHE_BACKEND", "memory").strip().lower()
+            max_items = int(os.getenv("ANSWER_CACHE_MAX", "2000"))
+            ttl = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+            if kind == "sqlite":
+                path = os.getenv("ANSWER_CACHE_PATH", "/tmp/binara-answer-cache.sqlite3")
+                _cache = SqliteBackend(path, max_items, ttl, float(os.getenv("ANSWER_CACHE_TOUCH", "60")))
+            elif kind == "memory":
+                _cache = PartitionedMemory(max_items, ttl)
+            else:
+                _cache = False
+    return _cache or None
+
+async def lookup(question: str, intent: str, context, tenant: int = 0) -> tuple[Optional[str], Optional[str]]:
+    """Return (jawaban kalau hit, key buat store nanti)."""
+    cache = get_cache()
+    if cache is None:
+        return None, None
+
+    key = f"{tenant}:{cache_key(question, intent, context)}"
+    # backend sqlite jalan di thread pool biar chat lain nggak nunggu disk
+    if cache.blocking:
+        hit = await asyncio.to_thread(cache.get, key, tenant)
+    else:
+        hit = cache.get(key, tenant)
+    metrics.incr("answer_cache_total", result="hit" if hit is not None else "miss")
+    return hit, key
+
+async def store(key: Optional[str], answer: str, tenant: int = 0) -> None:
+    cache = get_cache()
+    if cache is None or key is None or not answer:
+        return
+    if cache.blocking:
+        await asyncio.to_thread(cache.set, key, answer, tenant)
+    else:
+        cache.set(key, answer, tenant)
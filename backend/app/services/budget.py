@@ -0,0 +1,226 @@
+"""
+Budget token per intent + akuntansi token per request chat.
+
+Tiap intent punya batas (context, output):
+  context -> snapshot context dipangkas per baris (baris paling belakang =
+             paling nggak relevan) sampai muat; baris KOST nggak pernah dibuang
+  output  -> max_output_tokens di config Gemini (cuma kalau thinking dibatasi,
+             lihat GEMINI_THINKING_BUDGET)
+
+Pemakaian dicatat per call LLM (usage_metadata kalau ada, estimasi kalau nggak)
+ke metrics llm_tokens_total, dan per request chat dirangkum jadi satu baris log
+JSON di logger "binara.usage".
+
+Env:
+  TOKEN_BUDGETS="harga=800/384,single_pass=2500/768"   override context/output per intent
+  CLASSIFY_MAX_OUTPUT_TOKENS=64
+  GEMINI_THINKING_BUDGET=      kosong (default) = thinking nggak dibatasi, jadi
+                               max_output_tokens juga NGGAK dikirim: token "thinking"
+                               gemini-2.5 ikut makan cap itu, cap kecil bikin respon
+                               kosong (finish MAX_TOKENS). Isi (mis. 0) -> kirim
+                               thinking_config + max_output_tokens = output + thinking.
+                               Butuh google-genai yang ThinkingConfig-nya punya
+                               thinking_budget (0.6.0 di requirements.txt belum punya).
+  USAGE_LOG=1
+"""
+
+import os
+import time
+import logging
+import contextvars
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+
+from app.services import metrics
+from app.services.serialize import dumps_str
+from app.services.snapshot import row_tokens
+from app.services.tokens import estimate_tokens
+
+@dataclass(frozen=True)
+class Budget:
+    context: int
+    output: int
+
+# None = single-pass (context superset + klasifikasi + jawaban)
+BUDGETS: dict[Optional[str], Budget] = {
+    "alamat": Budget(400, 256),
+    "kontak": Budget(400, 256),
+    "laundry_terdekat": Budget(500, 320),
+    "pembayaran": Budget(500, 320),
+    "kamar_tersedia": Budget(1200, 512),
+    "harga": Budget(1200, 512),
+    "fasilitas": Budget(1200, 512),
+    "biaya_tambahan": Budget(1000, 448),
+    "aturan": Budget(1000, 512),
+    "tipe_kost": Budget(600, 320),
+    "lainnya": Budget(1200, 512),
+    None: Budget(2000, 640),
+}
+
+DEFAULT_BUDGET = Budget(1200, 512)
+
+# urutan slice yang dipangkas (slice terpanjang duluan, seri -> urutan ini)
+TRIM_SLICES = ("nearby", "rules", "rooms", "nearby_laundry", "payments")
+
+@lru_cache(maxsize=8)
+def _overrides(raw: str) -> dict[str, Budget]:
+    out = {}
+    for pair in raw.split(","):
+        intent, _, val = pair.partition("=")
+        ctx, _, output = val.partition("/")
+        if intent.strip() and ctx.strip().isdigit() and output.strip().isdigit():
+            out[intent.strip()] = Budget(int(ctx), int(output))
+    return out
+
+def budget_for(intent: Optional[str]) -> Budget:
+    o = _overrides(os.getenv("TOKEN_BUDGETS", ""))
+    key = intent if intent is not None else "single_pass"
+    return o.get(key) or BUDGETS.get(intent, DEFAULT_BUDGET)
+
+def thinking_budget() -> Optional[int]:
+    raw = os.getenv("GEMINI_THINKING_BUDGET", "").strip()
+    return int(raw) if raw else None
+
+def _output_cap(output: int) -> dict:
+    tb = thinking_budget()
+    if tb is None:
+        # thinking nggak bisa dibatasi -> cap output kecil malah motong jawaban
+        return {}
+    return {"max_output_tokens": output + tb, "thinking_config": {"thinking_budget": tb}}
+
+def output_config(intent: Optional[str]) -> dict:
+    """Potongan config Gemini buat batas output jawaban intent ini."""
+    return _output_cap(budget_for(intent).output)
+
+def classify_config() -> dict:
+    return _output_cap(int(os.getenv("CLASSIFY_MAX_OUTPUT_TOKENS", "64")))
+
+def fit_context(ctx: dict, intent: Optional[str], excess: int) -> tuple[dict, int]:
+    """
+    Buang baris dari belakang slice terpanjang sampai estimasi token turun
+    `excess`. Return (context baru, jumlah baris dibuang); ctx asli nggak diubah.
+    """
+    lists = {s: list(ctx.get(s) or []) for s in TRIM_SLICES}
+    dropped = 0
+    while excess > 0:
+        s = max(TRIM_SLICES, key=lambda k: len(lists[k]))
+        if not lists[s]:
+            break
+        excess -= row_tokens(s, lists[s].pop(), intent)
+        dropped += 1
+
+    out = dict(ctx)
+    for s in TRIM_SLICES:
+        if s in ctx:
+            out[s] = lists[s]
+    return out, dropped
+
+# ---------- akuntansi per request ----------
+
+@dataclass
+class RequestUsage:
+    kost_id: int
+    started: float = field(default_factory=time.perf_counter)
+    context_tokens: int = 0
+    rows_dropped: int = 0
+    calls: list[dict] = field(default_factory=list)
+
+_current: contextvars.ContextVar[Optional[RequestUsage]] = contextvars.ContextVar("usage", default=None)
+
+def start_request(kost_id: int) -> RequestUsage:
+    u = RequestUsage(kost_id=kost_id)
+    _current.set(u)
+    return u
+
+def note_context(tokens: int, dropped: int) -> None:
+    metrics.incr("context_tokens_total", tokens)
+    if dropped:
+        metrics.incr("context_rows_truncated_total", dropped)
+    u = _current.get()
+    if u is not None:
+        u.context_tokens += tokens
+        u.rows_dropped += dropped
+
+def finish_reason(resp) -> str:
+    try:
+        return str(resp.candidates[0].finish_reason or "")
+    except (AttributeError, IndexError, TypeError):
+        return ""
+
+def record_call(purpose: str, contents: str, config: dict, usage_metadata, text: Optional[str], resp=None) -> dict:
+    """Dipanggil llm.generate/generate_stream setelah call sukses."""
+    prompt = getattr(usage_metadata, "prompt_token_count", None)
+    output = getattr(usage_metadata, "candidates_token_count", None)
+    thoughts = getattr(usage_metadata, "thoughts_token_count", None) or 0
+    estimated = prompt is None
+    if prompt is None:
+        prompt = estimate_tokens(contents) + estimate_tokens(str(config.get("system_instruction") or ""))
+    if output is None:
+        output = estimate_tokens(text or "")
+
+    capped = "MAX_TOKENS" in finish_reason(resp)
+    metrics.incr("llm_tokens_total", prompt, kind="prompt", purpose=purpose)
+    metrics.incr("llm_tokens_total", output, kind="output", purpose=purpose)
+    if thoughts:
+        metrics.incr("llm_tokens_total", thoughts, kind="thoughts", purpose=purpose)
+    if capped:
+        metrics.incr("llm_output_capped_total", purpose=purpose)
+
+    call = {
+        "purpose": purpose, "prompt": prompt, "output": output, "thoughts": thoughts,
+        "max_output": config.get("max_output_tokens"), "capped": capped, "estimated": estimated,
+    }
+    u = _current.get()
+    if u is not None:
+        u.calls.append(call)
+    return call
+
+log = logging.getLogger("binara.usage")
+
+def _logger() -> logging.Logger:
+    # app nggak punya konfigurasi logging; pasang handler sendiri biar baris
+    # usage tetap keluar di log Vercel tanpa nyalain INFO global (SQLAlchemy dkk)
+    if not log.handlers:
+        h = logging.StreamHandler()
+        h.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(h)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+    return log
+
+def finish_request(u: RequestUsage, intent: Optional[str], in_scope: bool, source: Optional[str] = None) -> dict:
+    if source is None:
+        # run_chat nggak bawa source: cukup bedain kena LLM atau nggak (router/template/cache)
+        source = "llm" if u.calls else "local"
+    summary = {
+        "kost_id": u.kost_id,
+        "intent": intent,
+        "in_scope": in_scope,
+        "source": source,
+        "context_tokens": u.context_tokens,
+        "rows_dropped": u.rows_dropped,
+        "llm_calls": len(u.calls),
+        "prompt_tokens": sum(c["prompt"] for c in u.calls),
+        "output_tokens": sum(c["output"] for c in u.calls),
+        "thoughts_tokens": sum(c["thoughts"] for c in u.calls),
+        "capped": any(c["capped"] for c in u.calls),
+        "ms": round((time.perf_counter() - u.started) * 1000, 1),
+    }
+    metrics.incr("chat_usage_requests_total", intent=str(intent))
+    if os.getenv("USAGE_LOG", "1") not in ("0", "false", "False"):
+        _logger().info(dumps_str({"event": "chat_usage", **summary}))
+    return summary
+
+def usage_stats() -> dict:
+    purposes = ("classify", "answer", "combined")
+    return {
+        "tokens": {
+            p: {k: metrics.get("llm_tokens_total", kind=k, purpose=p) for k in ("prompt", "output", "thoughts")}
+            for p in purposes
+        },
+        "output_capped": {p: metrics.get("llm_output_capped_total", purpose=p) for p in purposes},
+        "context_tokens": metrics.get("context_tokens_total"),
+        "context_rows_truncated": metrics.get("context_rows_truncated_total"),
+        "budgets": {str(i) if i else "single_pass": [budget_for(i).context, budget_for(i).output] for i in BUDGETS},
+    }
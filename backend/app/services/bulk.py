@@ -0,0 +1,199 @@
+"""
+Import/export massal buat admin (rooms, facilities, rules, nearby).
+
+Import: body CSV (header di baris pertama) atau NDJSON (1 objek JSON per
+baris), di-insert pakai executemany per batch dalam SATU transaksi -- gagal
+satu, batal semua. Export: stream halaman demi halaman pakai keyset
+(`id > :after ORDER BY id`), bukan OFFSET.
+"""
+
+import io
+import csv
+import json
+from typing import Any, Iterable, Iterator, Optional
+
+from sqlalchemy import text, bindparam
+from sqlalchemy.orm import Session
+
+from app.services.rooms import load_room_facilities
+from app.services.serialize import dumps, json_safe
+
+BATCH_SIZE = 1000
+EXPORT_PAGE_SIZE = 500
+
+ROOM_COLUMNS = [
+    "kost_id", "code", "price_monthly", "deposit", "electricity_included",
+    "electricity_note", "size_m2", "is_available", "notes",
+]
+
+TABLES = {
+    "facilities": {
+        "table": "facility",
+        "columns": ["name"],
+        "export": ["id", "name"],
+        "per_kost": False,
+    },
+    "rooms": {
+        "table": "room",
+        "columns": ROOM_COLUMNS,
+        "export": ["id", *ROOM_COLUMNS],
+        "per_kost": True,
+    },
+    "rules": {
+        "table": "rule",
+        "columns": ["kost_id", "title", "description"],
+        "export": ["id", "kost_id", "title", "description"],
+        "per_kost": True,
+    },
+    "nearby": {
+        "table": "nearby_place",
+        "columns": ["kost_id", "category", "name", "address", "distance_m", "maps_url", "note"],
+        "export": ["id", "kost_id", "category", "name", "address", "distance_m", "maps_url", "note"],
+        "per_kost": True,
+    },
+}
+
+# ---------- parsing ----------
+def detect_format(content_type: Optional[str], fmt: Optional[str] = None) -> str:
+    if fmt:
+        return fmt.lower()
+    ct = (content_type or "").lower()
+    if "csv" in ct:
+        return "csv"
+    return "ndjson"
+
+def _csv_value(v: str) -> Any:
+    # CSV semuanya string; kosong = None biar default/Optional di schema kepakai
+    return None if v == "" else v
+
+def parse_records(body: bytes, fmt: str) -> Iterator[tuple[int, dict]]:
+    """Yield (nomor baris, dict mentah)."""
+    textio = io.StringIO(body.decode("utf-8-sig"))
+    if fmt == "csv":
+        reader = csv.DictReader(textio)
+        for row in reader:
+            rec = {k.strip(): _csv_value(v) for k, v in row.items() if k}
+            # facility_ids di CSV: "1|2|3"
+            if isinstance(rec.get("facility_ids"), str):
+                rec["facility_ids"] = [int(x) for x in rec["facility_ids"].split("|") if x.strip()]
+            yield reader.line_num, {k: v for k, v in rec.items() if v is not None}
+        return
+
+    for i, line in enumerate(textio, start=1):
+        line = line.strip()
+        if line:
+            yield i, json.loads(line)
+
+# ---------- import ----------
+def _batches(rows: list, size: int = BATCH_SIZE) -> Iterable[list]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+def _insert_sql(entity: str) -> str:
+    spec = TABLES[entity]
+    cols = spec["columns"]
+    return f"INSERT INTO {spec['table']} ({', '.join(cols)}) VALUES ({', '.join(':' + c for c in cols)})"
+
+def insert_rows(db: Session, entity: str, rows: list[dict]) -> int:
+    """
+    rows = dict yang udah tervalidasi (kolom sesuai TABLES[entity]["columns"],
+    plus facility_ids buat rooms). Caller yang commit/rollback.
+    """
+    sql = text(_insert_sql(entity))
+    cols = TABLES[entity]["columns"]
+    for batch in _batches(rows):
+        db.execute(sql, [{c: r.get(c) for c in cols} for r in batch])
+
+    if entity == "rooms":
+        link_room_facilities(db, rows)
+    return len(rows)
+
+ROOM_IDS_SQL = text("""
+    SELECT id, code
+    FROM room
+    WHERE kost_id = :kost_id AND code IN :codes
+    ORDER BY id ASC
+""").bindparams(bindparam("codes", expanding=True))
+
+def link_room_facilities(db: Session, rows: list[dict]) -> None:
+    """
+    Cari id room yang baru di-insert (per kost + code), lalu insert room_facility
+    sekaligus. (kost_id, code) harus unik di dalam rows -- dicek admin_import.
+    """
+    by_kost: dict[int, list[str]] = {}
+    for r in rows:
+        if r.get("facility_ids"):
+            by_kost.setdefault(r["kost_id"], []).append(r["code"])
+    if not by_kost:
+        return
+
+    ids: dict[tuple[int, str], int] = {}
+    for kost_id, codes in by_kost.items():
+        for batch in _batches(codes):
+            for x in db.execute(ROOM_IDS_SQL, {"kost_id": kost_id, "codes": batch}).mappings():
+                # code yang udah ada di DB sebelumnya -> ambil id terbesar (= hasil import ini)
+                ids[(kost_id, x["code"])] = x["id"]
+
+    links = [
+        {"room_id": ids[(r["kost_id"], r["code"])], "facility_id": fid}
+        for r in rows
+        for fid in (r.get("facility_ids") or [])
+    ]
+    sql = text("INSERT INTO room_facility (room_id, facility_id) VALUES (:room_id, :facility_id)")
+    for batch in _batches(links):
+        db.execute(sql, batch)
+
+# ---------- export ----------
+def export_pages(db: Session, entity: str, kost_id: Optional[int]) -> Iterator[list[dict]]:
+    spec = TABLES[entity]
+    where = "id > :after"
+    params: dict[str, Any] = {"after": 0, "limit": EXPORT_PAGE_SIZE}
+    if spec["per_kost"] and kost_id is not None:
+        where += " AND kost_id = :kost_id"
+        params["kost_id"] = kost_id
+
+    sql = text(f"""
+        SELECT {', '.join(spec['export'])}
+        FROM {spec['table']}
+        WHERE {where}
+        ORDER BY id ASC
+        LIMIT :limit
+    """)
+
+    while True:
+        rows = [dict(r) for r in db.execute(sql, params).mappings().all()]
+        if not rows:
+            return
+        if entity == "rooms":
+            fac = load_room_facilities(db, [r["id"] for r in rows])
+            for r in rows:
+                r["facility_ids"] = [f["id"] for f in fac.get(r["id"], [])]
+        yield rows
+        if len(rows) < EXPORT_PAGE_SIZE:
+            return
+        params["after"] = rows[-1]["id"]
+
+def render_ndjson(pages: Iterable[list[dict]]) -> Iterator[bytes]:
+    for rows in pages:
+        yield b"".join(dumps(r) + b"\n" for r in rows)
+
+def render_csv(pages: Iterable[list[dict]], columns: list[str]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(columns)
+    for rows in pages:
+        for r in rows:
+            vals = []
+            for c in columns:
+                v = r.get(c)
+                vals.append("|".join(map(str, v)) if isinstance(v, list) else ("" if v is None else json_safe(v)))
+            w.writerow(vals)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+def export_columns(entity: str) -> list[str]:
+    cols = list(TABLES[entity]["export"])
+    return cols + ["facility_ids"] if entity == "rooms" else cols
@@ -1,91 +1,206 @@
-import os
-import json
-from google import genai
-from google.genai.errors import ClientError
-
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-
-SYSTEM = """
-Kamu adalah asisten Kost Binara. Jawab hanya berdasarkan CONTEXT.
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+from pydantic import BaseModel
+
+from app.services.guardrail import Intent, local_classify
+from app.services.answer import narrow_context
+from app.services import answer_cache, budget, metrics, llm
+from app.services.llm import LLMUnavailable
+from app.services.serialize import dumps_str
+from app.services.tenants import Tenant, DEFAULT_TENANT
+from app.services.templates import fallback_answer
+
+# {name} = nama kost tenant; prompt per tenant di-cache lewat system_for()
+SYSTEM_TEMPLATE = """
+Kamu adalah asisten {name}. Jawab hanya berdasarkan CONTEXT.
 Kalau data tidak ada di context, bilang tidak tersedia dan sarankan hubungi pemilik kost.
 Jawaban harus jelas, tidak terlalu singkat, dan pakai bahasa Indonesia natural.
 """
 
-def generate_answer(question: str, context: dict) -> str:
-    ctx_json = json.dumps(context, ensure_ascii=False, default=str)
+def context_block(context: dict, context_text: Optional[str] = None) -> str:
+    # snapshot ringkas (lihat services/snapshot.py) kalau ada, JSON mentah kalau nggak
+    if context_text is not None:
+        return f"CONTEXT:\n{context_text}"
+    return "CONTEXT (JSON):\n" + dumps_str(context)
+
+def history_block(history: str) -> str:
+    if not history:
+        return ""
+    return f"\nRIWAYAT PERCAKAPAN (buat pertanyaan lanjutan):\n{history}\n"
+
+def cache_basis(context: dict, context_text: Optional[str], history: str):
+    """Bagian "versi data" buat key answer_cache: context + history (kalau ada)."""
+    if context_text is None and not history:
+        return context
+    base = context_text if context_text is not None else dumps_str(context)
+    return f"{base}\n{history}" if history else base
+
+def answer_prompt(question: str, context: dict, context_text: Optional[str] = None, history: str = "") -> str:
+    return f"""
+{context_block(context, context_text)}
+{history_block(history)}
+USER QUESTION:
+{question}
 
-    prompt = f"""
-CONTEXT (JSON):
-{ctx_json}
+INSTRUKSI:
+- Jawab hanya pakai info dari CONTEXT.
+- Kalau tidak ada datanya, bilang "datanya belum tersedia".
+- Jawaban informatif, boleh bullet.
+"""
+
+@lru_cache(maxsize=256)
+def system_for(name: str, template: str = "answer") -> str:
+    return (SYSTEM_TEMPLATE if template == "answer" else COMBINED_TEMPLATE).format(name=name)
+
+def answer_config(tenant: Tenant = DEFAULT_TENANT, intent: Optional[str] = None) -> dict:
+    # max_output_tokens per intent (services/budget.py)
+    return {"system_instruction": system_for(tenant.name), "temperature": 0.3, **budget.output_config(intent)}
+
+async def generate_answer(
+    question: str,
+    context: dict,
+    intent: Optional[str] = None,
+    context_text: Optional[str] = None,
+    history: str = "",
+    tenant: Tenant = DEFAULT_TENANT,
+) -> str:
+    # cache cuma dipakai kalau intent-nya jelas (bagian dari key)
+    cache_key = None
+    if intent:
+        hit, cache_key = await answer_cache.lookup(
+            question, intent, cache_basis(context, context_text, history), tenant=tenant.kost_id
+        )
+        if hit is not None:
+            return hit
 
+    try:
+        resp = await llm.generate(
+            answer_prompt(question, context, context_text, history),
+            config=answer_config(tenant, intent),
+            kost_id=tenant.kost_id,
+        )
+    except LLMUnavailable:
+        metrics.incr("fallback_total", kind="fallback_answer")
+        return fallback_answer(context, intent)
+
+    answer = getattr(resp, "text", None)
+    if not answer:
+        # respon kosong (kepotong MAX_TOKENS / diblok safety): jangan kirim repr objek ke user
+        metrics.incr("fallback_total", kind="fallback_answer")
+        return fallback_answer(context, intent)
+    await answer_cache.store(cache_key, answer, tenant=tenant.kost_id)
+    return answer
+
+async def stream_answer(
+    question: str,
+    context: dict,
+    intent: Optional[str] = None,
+    context_text: Optional[str] = None,
+    history: str = "",
+    tenant: Tenant = DEFAULT_TENANT,
+) -> AsyncIterator[tuple[str, str]]:
+    """
+    Versi streaming generate_answer. Yield (source, potongan teks);
+    source = "cache" | "llm" | "fallback".
+    """
+    cache_key = None
+    if intent:
+        hit, cache_key = await answer_cache.lookup(
+            question, intent, cache_basis(context, context_text, history), tenant=tenant.kost_id
+        )
+        if hit is not None:
+            yield "cache", hit
+            return
+
+    parts: list[str] = []
+    try:
+        prompt = answer_prompt(question, context, context_text, history)
+        async for chunk in llm.generate_stream(prompt, config=answer_config(tenant, intent), kost_id=tenant.kost_id):
+            piece = getattr(chunk, "text", None)
+            if piece:
+                parts.append(piece)
+                yield "llm", piece
+
+    except LLMUnavailable:
+        # kalau udah sempat ada token, jangan campur sama jawaban fallback
+        if parts:
+            raise
+        metrics.incr("fallback_total", kind="fallback_answer")
+        yield "fallback", fallback_answer(context, intent)
+        return
+
+    if not parts:
+        # stream selesai tanpa teks sama sekali (sama kayak generate_answer)
+        metrics.incr("fallback_total", kind="fallback_answer")
+        yield "fallback", fallback_answer(context, intent)
+        return
+
+    await answer_cache.store(cache_key, "".join(parts), tenant=tenant.kost_id)
+
+class CombinedResult(BaseModel):
+    in_scope: bool
+    intent: Intent
+    answer: str
+
+COMBINED_TEMPLATE = """
+Kamu adalah asisten {name} sekaligus classifier ketat.
+
+BOLEH: pertanyaan tentang {name} (alamat, kamar, harga, fasilitas, aturan, pembayaran, biaya tambahan, kontak, tipe kost, laundry terdekat).
+TOLAK: pertanyaan di luar itu (politik, pelajaran umum, coding umum, kos lain, dll).
+Kalau user nanya "banjir", itu dianggap OUT OF SCOPE (fitur banjir belum tersedia).
+
+Kalau in_scope: jawab hanya berdasarkan CONTEXT. Kalau data tidak ada di context, bilang tidak tersedia dan sarankan hubungi pemilik kost.
+Jawaban harus jelas, tidak terlalu singkat, dan pakai bahasa Indonesia natural.
+Kalau tidak in_scope: isi answer dengan string kosong.
+
+Balas harus JSON sesuai schema: {{ "in_scope": true/false, "intent": "...", "answer": "..." }}
+"""
+
+async def classify_and_answer(
+    question: str,
+    context: dict,
+    context_text: Optional[str] = None,
+    history: str = "",
+    tenant: Tenant = DEFAULT_TENANT,
+) -> CombinedResult:
+    """
+    Mode single-pass: klasifikasi + jawaban dalam satu call Gemini.
+    context = superset dari fetch_context(intent=None).
+    """
+    prompt = f"""
+{context_block(context, context_text)}
+{history_block(history)}
 USER QUESTION:
 {question}
 
 INSTRUKSI:
-- Jawab hanya pakai info dari CONTEXT.
+- Tentukan in_scope dan intent dulu.
+- Kalau in_scope, jawab hanya pakai info dari CONTEXT yang relevan dengan intent.
 - Kalau tidak ada datanya, bilang "datanya belum tersedia".
 - Jawaban informatif, boleh bullet.
 """
 
     try:
-        resp = client.models.generate_content(
-            model=os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
-            contents=prompt,
-            config={"system_instruction": SYSTEM, "temperature": 0.3},
+        resp = await llm.generate(
+            prompt,
+            kost_id=tenant.kost_id,
+            purpose="combined",
+            config={
+                "system_instruction": system_for(tenant.name, "combined"),
+                "response_mime_type": "application/json",
+                "response_schema": CombinedResult,
+                "temperature": 0.2,
+                **budget.output_config(None),
+            },
         )
-        return getattr(resp, "text", None) or str(resp)
-
-    except ClientError as e:
-        if getattr(e, "status_code", None) == 429 or "RESOURCE_EXHAUSTED" in str(e):
-            return fallback_answer(question, context)
-        raise
-
-def fallback_answer(question: str, context: dict) -> str:
-    kost = context.get("kost") or {}
-    rooms = context.get("rooms") or []
-    rules = context.get("rules") or []
-    payments = context.get("payments") or []
-    laundry = context.get("nearby_laundry") or []
-
-    lines = []
-    if kost:
-        lines.append(f"**{kost.get('name','Kost Binara')}**")
-        if kost.get("address"): lines.append(f"📍 Alamat: {kost['address']}")
-        if kost.get("whatsapp"): lines.append(f"💬 WhatsApp: {kost['whatsapp']}")
-        if kost.get("google_maps_url"): lines.append(f"🗺️ Maps: {kost['google_maps_url']}")
-        if kost.get("visiting_hours"): lines.append(f"🕘 Jam kunjungan: {kost['visiting_hours']}")
-        lines.append("")
-
-    if rooms:
-        lines.append("🏠 **Kamar (ringkas):**")
-        for r in rooms[:6]:
-            code = r.get("code","-")
-            price = r.get("price_monthly") or r.get("price") or ""
-            fac = r.get("facilities") or ""
-            avail = "Tersedia" if r.get("is_available") else "Penuh"
-            lines.append(f"- {code} — {avail} — {price} {('• '+fac) if fac else ''}")
-        lines.append("")
-
-    if rules:
-        lines.append("📌 **Aturan (ringkas):**")
-        for rr in rules[:6]:
-            lines.append(f"- {rr.get('title','-')}: {rr.get('description','')}".strip())
-        lines.append("")
-
-    if payments:
-        lines.append("💳 **Pembayaran:**")
-        for p in payments[:6]:
-            lines.append(f"- {p.get('scheme','-')}: {p.get('description','')}".strip())
-        lines.append("")
-
-    if laundry:
-        lines.append("🧺 **Laundry terdekat:**")
-        for x in laundry[:5]:
-            d = f"{x.get('distance_m')} m" if x.get("distance_m") else ""
-            lines.append(f"- {x.get('name','-')} • {d} • {x.get('address','')}".strip())
-        lines.append("")
-
-    if not lines:
-        return "Quota Gemini lagi habis, dan data kost di database belum tersedia. Isi tabel kost/room dulu ya."
-
-    return "\n".join(lines)
\ No newline at end of file
+        result = resp.parsed
+        if not isinstance(result, CombinedResult):
+            raise ValueError("Respon single-pass Gemini tidak sesuai schema")
+        return result
+
+    except LLMUnavailable:
+        metrics.incr("fallback_total", kind="local_classify")
+        metrics.incr("fallback_total", kind="fallback_answer")
+        g = local_classify(question)
+        answer = fallback_answer(narrow_context(context, g.intent), g.intent) if g.in_scope else ""
+        return CombinedResult(in_scope=g.in_scope, intent=g.intent, answer=answer)
@@ -1,11 +1,11 @@
-import os
-import re
-from typing import Literal
+from functools import lru_cache
+from typing import Literal, get_args
 from pydantic import BaseModel
-from google import genai
-from google.genai.errors import ClientError
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+from app.services import budget, metrics, llm
+from app.services.intent_matcher import OOS, match
+from app.services.llm import LLMUnavailable
+from app.services.tenants import Tenant, DEFAULT_TENANT
 
 Intent = Literal[
   "alamat", "kamar_tersedia", "harga", "fasilitas", "kontak",
@@ -17,75 +17,61 @@ class GuardrailResult(BaseModel):
   in_scope: bool
   intent: Intent
 
-SYSTEM = """
-Lo classifier ketat untuk chatbot Kost Binara.
+# {name} = nama kost tenant (lihat services/tenants.py)
+SYSTEM_TEMPLATE = """
+Lo classifier ketat untuk chatbot {name}.
 
-BOLEH: pertanyaan tentang Kost Binara (alamat, kamar, harga, fasilitas, aturan, pembayaran, biaya tambahan, kontak, tipe kost, laundry terdekat).
+BOLEH: pertanyaan tentang {name} (alamat, kamar, harga, fasilitas, aturan, pembayaran, biaya tambahan, kontak, tipe kost, laundry terdekat).
 TOLAK: pertanyaan di luar itu (politik, pelajaran umum, coding umum, kos lain, dll).
 Kalau user nanya "banjir", itu dianggap OUT OF SCOPE (fitur banjir belum tersedia).
-Balas harus JSON sesuai schema: { "in_scope": true/false, "intent": "..." }
+Balas harus JSON sesuai schema: {{ "in_scope": true/false, "intent": "..." }}
 """
 
-def classify(question: str) -> GuardrailResult:
+@lru_cache(maxsize=256)
+def system_for(name: str) -> str:
+  return SYSTEM_TEMPLATE.format(name=name)
+
+async def classify(question: str, tenant: Tenant = DEFAULT_TENANT) -> GuardrailResult:
   try:
-    resp = client.models.generate_content(
-      model=os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
-      contents=question,
+    resp = await llm.generate(
+      question,
+      kost_id=tenant.kost_id,
+      purpose="classify",
       config={
-        "system_instruction": SYSTEM,
+        "system_instruction": system_for(tenant.name),
         "response_mime_type": "application/json",
         "response_schema": GuardrailResult,
         "temperature": 0.0,
+        **budget.classify_config(),
       },
     )
-    return resp.parsed
-
-  except ClientError as e:
-    # Quota / rate limit
-    if getattr(e, "status_code", None) == 429 or "RESOURCE_EXHAUSTED" in str(e):
-      # fallback lokal: jangan bikin server 500
-      return local_classify(question)
-
-    raise
+    result = resp.parsed
+    # respon kepotong (MAX_TOKENS, mis. kemakan token thinking) / JSON nggak
+    # sesuai schema -> parsed None; perlakukan kayak LLM nggak bisa dipakai
+    if not isinstance(result, GuardrailResult) or "MAX_TOKENS" in budget.finish_reason(resp):
+      metrics.incr("llm_calls_total", outcome="unparsed")
+      raise LLMUnavailable("unparsed")
+    return result
+
+  except LLMUnavailable:
+    # Quota / rate limit / breaker open: fallback lokal, jangan bikin server 500
+    metrics.incr("router_tier_total", tier="fallback_local")
+    metrics.incr("fallback_total", kind="local_classify")
+    return local_classify(question)
+
+# hasil local_classify dipakai ulang (read-only), nggak bikin model pydantic per pesan
+_OUT_OF_SCOPE = GuardrailResult(in_scope=False, intent="lainnya")
+_IN_SCOPE = {i: GuardrailResult(in_scope=True, intent=i) for i in get_args(Intent)}
 
 def local_classify(q: str) -> GuardrailResult:
-  s = q.lower()
-
-  # out of scope keywords
-  oos = [
-    "politik", "presiden", "drakor", "minecraft", "tugas", "koding", "python",
-    "nextjs", "skripsi", "matematika", "crypto", "game", "film"
-  ]
-  if any(k in s for k in oos):
-    return GuardrailResult(in_scope=False, intent="lainnya")
-
-  # banjir: lo bilang belum dipakai => out of scope
-  if "banjir" in s:
-    return GuardrailResult(in_scope=False, intent="lainnya")
-
-  # intents sederhana
-  if any(k in s for k in ["alamat", "lokasi", "jalan", "dimana"]):
-    return GuardrailResult(in_scope=True, intent="alamat")
-
-  if any(k in s for k in ["wa", "whatsapp", "kontak", "nomor", "telp", "telepon"]):
-    return GuardrailResult(in_scope=True, intent="kontak")
-
-  if any(k in s for k in ["kamar", "tersedia", "kosong"]):
-    return GuardrailResult(in_scope=True, intent="kamar_tersedia")
-
-  if any(k in s for k in ["harga", "biaya", "sewa", "rp"]):
-    return GuardrailResult(in_scope=True, intent="harga")
-
-  if any(k in s for k in ["fasilitas", "ac", "wifi", "kamar mandi", "kasur"]):
-    return GuardrailResult(in_scope=True, intent="fasilitas")
-
-  if any(k in s for k in ["aturan", "peraturan", "jam malam", "tamu", "rokok"]):
-    return GuardrailResult(in_scope=True, intent="aturan")
-
-  if any(k in s for k in ["bayar", "bulanan", "tahunan", "deposit", "listrik"]):
-    return GuardrailResult(in_scope=True, intent="pembayaran")
+  # skor dari intent_matcher (tabel frasa yang sama dengan router lokal).
+  # Beda sama router: di sini selalu harus ada jawaban, nggak ada "nggak yakin".
+  m = match(q)
+  intent, _ = m.best_in_scope()
 
-  if "laundry" in s:
-    return GuardrailResult(in_scope=True, intent="laundry_terdekat")
+  # keyword out-of-scope (termasuk "banjir", fitur belum ada) cuma nolak kalau
+  # nggak ada intent kost yang match ("boleh main game sampai malam?" = aturan)
+  if intent is None and OOS in m.scores:
+    return _OUT_OF_SCOPE
 
-  return GuardrailResult(in_scope=True, intent="lainnya")
\ No newline at end of file
+  return _IN_SCOPE[intent or "lainnya"]
@@ -0,0 +1,174 @@
+"""
+Matcher keyword intent lokal, dipakai bareng router (tier 1) dan local_classify
+(fallback waktu Gemini nggak bisa dipanggil).
+
+1. normalize(): lowercase, huruf dobel ("kosonggg"), slang/singkatan
+   ("brp", "hrg", "londri"), buang akhiran -nya/-kah/-lah.
+2. Semua frasa di WEIGHTS dikompilasi jadi SATU regex dengan word boundary.
+   Lookahead bikin tiap posisi kata dapat frasa terpanjang yang cocok
+   ("kamar mandi" ngalahin "kamar"), dan "wa" nggak lagi nyangkut di "kawan".
+3. Skor per intent = jumlah bobot frasa yang ketemu -> IntentScores (multi-intent).
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+OOS = "__out_of_scope__"
+
+# frasa -> {intent: bobot}; frasa ditulis apa adanya, dinormalisasi waktu compile
+WEIGHTS: dict[str, dict[str, float]] = {}
+
+def _add(intent: str, weight: float, *grams: str) -> None:
+    for g in grams:
+        WEIGHTS.setdefault(g, {})[intent] = weight
+
+_add("alamat", 3.0, "alamat", "lokasi", "dimana", "lokasinya", "alamatnya", "maps", "gmaps", "rute")
+_add("alamat", 1.5, "di mana", "letak", "jalan", "arah")
+
+_add("kontak", 3.0, "whatsapp", "kontak", "telepon", "telp", "nomor wa", "no wa", "nomor hp", "no hp", "pemilik", "ibu kost", "bapak kost")
+_add("kontak", 1.5, "wa", "nomor", "hubungi", "call")
+
+_add("kamar_tersedia", 3.0, "tersedia", "kosong", "available", "kamar kosong", "masih ada")
+_add("kamar_tersedia", 1.5, "kamar", "sisa", "ready")
+
+_add("harga", 3.0, "harga", "harganya", "berapa harga", "sewa", "tarif", "per bulan", "perbulan")
+_add("harga", 1.5, "berapa", "rp", "murah", "mahal")
+
+_add("fasilitas", 3.0, "fasilitas", "fasilitasnya", "wifi", "ac", "kamar mandi", "kasur", "lemari", "kipas", "kamar mandi dalam")
+_add("fasilitas", 1.5, "dapat apa", "isi kamar", "meja", "tempat", "ruang", "belajar")
+
+_add("pembayaran", 3.0, "bayar", "pembayaran", "transfer", "cicil", "dp", "tahunan", "bulanan")
+_add("pembayaran", 1.5, "rekening", "qris", "tunai", "cash")
+
+_add("biaya_tambahan", 3.0, "biaya tambahan", "tambahan", "listrik", "token", "air", "denda")
+_add("biaya_tambahan", 1.5, "biaya", "deposit", "admin")
+
+_add("aturan", 3.0, "aturan", "peraturan", "jam malam", "tamu", "rokok", "merokok", "larangan", "dilarang")
+_add("aturan", 1.5, "boleh", "menginap", "hewan", "pacar")
+
+_add("tipe_kost", 3.0, "putra", "putri", "campur", "pasutri", "tipe kost", "kost cewek", "kost cowok")
+_add("tipe_kost", 1.5, "tipe", "cewek", "cowok", "khusus")
+
+_add("laundry_terdekat", 3.0, "laundry", "londri", "cuci baju", "binatu")
+_add("laundry_terdekat", 1.5, "cuci", "setrika")
+
+_add("lainnya", 2.0, "booking", "survei", "survey", "promo", "diskon", "parkir")
+
+_add(OOS, 4.0,
+     "politik", "presiden", "drakor", "minecraft", "tugas", "koding", "python",
+     "nextjs", "skripsi", "matematika", "crypto", "game", "film", "banjir")
+
+# slang/singkatan chat -> bentuk baku (per token, setelah lowercase)
+SLANG = {
+    "brp": "berapa", "brapa": "berapa", "hrg": "harga", "hrga": "harga",
+    "almt": "alamat", "dmn": "dimana", "dmana": "dimana", "dimn": "dimana",
+    "kmr": "kamar", "kmar": "kamar", "wc": "kamar mandi",
+    "fasil": "fasilitas", "nmr": "nomor", "tlp": "telp", "tlpn": "telp", "telfon": "telepon",
+    "whatsap": "whatsapp", "watsap": "whatsapp", "wasap": "whatsapp",
+    "londri": "laundry", "loundry": "laundry", "laundri": "laundry",
+    "byr": "bayar", "bln": "bulan", "perbln": "perbulan", "thn": "tahun",
+    "tf": "transfer", "trf": "transfer", "trnsfer": "transfer",
+    "kos": "kost", "kosan": "kost", "kostan": "kost", "kossan": "kost",
+    "cowo": "cowok", "cewe": "cewek", "ngerokok": "merokok", "nginep": "menginap",
+    "gk": "nggak", "ga": "nggak", "gak": "nggak", "tdk": "nggak",
+}
+
+SUFFIXES = ("nya", "kah", "lah")
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+REPEAT_RE = re.compile(r"([a-z])\1{2,}")
+
+@lru_cache(maxsize=8192)
+def _token(t: str) -> str:
+    # di-cache: kosakata chat kecil, token yang sama muncul terus
+    t = REPEAT_RE.sub(r"\1", t)
+    t = SLANG.get(t, t)
+    for suf in SUFFIXES:
+        # "kamarnya" -> "kamar", "kosnya" -> "kost"; kata pendek ("punya") dibiarin
+        stem = t[: -len(suf)]
+        if t.endswith(suf) and (len(stem) >= 4 or stem in SLANG):
+            t = SLANG.get(stem, stem)
+            break
+    return t
+
+def normalize(q: str) -> str:
+    return " ".join(map(_token, TOKEN_RE.findall(q.lower())))
+
+def _trie_regex(words: list[str]) -> str:
+    """
+    Alternation dalam bentuk trie ("ka(?:mar(?: mandi)?|...)") -- regex Python
+    nyoba alternatif satu-satu, jadi prefix bersama cukup dicek sekali.
+    Lanjutan frasa dicoba sebelum berhenti -> frasa terpanjang yang menang.
+    """
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        alt = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # node ini juga akhir frasa ("kamar"): coba lanjut ("kamar mandi") dulu,
+        # kalau word boundary di luar gagal, regex mundur ke alternatif kosong
+        return f"(?:{alt}|)" if "" in node else alt
+
+    return build(trie)
+
+def _compile(weights: dict[str, dict[str, float]]):
+    table: dict[str, dict[str, float]] = {}
+    for gram, ws in weights.items():
+        # "alamatnya" & "alamat" jatuh ke kunci yang sama -> ambil bobot terbesar
+        slot = table.setdefault(normalize(gram), {})
+        for intent, w in ws.items():
+            slot[intent] = max(slot.get(intent, 0.0), w)
+    # lookahead: tiap awal kata dapat satu frasa (terpanjang), frasa boleh tumpang tindih
+    pattern = re.compile(r"(?<![a-z0-9])(?=(" + _trie_regex(list(table)) + r")(?![a-z0-9]))")
+    return table, pattern
+
+TABLE, PATTERN = _compile(WEIGHTS)
+
+@dataclass
+class IntentScores:
+    scores: dict[str, float]
+    hits: tuple[str, ...]
+
+    @property
+    def ranked(self) -> list[tuple[str, float]]:
+        return sorted(self.scores.items(), key=lambda kv: kv[1], reverse=True)
+
+    @property
+    def top(self) -> tuple[Optional[str], float]:
+        r = self.ranked
+        return r[0] if r else (None, 0.0)
+
+    @property
+    def margin(self) -> float:
+        r = self.ranked
+        if not r:
+            return 0.0
+        return r[0][1] - (r[1][1] if len(r) > 1 else 0.0)
+
+    def best_in_scope(self) -> tuple[Optional[str], float]:
+        best, top = None, 0.0
+        for intent, s in self.scores.items():
+            # ">" bukan ">=": kalau seri, frasa yang muncul duluan di pesan menang
+            if intent != OOS and s > top:
+                best, top = intent, s
+        return best, top
+
+def match(q: str) -> IntentScores:
+    hits = PATTERN.findall(normalize(q))
+    scores: dict[str, float] = {}
+    for h in hits:
+        for intent, w in TABLE[h].items():
+            scores[intent] = scores.get(intent, 0.0) + w
+    return IntentScores(scores=scores, hits=tuple(hits))
+
+def score(q: str) -> dict[str, float]:
+    return match(q).scores
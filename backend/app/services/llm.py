@@ -0,0 +1,265 @@
+"""
+Gerbang tunggal ke Gemini: rate limiter token-bucket + circuit breaker.
+
+Semua call (classify, generate_answer, single-pass, streaming) lewat sini.
+Kalau kuota lokal habis atau breaker lagi open, langsung raise LLMUnavailable
+tanpa nembak jaringan -- caller tinggal jatuh ke local_classify/fallback_answer.
+
+Env:
+  GEMINI_RPM=60            request per menit
+  GEMINI_TPM=250000        token (estimasi) per menit
+  GEMINI_TENANT_RPM=30     jatah per kost (tenant) dari kuota di atas, biar satu
+  GEMINI_TENANT_TPM=125000 kost yang rame nggak ngabisin kuota kost lain
+  BREAKER_FAILURES=3       429/5xx beruntun sebelum breaker open
+  BREAKER_COOLDOWN=30      detik breaker open sebelum half-open (1 probe)
+
+google.genai baru di-import waktu call pertama (get_client), jadi cold start
+endpoint yang nggak nyentuh LLM (health, public) nggak bayar import SDK-nya.
+"""
+
+import os
+import time
+import threading
+from typing import AsyncIterator, Optional
+
+from app.services import budget, metrics
+from app.services.tokens import estimate_tokens
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Client Gemini bersama, dibikin (plus import SDK) waktu pertama dipakai."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google import genai
+                _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    return _client
+
+def set_client(client) -> None:
+    """Ganti client (mis. FakeGemini di bench/) tanpa pernah import SDK asli."""
+    global _client
+    _client = client
+
+def model_name() -> str:
+    return os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+
+class LLMUnavailable(Exception):
+    """Call Gemini nggak dilakukan / gagal karena kuota atau upstream down."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+def is_quota_error(e: Exception) -> bool:
+    return getattr(e, "status_code", None) == 429 or getattr(e, "code", None) == 429 or "RESOURCE_EXHAUSTED" in str(e)
+
+def is_server_error(e: Exception) -> bool:
+    code = getattr(e, "code", None) or getattr(e, "status_code", None)
+    return isinstance(code, int) and code >= 500
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def available(self, now: float) -> float:
+        self._refill(now)
+        return self.tokens
+
+class RateLimiter:
+    """RPM + TPM diambil bareng: dua-duanya cukup, baru dikurangi."""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            # request yang lebih gede dari kapasitas TPM tetap boleh lewat kalau bucket penuh
+            need = min(tokens, self.tpm.capacity)
+            if self.rpm.available(now) < 1 or self.tpm.available(now) < need:
+                return False
+            self.rpm.tokens -= 1
+            self.tpm.tokens -= need
+            return True
+
+    def refund(self, tokens: int) -> None:
+        # dipakai kalau limiter lain (global) nolak setelah yang ini udah ke-charge
+        with self._lock:
+            self.rpm.tokens = min(self.rpm.capacity, self.rpm.tokens + 1)
+            self.tpm.tokens = min(self.tpm.capacity, self.tpm.tokens + min(tokens, self.tpm.capacity))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+class CircuitBreaker:
+    def __init__(self, failures: int, cooldown: float):
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == HALF_OPEN and not self.probing:
+                # cuma satu request probe; sisanya tetap fallback sampai probe selesai
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+    def release_probe(self) -> None:
+        # probe selesai tanpa vonis (error non-quota) -> kasih kesempatan probe lagi
+        with self._lock:
+            self.probing = False
+
+limiter = RateLimiter(
+    rpm=float(os.getenv("GEMINI_RPM", "60")),
+    tpm=float(os.getenv("GEMINI_TPM", "250000")),
+)
+breaker = CircuitBreaker(
+    failures=int(os.getenv("BREAKER_FAILURES", "3")),
+    cooldown=float(os.getenv("BREAKER_COOLDOWN", "30")),
+)
+
+_tenant_limiters: dict[int, RateLimiter] = {}
+_tenant_lock = threading.Lock()
+
+def tenant_limiter(kost_id: int) -> RateLimiter:
+    with _tenant_lock:
+        lim = _tenant_limiters.get(kost_id)
+        if lim is None:
+            lim = _tenant_limiters[kost_id] = RateLimiter(
+                rpm=float(os.getenv("GEMINI_TENANT_RPM", "30")),
+                tpm=float(os.getenv("GEMINI_TENANT_TPM", "125000")),
+            )
+        return lim
+
+BREAKER_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+metrics.register_gauge("gemini_breaker_state", lambda: {(): BREAKER_STATE_VALUE[breaker.state]})
+
+def _admit(contents: str, kost_id: Optional[int]) -> None:
+    if not breaker.allow():
+        metrics.incr("llm_calls_total", outcome="circuit_open")
+        raise LLMUnavailable("circuit_open")
+
+    tokens = estimate_tokens(contents)
+    # jatah kost dulu, baru kuota global; kalau global nolak, jatah kost dibalikin
+    own = tenant_limiter(kost_id) if kost_id is not None else None
+    if own is not None and not own.try_acquire(tokens):
+        breaker.release_probe()
+        metrics.incr("llm_calls_total", outcome="tenant_rate_limited")
+        raise LLMUnavailable("tenant_rate_limited")
+    if not limiter.try_acquire(tokens):
+        if own is not None:
+            own.refund(tokens)
+        # slot probe (kalau ada) dilepas lagi, request ini nggak jadi ke upstream
+        breaker.release_probe()
+        metrics.incr("llm_calls_total", outcome="rate_limited")
+        raise LLMUnavailable("rate_limited")
+
+def _is_api_error(e: Exception) -> bool:
+    # SDK pasti udah ke-import kalau error-nya datang dari call Gemini
+    from google.genai.errors import APIError
+    return isinstance(e, APIError)
+
+def _on_error(e: Exception) -> None:
+    if _is_api_error(e) and (is_quota_error(e) or is_server_error(e)):
+        breaker.record_failure()
+        outcome = "quota" if is_quota_error(e) else "server_error"
+        metrics.incr("llm_calls_total", outcome=outcome)
+        raise LLMUnavailable(outcome) from e
+    breaker.release_probe()
+    metrics.incr("llm_calls_total", outcome="error")
+
+def _on_abort() -> None:
+    # CancelledError (client putus) / GeneratorExit (consumer stream berhenti):
+    # nggak ada vonis buat upstream, tapi slot probe harus dilepas -- kalau nggak,
+    # breaker nyangkut di half_open dan LLM mati sampai proses restart
+    breaker.release_probe()
+    metrics.incr("llm_calls_total", outcome="aborted")
+
+async def generate(contents: str, config: dict, kost_id: Optional[int] = None, purpose: str = "answer"):
+    """purpose (classify/answer/combined) = label akuntansi token di services/budget.py."""
+    _admit(contents, kost_id)
+    try:
+        resp = await get_client().aio.models.generate_content(model=model_name(), contents=contents, config=config)
+    except Exception as e:
+        _on_error(e)
+        raise
+    except BaseException:
+        _on_abort()
+        raise
+    breaker.record_success()
+    metrics.incr("llm_calls_total", outcome="ok")
+    budget.record_call(purpose, contents, config, getattr(resp, "usage_metadata", None), getattr(resp, "text", None), resp)
+    return resp
+
+async def generate_stream(
+    contents: str, config: dict, kost_id: Optional[int] = None, purpose: str = "answer"
+) -> AsyncIterator:
+    _admit(contents, kost_id)
+    parts: list[str] = []
+    last = None
+    try:
+        stream = get_client().aio.models.generate_content_stream(model=model_name(), contents=contents, config=config)
+        # SDK lama: async generator langsung; SDK baru: coroutine -> async iterator
+        if hasattr(stream, "__await__"):
+            stream = await stream
+        async for chunk in stream:
+            last = chunk
+            parts.append(getattr(chunk, "text", None) or "")
+            yield chunk
+    except Exception as e:
+        _on_error(e)
+        raise
+    except BaseException:
+        _on_abort()
+        raise
+    breaker.record_success()
+    metrics.incr("llm_calls_total", outcome="ok")
+    # usage_metadata final ada di chunk terakhir
+    budget.record_call(purpose, contents, config, getattr(last, "usage_metadata", None), "".join(parts), last)
+
+def llm_stats() -> dict:
+    return {
+        "breaker": breaker.state,
+        "consecutive_failures": breaker.failures,
+        "rpm_available": round(limiter.rpm.tokens, 2),
+        "tpm_available": round(limiter.tpm.tokens, 1),
+        "tenants": {
+            kid: {"rpm_available": round(lim.rpm.tokens, 2), "tpm_available": round(lim.tpm.tokens, 1)}
+            for kid, lim in sorted(_tenant_limiters.items())
+        },
+    }
@@ -0,0 +1,145 @@
+import re
+import time
+import threading
+import contextvars
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+# metrics in-process sederhana (per worker). key = (nama, label yang di-sort)
+_lock = threading.Lock()
+_counters: dict[tuple, float] = defaultdict(float)
+
+# histogram: key -> [count per bucket..., +Inf], sum
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_hist: dict[tuple, list] = {}
+
+# gauge yang nilainya diambil pas di-scrape (mis. stat pool DB)
+_gauges: dict[str, Callable[[], dict]] = {}
+
+# durasi per stage dalam satu request, buat header Server-Timing
+_timings: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("timings", default=None)
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+def incr(name: str, n: float = 1, **labels) -> None:
+    with _lock:
+        _counters[_key(name, labels)] += n
+
+def get(name: str, **labels) -> float:
+    with _lock:
+        return _counters.get(_key(name, labels), 0)
+
+def observe(name: str, seconds: float, **labels) -> None:
+    key = _key(name, labels)
+    with _lock:
+        h = _hist.get(key)
+        if h is None:
+            h = _hist[key] = [[0] * (len(BUCKETS) + 1), 0.0]
+        h[0][bisect_left(BUCKETS, seconds)] += 1
+        h[1] += seconds
+
+def register_gauge(name: str, fn: Callable[[], dict]) -> None:
+    """fn() -> {((label, value), ...): angka}, dipanggil tiap /api/metrics di-scrape."""
+    _gauges[name] = fn
+
+# ---------- per-request timing ----------
+def start_request_timing() -> dict:
+    d: dict[str, float] = {}
+    _timings.set(d)
+    return d
+
+def add_timing(stage: str, seconds: float) -> None:
+    d = _timings.get()
+    if d is not None:
+        d[stage] = d.get(stage, 0.0) + seconds
+
+@contextmanager
+def timed(stage: str):
+    """Ukur satu stage hot path: masuk histogram + Server-Timing request ini."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        observe("stage_duration_seconds", dt, stage=stage)
+        add_timing(stage, dt)
+
+def server_timing_header(d: dict) -> str:
+    return ", ".join(f"{stage};dur={sec * 1000:.1f}" for stage, sec in d.items())
+
+# ---------- SQL ----------
+SQL_LABEL_RE = re.compile(r"^\s*(select|insert|update|delete)\b.*?\b(?:from|into|update)\s+`?(\w+)", re.I | re.S)
+
+def sql_label(statement: str) -> str:
+    m = SQL_LABEL_RE.match(statement)
+    if not m:
+        return "other"
+    return f"{m.group(1).lower()}_{m.group(2).lower()}"
+
+def instrument_engine(engine) -> None:
+    """Pasang timer di tiap statement SQL (engine sync atau async_engine.sync_engine)."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_t0", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("_t0")
+        if not stack:
+            return
+        dt = time.perf_counter() - stack.pop()
+        observe("sql_duration_seconds", dt, statement=sql_label(statement))
+        add_timing("sql", dt)
+
+# ---------- export ----------
+def fmt_key(name: str, labels: tuple) -> str:
+    if not labels:
+        return name
+    inner = ",".join(f'{k}="{v}"' for k, v in labels)
+    return f"{name}{{{inner}}}"
+
+def counters() -> dict:
+    with _lock:
+        items = list(_counters.items())
+    return {fmt_key(name, labels): v for (name, labels), v in sorted(items)}
+
+def render_prometheus() -> str:
+    with _lock:
+        counter_items = sorted(_counters.items())
+        hist_items = sorted((k, ([*v[0]], v[1])) for k, v in _hist.items())
+
+    out: list[str] = []
+    typed: set[str] = set()
+
+    for (name, labels), v in counter_items:
+        if name not in typed:
+            out.append(f"# TYPE {name} counter")
+            typed.add(name)
+        out.append(f"{fmt_key(name, labels)} {v:g}")
+
+    for (name, labels), (buckets, total) in hist_items:
+        if name not in typed:
+            out.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        acc = 0
+        for le, c in zip([*map(str, BUCKETS), "+Inf"], buckets):
+            acc += c
+            out.append(f"{fmt_key(name + '_bucket', labels + (('le', le),))} {acc}")
+        out.append(f"{fmt_key(name + '_sum', labels)} {total:.6f}")
+        out.append(f"{fmt_key(name + '_count', labels)} {acc}")
+
+    for name, fn in sorted(_gauges.items()):
+        try:
+            values = fn()
+        except Exception:
+            continue
+        out.append(f"# TYPE {name} gauge")
+        for labels, v in values.items():
+            out.append(f"{fmt_key(name, tuple(sorted(labels)) if labels else ())} {v:g}")
+
+    return "\n".join(out) + "\n"
@@ -0,0 +1,227 @@
+import os
+import time
+from typing import AsyncIterator, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.guardrail import GuardrailResult, classify
+from app.services.router import route_local
+from app.services.answer import fetch_context
+from app.services.snapshot import get_snapshot
+from app.services.retrieval import select_context
+from app.services import budget, templates
+from app.services import metrics
+from app.services.answer_cache import normalize_question
+from app.services.singleflight import classify_flight, answer_flight, combined_flight
+from app.services.sessions import history_window, record_turn
+from app.services.gemini import generate_answer, classify_and_answer, stream_answer
+from app.services.tenants import Tenant, DEFAULT_TENANT
+
+# {name} = nama kost tenant
+OUT_OF_SCOPE_ANSWER = (
+    "Aku fokus bantu info seputar {name} ya 🙂\n\n"
+    "Contoh: kamar tersedia, harga, fasilitas, aturan, pembayaran, kontak/alamat, laundry terdekat."
+)
+
+BUSY_ANSWER = (
+    "Maaf, sistem AI lagi sibuk/kuota habis 🙏\n\n"
+    "Tapi aku masih bisa bantu info dasar: alamat, WA pemilik, jam kunjungan."
+)
+
+def chat_mode() -> str:
+    """
+    CHAT_MODE=two_stage   -> classify() lalu generate_answer() (default)
+    CHAT_MODE=single_pass -> satu call Gemini untuk scope + intent + jawaban
+    """
+    return os.getenv("CHAT_MODE", "two_stage").strip().lower()
+
+def classify_once(message: str, tenant: Tenant):
+    # prompt classifier beda per kost -> key-nya juga
+    key = f"{tenant.kost_id}|{normalize_question(message)}"
+    return classify_flight.do(key, lambda: classify(message, tenant))
+
+def out_of_scope_answer(tenant: Tenant) -> str:
+    return OUT_OF_SCOPE_ANSWER.format(name=tenant.name)
+
+def out_of_scope(intent: str, tenant: Tenant) -> dict:
+    return {"answer": out_of_scope_answer(tenant), "intent": intent, "in_scope": False}
+
+async def run_chat(
+    db: AsyncSession, message: str, tenant: Tenant = DEFAULT_TENANT, session_id: Optional[str] = None
+) -> dict:
+    usage = budget.start_request(tenant.kost_id)
+    # history percakapan (window ringkas) cuma dipakai waktu bikin jawaban
+    history = await history_window(session_id, tenant.kost_id)
+
+    # tier 1: router lokal, kalau yakin nggak perlu classifier LLM sama sekali
+    with metrics.timed("route_local"):
+        g = route_local(message)
+
+    result = None
+    if g is None and chat_mode() == "single_pass":
+        try:
+            result = await single_pass(db, message, tenant, history)
+        except Exception:
+            # single-pass gagal (schema ngaco / error lain) -> jalur lama
+            result = None
+
+    if result is None:
+        result = await two_stage(db, message, tenant, g=g, history=history)
+
+    if result["in_scope"]:
+        await record_turn(session_id, message, result["answer"], tenant.kost_id)
+    budget.finish_request(usage, result["intent"], result["in_scope"])
+    return result
+
+async def get_context(db: AsyncSession, intent: Optional[str], kost_id: int) -> dict:
+    # fetch_context masih kode sync; run_sync jalanin di atas driver async
+    # (greenlet), jadi event loop nggak ke-block nunggu MySQL
+    with metrics.timed("fetch_context"):
+        return await db.run_sync(fetch_context, intent, kost_id)
+
+async def get_prompt_context(db: AsyncSession, intent: Optional[str], message: str, kost_id: int):
+    """
+    (ctx, snapshot) buat prompt: context per intent, dipersempit retrieval kalau
+    perlu, lalu dipangkas per baris kalau lewat budget context intent-nya.
+    """
+    base = await get_context(db, intent, kost_id)
+    with metrics.timed("retrieval"):
+        ctx = await select_context(base, intent, message, kost_id)
+    # ctx hasil retrieval beda per pertanyaan -> jangan nimpa memo snapshot per intent
+    snap = get_snapshot(ctx, intent, kost_id, memo=ctx is base)
+
+    dropped = 0
+    limit = budget.budget_for(intent).context
+    while snap.tokens > limit:
+        # estimasi per baris bisa meleset dikit (header tabel dll) -> ulang sampai muat
+        ctx, n = budget.fit_context(ctx, intent, snap.tokens - limit)
+        if not n:
+            break
+        dropped += n
+        snap = get_snapshot(ctx, intent, kost_id, memo=False)
+    budget.note_context(snap.tokens, dropped)
+    return ctx, snap
+
+async def template_answer(db: AsyncSession, intent: str, kost_id: int) -> Optional[str]:
+    """Jawaban langsung dari template kalau policy intent-nya "template" (services/templates.py)."""
+    if templates.policy(intent) != templates.TEMPLATE:
+        return None
+    ctx = await get_context(db, intent, kost_id)
+    with metrics.timed("render_template"):
+        answer = templates.render(intent, ctx)
+    metrics.incr("answer_source_total", source="template")
+    return answer
+
+async def single_pass(db: AsyncSession, message: str, tenant: Tenant, history: str = "") -> dict:
+    kost_id = tenant.kost_id
+    ctx, snap = await get_prompt_context(db, None, message, kost_id)
+    key = f"{kost_id}|{normalize_question(message)}|{hash(snap.text)}|{hash(history)}"
+    with metrics.timed("classify_and_answer"):
+        r = await combined_flight.do(
+            key, lambda: classify_and_answer(message, ctx, context_text=snap.text, history=history, tenant=tenant)
+        )
+
+    if not r.in_scope:
+        return out_of_scope(r.intent, tenant)
+
+    return {"answer": r.answer, "intent": r.intent, "in_scope": True}
+
+async def two_stage(
+    db: AsyncSession, message: str, tenant: Tenant, g: Optional[GuardrailResult] = None, history: str = ""
+) -> dict:
+    kost_id = tenant.kost_id
+    if g is None:
+        with metrics.timed("classify"):
+            g = await classify_once(message, tenant)
+
+    if not g.in_scope:
+        return out_of_scope(g.intent, tenant)
+
+    answer = await template_answer(db, g.intent, kost_id)
+    if answer is not None:
+        return {"answer": answer, "intent": g.intent, "in_scope": True}
+
+    ctx, snap = await get_prompt_context(db, g.intent, message, kost_id)
+
+    try:
+        # pertanyaan + intent + data sama -> satu call Gemini dipakai bareng
+        key = f"{kost_id}|{g.intent}|{normalize_question(message)}|{hash(snap.text)}|{hash(history)}"
+        with metrics.timed("generate_answer"):
+            answer = await answer_flight.do(
+                key,
+                lambda: generate_answer(
+                    message, ctx, intent=g.intent, context_text=snap.text, history=history, tenant=tenant
+                ),
+            )
+    except Exception:
+        answer = BUSY_ANSWER
+
+    return {"answer": answer, "intent": g.intent, "in_scope": True}
+
+async def stream_chat(
+    db: AsyncSession, message: str, tenant: Tenant = DEFAULT_TENANT, session_id: Optional[str] = None
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Versi streaming run_chat buat SSE. Yield (event, data):
+      intent -> {"intent", "in_scope"}
+      token  -> {"text"}
+      done   -> metadata (source: guardrail|template|cache|llm|fallback|error, ttft_ms, total_ms)
+    Selalu dua tahap: structured output single-pass nggak bisa di-stream per token.
+    """
+    t0 = time.perf_counter()
+    kost_id = tenant.kost_id
+    usage = budget.start_request(kost_id)
+
+    with metrics.timed("route_local"):
+        g = route_local(message)
+    if g is None:
+        with metrics.timed("classify"):
+            g = await classify_once(message, tenant)
+
+    yield "intent", {"intent": g.intent, "in_scope": g.in_scope}
+
+    if not g.in_scope:
+        yield "token", {"text": out_of_scope_answer(tenant)}
+        budget.finish_request(usage, g.intent, False, "guardrail")
+        yield "done", {"intent": g.intent, "in_scope": False, "source": "guardrail",
+                       "ttft_ms": ms_since(t0), "total_ms": ms_since(t0)}
+        return
+
+    answer = await template_answer(db, g.intent, kost_id)
+    if answer is not None:
+        yield "token", {"text": answer}
+        await record_turn(session_id, message, answer, kost_id)
+        budget.finish_request(usage, g.intent, True, "template")
+        yield "done", {"intent": g.intent, "in_scope": True, "source": "template",
+                       "ttft_ms": ms_since(t0), "total_ms": ms_since(t0)}
+        return
+
+    ctx, snap = await get_prompt_context(db, g.intent, message, kost_id)
+    history = await history_window(session_id, kost_id)
+
+    source = "llm"
+    ttft = None
+    parts: list[str] = []
+    try:
+        async for source, piece in stream_answer(
+            message, ctx, intent=g.intent, context_text=snap.text, history=history, tenant=tenant
+        ):
+            if ttft is None:
+                ttft = ms_since(t0)
+            parts.append(piece)
+            yield "token", {"text": piece}
+    except Exception:
+        if ttft is None:
+            ttft = ms_since(t0)
+        source = "error"
+        yield "token", {"text": BUSY_ANSWER}
+
+    if source != "error":
+        await record_turn(session_id, message, "".join(parts), kost_id)
+
+    metrics.observe("stream_ttft_seconds", (ttft or 0) / 1000)
+    budget.finish_request(usage, g.intent, True, source)
+    yield "done", {"intent": g.intent, "in_scope": True, "source": source,
+                   "ttft_ms": ttft, "total_ms": ms_since(t0)}
+
+def ms_since(t0: float) -> float:
+    return round((time.perf_counter() - t0) * 1000, 1)
@@ -0,0 +1,144 @@
+"""
+Profil connection pool DB (dipakai app/db.py).
+
+DB_POOL_PROFILE:
+  serverless  pool mini (default 1 + overflow 2) + TCP keep-alive, tanpa pre-ping.
+              Koneksi TLS ke Aiven dipakai ulang selama instance warm,
+              pool_recycle pendek biar nggak kena idle timeout server.
+  null        NullPool: buka-tutup koneksi tiap checkout (paling aman buat
+              instance yang sering di-freeze, paling mahal per request).
+  server      QueuePool ukuran tetap + pool_recycle, tanpa pre-ping.
+Default: serverless kalau VERCEL diset, selain itu server.
+
+Tanpa pre-ping, koneksi mati ketahuan dari error-nya: SQLAlchemy nandain
+error disconnect, invalidasi seluruh pool, checkout berikutnya konek ulang.
+
+Env tuning: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+DB_POOL_PRE_PING (override), DB_KEEPALIVE_IDLE/INTERVAL/COUNT (detik/jumlah).
+"""
+
+import os
+import socket
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.services import metrics
+
+PROFILES = {
+    "serverless": {"pool_size": 1, "max_overflow": 2, "pool_timeout": 5, "pool_recycle": 240, "keepalive": True},
+    "null": {"keepalive": False},
+    "server": {"pool_size": 10, "max_overflow": 10, "pool_timeout": 10, "pool_recycle": 1800, "keepalive": False},
+}
+
+def profile_name() -> str:
+    name = os.getenv("DB_POOL_PROFILE") or ("serverless" if os.getenv("VERCEL") else "server")
+    if name not in PROFILES:
+        raise RuntimeError(f"DB_POOL_PROFILE tidak dikenal: {name} (pilih: {', '.join(PROFILES)})")
+    return name
+
+def _timed(base, label: str):
+    """Subclass pool yang ngukur waktu nunggu checkout (_do_get)."""
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return base._do_get(self)
+        except Exception:
+            metrics.incr("db_pool_checkout_errors_total", engine=label)
+            raise
+        finally:
+            metrics.observe("db_pool_checkout_wait_seconds", time.perf_counter() - t0, engine=label)
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+TimedQueuePool = _timed(QueuePool, "sync")
+TimedAsyncQueuePool = _timed(AsyncAdaptedQueuePool, "async")
+TimedNullPool = {"sync": _timed(NullPool, "sync"), "async": _timed(NullPool, "async")}
+
+def engine_kwargs(label: str) -> dict:
+    """kwargs create_engine/create_async_engine sesuai profil aktif."""
+    p = PROFILES[profile_name()]
+    pre_ping = os.getenv("DB_POOL_PRE_PING", "0") in ("1", "true", "True")
+
+    if "pool_size" not in p:
+        return {"poolclass": TimedNullPool[label], "pool_pre_ping": pre_ping}
+
+    return {
+        "poolclass": TimedQueuePool if label == "sync" else TimedAsyncQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", p["pool_size"])),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", p["max_overflow"])),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", p["pool_timeout"])),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", p["pool_recycle"])),
+        "pool_pre_ping": pre_ping,
+    }
+
+# ---------- TCP keep-alive ----------
+def _raw_socket(dbapi_conn):
+    # pymysql: ._sock; aiomysql (lewat adapter SQLAlchemy): transport asyncio
+    sock = getattr(dbapi_conn, "_sock", None)
+    if sock is not None:
+        return sock
+    inner = getattr(dbapi_conn, "_connection", None)
+    writer = getattr(inner, "_writer", None)
+    if writer is not None:
+        return writer.get_extra_info("socket")
+    return None
+
+def _set_keepalive(sock) -> None:
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # opsi per-OS; yang nggak ada di platform ini di-skip
+    for opt, env, default in (
+        ("TCP_KEEPIDLE", "DB_KEEPALIVE_IDLE", 60),
+        ("TCP_KEEPINTVL", "DB_KEEPALIVE_INTERVAL", 15),
+        ("TCP_KEEPCNT", "DB_KEEPALIVE_COUNT", 4),
+    ):
+        if hasattr(socket, opt):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, opt), int(os.getenv(env, default)))
+
+def install(engine, label: str) -> None:
+    """Pasang keep-alive (kalau profil minta) + gauge pool buat satu engine (sync)."""
+    if PROFILES[profile_name()]["keepalive"]:
+        @event.listens_for(engine, "connect")
+        def _keepalive(dbapi_conn, _record):
+            sock = _raw_socket(dbapi_conn)
+            if sock is not None:
+                try:
+                    _set_keepalive(sock)
+                except OSError:
+                    pass  # socket non-TCP (mis. unix socket) -> biarin
+
+    _engines[label] = engine
+
+# ---------- stats ----------
+_engines: dict = {}
+
+def _pool_stats(pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {"class": type(pool).__name__}
+    return {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # negatif = slot pool_size yang belum pernah dibuka; positif = koneksi overflow aktif
+        "overflow": pool.overflow(),
+    }
+
+def pool_stats() -> dict:
+    return {"profile": profile_name(), **{label: _pool_stats(e.pool) for label, e in _engines.items()}}
+
+def _gauge(field: str):
+    def fn() -> dict:
+        out = {}
+        for label, e in _engines.items():
+            s = _pool_stats(e.pool)
+            if field in s:
+                out[(("engine", label),)] = s[field]
+        return out
+    return fn
+
+metrics.register_gauge("db_pool_checked_out", _gauge("checked_out"))
+metrics.register_gauge("db_pool_overflow", _gauge("overflow"))
+metrics.register_gauge("db_pool_size", _gauge("size"))
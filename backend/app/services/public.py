@@ -0,0 +1,73 @@
+"""
+Query read-only buat endpoint /api/public/*.
+
+Semua fungsi di sini sync (Session biasa) supaya bisa dipanggil dari handler
+async lewat AsyncSession.run_sync tanpa ngeblok event loop.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.rooms import attach_facilities
+
+DEFAULT_KOST = {
+    "name": "Kost Binara",
+    "address": "Alamat belum diisi di database.",
+    "whatsapp": "",
+    "google_maps_url": "",
+    "visiting_hours": "",
+}
+
+def get_kost(db: Session, kost_id: int) -> dict:
+    row = db.execute(
+        text("""
+            SELECT name, address, whatsapp, google_maps_url, visiting_hours
+            FROM kost
+            WHERE id = :kost_id
+            LIMIT 1
+        """),
+        {"kost_id": kost_id},
+    ).mappings().first()
+
+    if not row:
+        return dict(DEFAULT_KOST)
+
+    return dict(row)
+
+def list_rooms(db: Session, kost_id: int) -> dict:
+    rows = db.execute(
+        text("""
+            SELECT id, kost_id, code, price_monthly, deposit, electricity_included, electricity_note,
+                   size_m2, is_available, notes
+            FROM room
+            WHERE kost_id = :kost_id
+            ORDER BY is_available DESC, id DESC
+        """),
+        {"kost_id": kost_id},
+    ).mappings().all()
+
+    return {"items": attach_facilities(db, rows)}
+
+def list_nearby(db: Session, kost_id: int) -> dict:
+    rows = db.execute(
+        text("""
+            SELECT id, kost_id, category, name, address, distance_m, maps_url, note
+            FROM nearby_place
+            WHERE kost_id = :kost_id
+            ORDER BY category ASC, COALESCE(distance_m, 999999) ASC, id DESC
+        """),
+        {"kost_id": kost_id},
+    ).mappings().all()
+    return {"items": rows}
+
+def list_rules(db: Session, kost_id: int) -> dict:
+    rows = db.execute(
+        text("""
+            SELECT id, kost_id, title, description
+            FROM rule
+            WHERE kost_id = :kost_id
+            ORDER BY id ASC
+        """),
+        {"kost_id": kost_id},
+    ).mappings().all()
+    return {"items": rows}
@@ -0,0 +1,115 @@
+"""
+Cache read-only /api/public/* per (resource, kost_id): JSON udah di-serialize
+jadi bytes, jadi request yang kena cache nggak nyentuh DB sama sekali.
+
+Entry dibangun ulang kalau versi data (services/versions.py, dinaikin endpoint
+admin) berubah atau umurnya lewat PUBLIC_CACHE_TTL (batas basi antar instance,
+karena counter versi cuma in-process).
+
+ETag = hash isi body (strong): byte sama -> ETag sama, di instance mana pun.
+If-None-Match cocok -> 304 tanpa body.
+
+Env:
+  PUBLIC_CACHE_TTL=60          detik maksimal entry dipakai tanpa dibangun ulang
+  PUBLIC_MAX_AGE=30            Cache-Control max-age (browser)
+  PUBLIC_S_MAXAGE=60           Cache-Control s-maxage (CDN/edge Vercel)
+  PUBLIC_SWR=300               stale-while-revalidate
+  PUBLIC_CACHE_MAX=512         entry (resource, kost) maksimal, LRU -- kost_id datang
+                               dari query/header tanpa auth, jadi harus dibatasi
+"""
+
+import os
+import time
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+
+from app.db import AsyncSessionLocal
+from app.services import metrics, public, versions
+from app.services.serialize import dumps
+from app.services.singleflight import SingleFlight
+
+# resource -> (query sync di services/public.py, slice versi yang dipakai)
+RESOURCES: dict[str, tuple[Callable, tuple[str, ...]]] = {
+    "kost": (public.get_kost, ("kost",)),
+    "rooms": (public.list_rooms, ("rooms",)),
+    "nearby": (public.list_nearby, ("nearby",)),
+    "rules": (public.list_rules, ("rules",)),
+}
+
+CACHE_TTL = float(os.getenv("PUBLIC_CACHE_TTL", "60"))
+CACHE_MAX = int(os.getenv("PUBLIC_CACHE_MAX", "512"))
+
+def cache_control() -> str:
+    return (
+        f"public, max-age={os.getenv('PUBLIC_MAX_AGE', '30')}, "
+        f"s-maxage={os.getenv('PUBLIC_S_MAXAGE', '60')}, "
+        f"stale-while-revalidate={os.getenv('PUBLIC_SWR', '300')}"
+    )
+
+@dataclass
+class Entry:
+    stamp: str
+    built_at: float
+    body: bytes
+    etag: str
+
+_cache: OrderedDict[tuple[str, int], Entry] = OrderedDict()
+public_flight = SingleFlight("public")
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+async def _build(resource: str, kost_id: int, stamp: str) -> Entry:
+    fn, _ = RESOURCES[resource]
+    async with AsyncSessionLocal() as db:
+        payload = await db.run_sync(fn, kost_id)
+    body = dumps(payload)
+    entry = Entry(stamp=stamp, built_at=time.monotonic(), body=body, etag=make_etag(body))
+    _cache[(resource, kost_id)] = entry
+    _cache.move_to_end((resource, kost_id))
+    while len(_cache) > CACHE_MAX:
+        _cache.popitem(last=False)
+        metrics.incr("public_cache_evicted_total")
+    return entry
+
+async def get_entry(resource: str, kost_id: int) -> Entry:
+    stamp = versions.stamp(kost_id, RESOURCES[resource][1])
+    entry = _cache.get((resource, kost_id))
+    if entry is not None and entry.stamp == stamp and time.monotonic() - entry.built_at < CACHE_TTL:
+        metrics.incr("public_cache_total", resource=resource, result="hit")
+        _cache.move_to_end((resource, kost_id))
+        return entry
+
+    metrics.incr("public_cache_total", resource=resource, result="miss")
+    # banyak landing page kebuka barengan waktu entry basi -> cukup satu query
+    key = f"{resource}|{kost_id}|{stamp}"
+    return await public_flight.do(key, lambda: _build(resource, kost_id, stamp))
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match pakai weak comparison: W/"x" dianggap sama dengan "x"
+    tags = (t.strip() for t in header.split(","))
+    return any(t.removeprefix("W/") == etag for t in tags)
+
+async def respond(request: Request, resource: str, kost_id: int) -> Response:
+    entry = await get_entry(resource, kost_id)
+    # kost bisa dipilih lewat header (services/tenants.py) -> CDN harus bedain
+    headers = {"ETag": entry.etag, "Cache-Control": cache_control(), "Vary": "X-Kost-Id"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        metrics.incr("public_cache_total", resource=resource, result="not_modified")
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+def public_cache_stats() -> dict:
+    return {
+        "entries": len(_cache),
+        "bytes": sum(len(e.body) for e in _cache.values()),
+        "inflight": public_flight.inflight(),
+    }
@@ -0,0 +1,271 @@
+"""
+Retrieval lokal (BM25) per kost buat milih baris context yang relevan sama
+pertanyaan, bukan nge-dump semua rule / semua tempat ke prompt.
+
+Dokumen = satu baris rule, room, nearby_place (semua kategori), payment_scheme.
+Index per kost disusun per slice (services/versions.py): admin nulis rule ->
+slice "rules" naik -> yang di-load ulang dari DB cuma dokumen rule, slice lain
+dipakai ulang. Statistik BM25 (df, panjang rata-rata) dihitung ulang di memori,
+murah buat ukuran data satu kost.
+
+Dipakai di pipeline setelah fetch_context:
+  lainnya  -> top-k dari semua jenis dokumen (dulu context-nya cuma profil kost)
+  aturan   -> rule dipangkas ke top-k kalau barisnya banyak
+  None     -> (single-pass) sama kayak aturan
+
+Env:
+  RETRIEVAL_ENABLED=1
+  RETRIEVAL_TOP_K=5        jumlah dokumen maksimal per pertanyaan
+  RETRIEVAL_MAX_ROWS=8     rule <= segini nggak dipangkas sama sekali
+  RETRIEVAL_TTL            default = CONTEXT_CACHE_TTL (jaring pengaman multi-instance)
+"""
+
+import os
+import re
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db import AsyncSessionLocal
+from app.services import metrics, versions
+from app.services.rooms import attach_facilities
+from app.services.singleflight import SingleFlight
+
+K1 = 1.5
+B = 0.75
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# kata sambung/tanya yang nggak bantu ranking
+STOPWORDS = {
+    "yang", "di", "ke", "dari", "dan", "atau", "ini", "itu", "apa", "apakah", "ada",
+    "ga", "gak", "nggak", "tidak", "bisa", "boleh", "kak", "min", "mau", "aku", "saya",
+    "kalau", "kalo", "untuk", "buat", "dengan", "sama", "juga", "ya", "kah", "dong",
+    "berapa", "gimana", "bagaimana", "nya", "the", "kost", "kos",
+}
+
+SUFFIXES = ("nya", "kah", "lah")
+
+def tokenize(s: str) -> list[str]:
+    out = []
+    for t in TOKEN_RE.findall(s.lower()):
+        for suf in SUFFIXES:
+            # "parkirnya" -> "parkir", tapi kata pendek dibiarin
+            if t.endswith(suf) and len(t) - len(suf) >= 4:
+                t = t[: -len(suf)]
+                break
+        if t not in STOPWORDS:
+            out.append(t)
+    return out
+
+@dataclass
+class Doc:
+    kind: str  # rules | rooms | nearby | payments (= key di context)
+    row: dict
+    tf: Counter = field(default_factory=Counter)
+    length: int = 0
+
+def make_doc(kind: str, row: dict, body: str) -> Doc:
+    toks = tokenize(body)
+    return Doc(kind=kind, row=row, tf=Counter(toks), length=len(toks))
+
+# ---- loader per slice (sync, dipanggil lewat run_sync) ----
+
+def _load_rules(db: Session, kost_id: int) -> list[Doc]:
+    rows = db.execute(
+        text("SELECT id, title, description FROM rule WHERE kost_id=:id ORDER BY id"),
+        {"id": kost_id},
+    ).mappings().all()
+    return [
+        make_doc("rules", {"title": r["title"], "description": r["description"]},
+                 f"{r['title']} {r['title']} {r['description'] or ''}")
+        for r in rows
+    ]
+
+def _load_rooms(db: Session, kost_id: int) -> list[Doc]:
+    rows = db.execute(
+        text("SELECT r.* FROM room r WHERE r.kost_id=:id ORDER BY r.is_available DESC, r.code ASC"),
+        {"id": kost_id},
+    ).mappings().all()
+    docs = []
+    for r in attach_facilities(db, rows):
+        r["facilities"] = ", ".join(f["name"] for f in r["facilities"]) or None
+        body = " ".join(str(r.get(k) or "") for k in ("code", "facilities", "notes", "electricity_note"))
+        docs.append(make_doc("rooms", r, f"kamar {body}"))
+    return docs
+
+def _load_nearby(db: Session, kost_id: int) -> list[Doc]:
+    rows = db.execute(text("""
+        SELECT category, name, address, distance_m, maps_url, note
+        FROM nearby_place
+        WHERE kost_id=:id
+        ORDER BY (distance_m IS NULL), distance_m ASC
+    """), {"id": kost_id}).mappings().all()
+    return [
+        make_doc("nearby", dict(r), f"{r['category']} {r['category']} {r['name']} {r['address'] or ''} {r['note'] or ''}")
+        for r in rows
+    ]
+
+def _load_payments(db: Session, kost_id: int) -> list[Doc]:
+    rows = db.execute(
+        text("SELECT scheme, description FROM payment_scheme WHERE kost_id=:id"),
+        {"id": kost_id},
+    ).mappings().all()
+    return [
+        make_doc("payments", dict(r), f"bayar pembayaran {r['scheme']} {r['description'] or ''}")
+        for r in rows
+    ]
+
+# kind dokumen -> (slice versi, loader)
+LOADERS = {
+    "rules": ("rules", _load_rules),
+    "rooms": ("rooms", _load_rooms),
+    "nearby": ("nearby", _load_nearby),
+    "payments": ("payments", _load_payments),
+}
+
+# intent -> jenis dokumen yang di-retrieve
+RETRIEVAL_INTENTS: dict[Optional[str], tuple[str, ...]] = {
+    "lainnya": ("rules", "rooms", "nearby", "payments"),
+    "aturan": ("rules",),
+    None: ("rules",),
+}
+
+def enabled() -> bool:
+    return os.getenv("RETRIEVAL_ENABLED", "1") not in ("0", "false", "False")
+
+def top_k() -> int:
+    return int(os.getenv("RETRIEVAL_TOP_K", "5"))
+
+def max_rows() -> int:
+    return int(os.getenv("RETRIEVAL_MAX_ROWS", "8"))
+
+def ttl() -> float:
+    return float(os.getenv("RETRIEVAL_TTL", os.getenv("CONTEXT_CACHE_TTL", "300")))
+
+class Index:
+    """BM25 di atas dokumen satu kost. Slice disimpan terpisah biar bisa diganti sendiri-sendiri."""
+
+    def __init__(self):
+        self.slices: dict[str, tuple[str, float, list[Doc]]] = {}
+        self.docs: list[Doc] = []
+        self.df: Counter = Counter()
+        self.avgdl = 0.0
+
+    def stale(self, kost_id: int) -> list[str]:
+        now = time.monotonic()
+        out = []
+        for kind, (slice_, _) in LOADERS.items():
+            item = self.slices.get(kind)
+            if item is None or item[0] != versions.stamp(kost_id, (slice_,)) or now - item[1] >= ttl():
+                out.append(kind)
+        return out
+
+    def refresh(self, db: Session, kost_id: int, kinds: list[str]) -> None:
+        for kind in kinds:
+            slice_, loader = LOADERS[kind]
+            # stamp diambil sebelum query: bump yang nyelip di tengah bikin rebuild lagi, bukan basi
+            stamp = versions.stamp(kost_id, (slice_,))
+            self.slices[kind] = (stamp, time.monotonic(), loader(db, kost_id))
+            metrics.incr("retrieval_slice_rebuild_total", kind=kind)
+
+        docs = [d for _, _, ds in self.slices.values() for d in ds]
+        df = Counter()
+        for d in docs:
+            df.update(d.tf.keys())
+        # assign di akhir: search() yang jalan barengan lihat index lama atau baru, bukan setengah jadi
+        self.docs, self.df = docs, df
+        self.avgdl = (sum(d.length for d in docs) / len(docs)) if docs else 0.0
+
+    def search(self, query: str, kinds: tuple[str, ...], k: int) -> list[tuple[float, Doc]]:
+        terms = set(tokenize(query))
+        if not terms or not self.docs:
+            return []
+
+        n = len(self.docs)
+        idf = {t: math.log(1 + (n - self.df[t] + 0.5) / (self.df[t] + 0.5)) for t in terms if self.df[t]}
+        if not idf:
+            return []
+
+        scored = []
+        for d in self.docs:
+            if d.kind not in kinds:
+                continue
+            s = 0.0
+            norm = K1 * (1 - B + B * d.length / (self.avgdl or 1))
+            for t, w in idf.items():
+                f = d.tf.get(t)
+                if f:
+                    s += w * f * (K1 + 1) / (f + norm)
+            if s > 0:
+                scored.append((s, d))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return scored[:k]
+
+_indexes: dict[int, Index] = {}
+# refresh index per kost cukup sekali walau banyak chat masuk barengan waktu basi.
+# Bukan threading.Lock: run_sync jalan di thread event loop, lock yang nunggu
+# query async lain bakal nge-deadlock loop-nya.
+retrieval_flight = SingleFlight("retrieval")
+
+def _refresh(db: Session, kost_id: int) -> None:
+    idx = _indexes.setdefault(kost_id, Index())
+    kinds = idx.stale(kost_id)
+    if kinds:
+        idx.refresh(db, kost_id, kinds)
+
+async def _refresh_async(kost_id: int) -> None:
+    # session sendiri, bukan punya request: refresh dibagi ke banyak chat dan
+    # tetap jalan walau request yang mulai duluan udah batal
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(_refresh, kost_id)
+
+async def get_index(kost_id: int) -> Index:
+    idx = _indexes.get(kost_id)
+    if idx is None or idx.stale(kost_id):
+        with metrics.timed("retrieval_refresh"):
+            await retrieval_flight.do(str(kost_id), lambda: _refresh_async(kost_id))
+    return _indexes[kost_id]
+
+async def select_context(ctx: dict, intent: Optional[str], question: str, kost_id: int) -> dict:
+    """
+    Context yang dipersempit ke baris relevan buat pertanyaan ini. Kalau nggak
+    ada yang perlu diubah, objek ctx yang sama dibalikin (snapshot memo tetap kepakai).
+    """
+    kinds = RETRIEVAL_INTENTS.get(intent, ())
+    if not kinds or not enabled():
+        return ctx
+    # aturan/single-pass: rule sedikit -> kirim semua aja, nggak usah ranking
+    if intent != "lainnya" and len(ctx.get("rules") or []) <= max_rows():
+        return ctx
+
+    idx = await get_index(kost_id)
+    hits = idx.search(question, kinds, top_k())
+    metrics.incr("retrieval_total", intent=str(intent), result="hit" if hits else "empty")
+
+    out = dict(ctx)
+    if intent == "lainnya":
+        for kind in kinds:
+            out[kind] = [d.row for _, d in hits if d.kind == kind]
+    elif hits:
+        out["rules"] = [d.row for _, d in hits]
+    else:
+        # nggak ada kata yang nyambung: potong aja biar prompt tetap kecil
+        out["rules"] = list(ctx["rules"][: max_rows()])
+    return out
+
+def retrieval_stats() -> list[dict]:
+    return [
+        {
+            "kost_id": kid,
+            "docs": len(idx.docs),
+            "terms": len(idx.df),
+            "slices": {k: len(docs) for k, (_, _, docs) in idx.slices.items()},
+        }
+        for kid, idx in sorted(_indexes.items())
+    ]
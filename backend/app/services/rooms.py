@@ -0,0 +1,33 @@
+from sqlalchemy import text, bindparam
+from sqlalchemy.orm import Session
+
+FACILITIES_SQL = text("""
+    SELECT rf.room_id, f.id, f.name
+    FROM room_facility rf
+    JOIN facility f ON f.id = rf.facility_id
+    WHERE rf.room_id IN :room_ids
+    ORDER BY f.name ASC
+""").bindparams(bindparam("room_ids", expanding=True))
+
+def load_room_facilities(db: Session, room_ids) -> dict[int, list[dict]]:
+    """
+    Facilities buat banyak room sekaligus: 1 query IN (...), bukan 1 query per room.
+    Return {room_id: [{"id", "name"}, ...]} (urut nama), room tanpa facility -> [].
+    """
+    ids = list(dict.fromkeys(room_ids))
+    out: dict[int, list[dict]] = {rid: [] for rid in ids}
+    if not ids:
+        return out
+
+    rows = db.execute(FACILITIES_SQL, {"room_ids": ids}).mappings().all()
+    for r in rows:
+        out[r["room_id"]].append({"id": r["id"], "name": r["name"]})
+    return out
+
+def attach_facilities(db: Session, rows) -> list[dict]:
+    """Row room -> dict + key "facilities" (list nested)."""
+    items = [dict(r) for r in rows]
+    fac = load_room_facilities(db, [d["id"] for d in items])
+    for d in items:
+        d["facilities"] = fac.get(d["id"], [])
+    return items
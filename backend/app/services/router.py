@@ -0,0 +1,61 @@
+"""
+Router lokal (tier 1) sebelum classifier Gemini (tier 2).
+
+Skor per intent dari services/intent_matcher.py (frasa berbobot, regex tunggal).
+Kalau skor intent teratas cukup tinggi DAN selisihnya dengan runner-up cukup
+jauh, hasilnya dipakai langsung tanpa call LLM. Selain itu (ambigu / nggak ada
+yang match) dilempar ke classify().
+
+Keyword out-of-scope ("film", "game", "tugas") cuma boleh nolak lokal kalau
+nggak ada intent kost yang ikut match: "boleh nonton film di kamar?" itu
+pertanyaan aturan, jadi campuran begini selalu naik ke Gemini.
+"""
+
+import os
+from typing import Optional
+
+from app.services.guardrail import GuardrailResult
+from app.services import metrics
+from app.services.intent_matcher import OOS, match
+
+def min_score() -> float:
+    return float(os.getenv("ROUTER_MIN_SCORE", "3.0"))
+
+def min_margin() -> float:
+    return float(os.getenv("ROUTER_MIN_MARGIN", "1.5"))
+
+def enabled() -> bool:
+    return os.getenv("ROUTER_ENABLED", "1") not in ("0", "false", "False")
+
+def route_local(q: str) -> Optional[GuardrailResult]:
+    """
+    Return GuardrailResult kalau yakin, None kalau harus naik ke Gemini.
+    """
+    if not enabled():
+        return None
+
+    m = match(q)
+    top_intent, top = m.top
+    mixed = OOS in m.scores and m.best_in_scope()[0] is not None
+
+    if mixed or top_intent is None or top < min_score() or m.margin < min_margin():
+        metrics.incr("router_tier_total", tier="llm")
+        return None
+
+    metrics.incr("router_tier_total", tier="local")
+    if top_intent == OOS:
+        return GuardrailResult(in_scope=False, intent="lainnya")
+    return GuardrailResult(in_scope=True, intent=top_intent)
+
+def router_stats() -> dict:
+    local = metrics.get("router_tier_total", tier="local")
+    llm = metrics.get("router_tier_total", tier="llm")
+    fallback = metrics.get("router_tier_total", tier="fallback_local")
+    total = local + llm
+    return {
+        "local": local,
+        "llm": llm,
+        "fallback_local": fallback,
+        "llm_calls_avoided": local,
+        "local_hit_rate": round(local / total, 4) if total else 0.0,
+    }
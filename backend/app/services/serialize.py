@@ -0,0 +1,50 @@
+"""
+Serializer JSON tunggal (orjson) buat response API, cache publik, export, prompt.
+
+dumps() bisa langsung nerima RowMapping hasil query (nggak perlu
+{k: json_safe(v) ...} per row) plus Decimal/timedelta/set lewat _default.
+datetime/date/time udah native di orjson (format ISO, sama kayak isoformat()).
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from collections.abc import Mapping
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+def _default(v: Any) -> Any:
+    if isinstance(v, Mapping):  # RowMapping dkk
+        return dict(v)
+    if isinstance(v, Decimal):
+        # sama kayak jsonable_encoder FastAPI: angka bulat -> int, sisanya float
+        return int(v) if v.as_tuple().exponent >= 0 else float(v)
+    if isinstance(v, timedelta):  # kolom TIME MySQL
+        return v.total_seconds()
+    if isinstance(v, (set, frozenset, tuple)):
+        return list(v)
+    if isinstance(v, (bytes, bytearray)):
+        return v.decode("utf-8", "replace")
+    raise TypeError(f"Tipe {type(v).__name__} nggak bisa di-serialize ke JSON")
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def dumps_str(obj: Any) -> str:
+    return dumps(obj).decode("utf-8")
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse lewat dumps(). Return instance ini langsung dari endpoint
+    biar FastAPI nggak jalanin jsonable_encoder lagi di atas content-nya.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+# masih dipakai buat nilai satuan (mis. sel CSV export)
+def json_safe(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return v
@@ -0,0 +1,341 @@
+"""
+Riwayat percakapan per ChatIn.session_id, dengan batas memori.
+
+- Tiap session punya budget token buat history; turn lama yang kelewat budget
+  dilipat jadi ringkasan pendek (rolling summary, deterministik, tanpa LLM).
+- Session idle lebih dari TTL dibuang.
+- Total ukuran session SEMUA kost dibatasi satu cap global. Kalau lewat,
+  yang dibuang session paling lama dari kost (tenant) yang makan memori
+  paling banyak, jadi kost yang rame ngusir session-nya sendiri duluan.
+  session_id juga di-namespace per kost.
+
+Env:
+  SESSION_BACKEND=memory (default) | sqlite | off
+  SESSION_PATH=/tmp/binara-sessions.sqlite3
+  SESSION_TTL=1800                 detik
+  SESSION_TOKEN_BUDGET=600         token history (turn + ringkasan) per session
+  SESSION_SUMMARY_TOKENS=150       batas ringkasan
+  SESSION_MEMORY_CAP=16777216      byte, semua session semua kost
+"""
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+from app.services import metrics
+from app.services.tokens import estimate_tokens, CHARS_PER_TOKEN
+
+@dataclass
+class Turn:
+    role: str  # "user" | "bot"
+    text: str
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+@dataclass
+class Session:
+    turns: list[Turn] = field(default_factory=list)
+    summary: str = ""
+    last_seen: float = 0.0
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Session":
+        d = json.loads(raw)
+        return cls(turns=[Turn(**t) for t in d["turns"]], summary=d["summary"], last_seen=d["last_seen"])
+
+    def size(self) -> int:
+        return len(self.summary) + sum(len(t.text) for t in self.turns) + 64
+
+def token_budget() -> int:
+    return int(os.getenv("SESSION_TOKEN_BUDGET", "600"))
+
+def summary_budget() -> int:
+    return int(os.getenv("SESSION_SUMMARY_TOKENS", "150"))
+
+def _clip(s: str, n: int) -> str:
+    s = " ".join(s.split())
+    return s if len(s) <= n else s[: n - 1] + "…"
+
+def fold(session: Session) -> None:
+    """Lipat turn paling lama ke summary sampai total token muat budget."""
+    def total() -> int:
+        return estimate_tokens(session.summary) + sum(t.tokens for t in session.turns)
+
+    # minimal sisain 1 pasang turn terakhir utuh
+    while len(session.turns) > 2 and total() > token_budget():
+        t = session.turns.pop(0)
+        if t.role == "user":
+            session.summary += f" User tanya: {_clip(t.text, 80)}."
+        else:
+            session.summary += f" Bot jawab: {_clip(t.text, 60)}."
+
+    max_chars = summary_budget() * CHARS_PER_TOKEN
+    if len(session.summary) > max_chars:
+        # ringkasan paling lama yang dibuang
+        session.summary = "…" + session.summary[-max_chars:]
+
+class MemoryStore:
+    def __init__(self, ttl: float, cap_bytes: int):
+        self.ttl = ttl
+        self.cap = cap_bytes
+        # sid -> (session, size waktu disimpan)
+        self._data: OrderedDict[str, tuple[Session, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, sid: str) -> Optional[Session]:
+        with self._lock:
+            item = self._data.get(sid)
+            if item is None:
+                return None
+            if time.time() - item[0].last_seen > self.ttl:
+                self._drop(sid)
+                return None
+            self._data.move_to_end(sid)
+            return item[0]
+
+    def put(self, sid: str, s: Session) -> None:
+        size = s.size()
+        with self._lock:
+            if sid in self._data:
+                self._drop(sid)
+            self._data[sid] = (s, size)
+            self._bytes += size
+            self._evict()
+
+    def _drop(self, sid: str) -> None:
+        _, size = self._data.pop(sid)
+        self._bytes -= size
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def evict_oldest(self) -> int:
+        """Buang session paling lama; return byte yang dibebasin (0 kalau kosong)."""
+        with self._lock:
+            if not self._data:
+                return 0
+            sid = next(iter(self._data))
+            size = self._data[sid][1]
+            self._drop(sid)
+            return size
+
+    def _evict(self) -> None:
+        now = time.time()
+        # buang yang expired dari ujung LRU, lalu potong sampai di bawah cap
+        while self._data:
+            sid, (s, _) = next(iter(self._data.items()))
+            if now - s.last_seen > self.ttl or self._bytes > self.cap:
+                self._drop(sid)
+                metrics.incr("session_evicted_total")
+            else:
+                break
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"sessions": len(self._data), "bytes": self._bytes, "cap_bytes": self.cap}
+
+class PartitionedStore:
+    """
+    Satu MemoryStore (LRU sendiri) per tenant, di bawah satu cap byte global.
+    Lewat cap -> LRU tenant yang paling gede yang dipotong.
+    """
+
+    blocking = False
+
+    def __init__(self, ttl: float, cap_bytes: int):
+        self.ttl = ttl
+        self.cap = cap_bytes
+        self._parts: dict[int, MemoryStore] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, sid: str, tenant: int = 0) -> Optional[Session]:
+        with self._lock:
+            part = self._parts.get(tenant)
+            if part is None:
+                return None
+            before = part.bytes
+            s = part.get(sid)
+            # get bisa buang session expired
+            self._bytes += part.bytes - before
+            return s
+
+    def put(self, sid: str, s: Session, tenant: int = 0) -> None:
+        with self._lock:
+            part = self._parts.get(tenant)
+            if part is None:
+                part = self._parts[tenant] = MemoryStore(self.ttl, self.cap)
+            before = part.bytes
+            part.put(sid, s)
+            self._bytes += part.bytes - before
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.cap:
+            tenant, part = max(self._parts.items(), key=lambda kv: kv[1].bytes)
+            freed = part.evict_oldest()
+            if not freed:
+                break
+            self._bytes -= freed
+            metrics.incr("session_evicted_total")
+            if not part.bytes:
+                # partisi kosong dibuang, biar kost_id yang pernah lewat nggak numpuk
+                del self._parts[tenant]
+
+    def stats(self) -> dict:
+        with self._lock:
+            parts = list(self._parts.values())
+            total = self._bytes
+        return {
+            "sessions": sum(p.stats()["sessions"] for p in parts),
+            "bytes": total,
+            "cap_bytes": self.cap,
+            "tenants": len(parts),
+        }
+
+class SqliteStore:
+    # disk I/O (commit = fsync): dipanggil lewat thread, bukan di event loop
+    blocking = True
+
+    def __init__(self, path: str, ttl: float, cap_bytes: int):
+        self.ttl = ttl
+        self.cap = cap_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chat_session (
+              id TEXT PRIMARY KEY,
+              data TEXT NOT NULL,
+              size INTEGER NOT NULL,
+              last_seen REAL NOT NULL
+            )
+        """)
+        cols = {r[1] for r in self._conn.execute("PRAGMA table_info(chat_session)")}
+        if "tenant" not in cols:
+            # file session lama (sebelum multi-kost)
+            self._conn.execute("ALTER TABLE chat_session ADD COLUMN tenant INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_chat_session_last_seen ON chat_session (last_seen)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_chat_session_tenant_seen ON chat_session (tenant, last_seen)"
+        )
+        self._conn.commit()
+
+    def get(self, sid: str, tenant: int = 0) -> Optional[Session]:
+        with self._lock:
+            row = self._conn.execute("SELECT data, last_seen FROM chat_session WHERE id = ?", (sid,)).fetchone()
+        if row is None:
+            return None
+        if time.time() - row[1] > self.ttl:
+            return None
+        return Session.from_json(row[0])
+
+    def put(self, sid: str, s: Session, tenant: int = 0) -> None:
+        raw = s.to_json()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chat_session (id, data, size, last_seen, tenant) VALUES (?, ?, ?, ?, ?)",
+                (sid, raw, len(raw), s.last_seen, tenant),
+            )
+            self._conn.execute("DELETE FROM chat_session WHERE last_seen < ?", (time.time() - self.ttl,))
+            # cap global: buang session paling lama dari kost yang paling gede sampai muat
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM chat_session").fetchone()[0]
+            while total > self.cap:
+                big = self._conn.execute(
+                    "SELECT tenant FROM chat_session GROUP BY tenant ORDER BY SUM(size) DESC LIMIT 1"
+                ).fetchone()
+                old = big and self._conn.execute(
+                    "SELECT id, size FROM chat_session WHERE tenant = ? ORDER BY last_seen ASC LIMIT 1", (big[0],)
+                ).fetchone()
+                if not old or old[0] == sid:
+                    break
+                self._conn.execute("DELETE FROM chat_session WHERE id = ?", (old[0],))
+                total -= old[1]
+                metrics.incr("session_evicted_total")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            n, b = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM chat_session").fetchone()
+        return {"sessions": n, "bytes": b, "cap_bytes": self.cap}
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    global _store
+    if _store is not None:
+        return _store or None
+
+    with _store_lock:
+        if _store is None:
+            kind = os.getenv("SESSION_BACKEND", "memory").strip().lower()
+            ttl = float(os.getenv("SESSION_TTL", "1800"))
+            cap = int(os.getenv("SESSION_MEMORY_CAP", str(16 * 1024 * 1024)))
+            if kind == "sqlite":
+                _store = SqliteStore(os.getenv("SESSION_PATH", "/tmp/binara-sessions.sqlite3"), ttl, cap)
+            elif kind == "memory":
+                _store = PartitionedStore(ttl, cap)
+            else:
+                _store = False
+    return _store or None
+
+def _sid(session_id: str, tenant: int) -> str:
+    # session_id dari client cuma unik per kost
+    return f"{tenant}:{session_id}"
+
+def _history_window(store, session_id: str, tenant: int) -> str:
+    s = store.get(_sid(session_id, tenant), tenant)
+    if s is None or (not s.turns and not s.summary):
+        return ""
+
+    lines = []
+    if s.summary:
+        lines.append(f"Ringkasan sebelumnya:{s.summary}")
+    for t in s.turns:
+        lines.append(f"{'User' if t.role == 'user' else 'Bot'}: {t.text}")
+    return "\n".join(lines)
+
+def _record_turn(store, session_id: str, question: str, answer: str, tenant: int) -> None:
+    sid = _sid(session_id, tenant)
+    s = store.get(sid, tenant) or Session()
+    # jawaban bot panjang cukup disimpan potongannya
+    s.turns += [Turn("user", _clip(question, 400)), Turn("bot", _clip(answer, 600))]
+    s.last_seen = time.time()
+    fold(s)
+    store.put(sid, s, tenant)
+
+async def _run(store, fn, *args):
+    # backend sqlite jalan di thread pool biar chat lain nggak nunggu disk
+    if store.blocking:
+        return await asyncio.to_thread(fn, store, *args)
+    return fn(store, *args)
+
+async def history_window(session_id: Optional[str], tenant: int = 0) -> str:
+    """History ringkas buat prompt ("" kalau belum ada / store mati)."""
+    store = get_store()
+    if store is None or not session_id:
+        return ""
+    return await _run(store, _history_window, session_id, tenant)
+
+async def record_turn(session_id: Optional[str], question: str, answer: str, tenant: int = 0) -> None:
+    store = get_store()
+    if store is None or not session_id:
+        return
+    await _run(store, _record_turn, session_id, question, answer, tenant)
+
+def session_stats() -> dict:
+    store = get_store()
+    return store.stats() if store is not None else {"sessions": 0, "bytes": 0, "cap_bytes": 0}
@@ -0,0 +1,54 @@
+"""
+Single-flight: request identik yang datang barengan nunggu satu call upstream
+yang sama, bukan masing-masing nembak Gemini.
+
+Cuma ngegabungin call yang lagi jalan (in-flight); begitu selesai, key-nya
+dilepas -- caching hasil tetap urusan answer_cache.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+from app.services import metrics
+
+T = TypeVar("T")
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is not None:
+            metrics.incr("singleflight_total", group=self.name, role="collapsed")
+        else:
+            # call upstream jalan di task sendiri: leader yang batal (tab ditutup,
+            # SSE putus) nggak ikut ngebatalin call yang ditunggu follower
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._release(key, t))
+            metrics.incr("singleflight_total", group=self.name, role="leader")
+        return await asyncio.shield(task)
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # biar nggak ada warning "exception was never retrieved" kalau semua penunggu udah batal
+        if not task.cancelled():
+            task.exception()
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+classify_flight = SingleFlight("classify")
+answer_flight = SingleFlight("answer")
+combined_flight = SingleFlight("classify_and_answer")
+
+def singleflight_stats() -> dict:
+    out = {}
+    for f in (classify_flight, answer_flight, combined_flight):
+        leader = metrics.get("singleflight_total", group=f.name, role="leader")
+        collapsed = metrics.get("singleflight_total", group=f.name, role="collapsed")
+        out[f.name] = {"upstream_calls": leader, "collapsed": collapsed, "inflight": f.inflight()}
+    return out
@@ -0,0 +1,148 @@
+"""
+Compiler context -> snapshot teks ringkas per intent.
+
+Daripada json.dumps seluruh context (SELECT * kost + semua kolom room), tiap
+intent cuma dapat kolom yang dia butuh, dalam format tabel `a|b|c`. Hasil
+compile di-memo per (kost_id, intent) dan dipakai ulang selama objek context
+dari fetch_context masih sama (context cache ganti objek begitu admin nulis).
+
+raw_tokens (ukuran kalau context di-dump mentah, cuma buat statistik hemat
+token) dihitung sekali per snapshot yang di-memo; compile per pertanyaan
+(retrieval, pangkas budget) nggak bayar serialize context utuh.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from app.services import metrics
+from app.services.serialize import dumps_str
+from app.services.tokens import estimate_tokens
+
+KOST_BASE = ["name", "whatsapp"]
+
+KOST_FIELDS = {
+    "alamat": ["name", "address", "google_maps_url", "visiting_hours"],
+    "kontak": ["name", "whatsapp", "visiting_hours"],
+}
+
+ROOM_FIELDS = {
+    "kamar_tersedia": ["code", "is_available", "price_monthly", "size_m2"],
+    "harga": ["code", "price_monthly", "deposit", "is_available"],
+    "fasilitas": ["code", "facilities", "size_m2", "is_available"],
+    "biaya_tambahan": ["code", "deposit", "electricity_included", "electricity_note", "notes"],
+}
+
+ALL_ROOM_FIELDS = [
+    "code", "is_available", "price_monthly", "deposit", "electricity_included",
+    "electricity_note", "size_m2", "facilities", "notes",
+]
+
+RULE_FIELDS = ["title", "description"]
+PAYMENT_FIELDS = ["scheme", "description"]
+LAUNDRY_FIELDS = ["name", "distance_m", "address", "maps_url", "note"]
+NEARBY_FIELDS = ["category", "name", "distance_m", "address", "maps_url", "note"]
+
+# kolom teknis yang nggak pernah berguna buat jawaban
+SKIP_KOST_COLUMNS = {"id", "created_at", "updated_at"}
+
+@dataclass
+class Snapshot:
+    text: str
+    tokens: int
+    raw_tokens: Optional[int] = None
+
+    @property
+    def saved(self) -> int:
+        return max(self.raw_tokens - self.tokens, 0) if self.raw_tokens is not None else 0
+
+def _cell(v) -> str:
+    if v is None or v == "":
+        return "-"
+    if isinstance(v, bool):
+        return "ya" if v else "tidak"
+    return str(v).replace("|", "/").replace("\n", " ")
+
+def _table(title: str, rows: list[dict], fields: list[str]) -> list[str]:
+    if not rows:
+        return []
+    lines = [f"{title} ({'|'.join(fields)}):"]
+    for r in rows:
+        lines.append("|".join(_cell(r.get(f)) for f in fields))
+    return lines
+
+def kost_fields(kost: dict, intent: Optional[str]) -> list[str]:
+    if intent in KOST_FIELDS:
+        return KOST_FIELDS[intent]
+    if intent in (None, "tipe_kost", "lainnya"):
+        # profil lengkap: semua kolom kost yang keisi
+        return [k for k, v in kost.items() if k not in SKIP_KOST_COLUMNS and v not in (None, "")]
+    return KOST_BASE
+
+# slice context -> judul tabel (urutan = urutan di snapshot)
+TABLES = {
+    "rooms": "KAMAR",
+    "rules": "ATURAN",
+    "payments": "PEMBAYARAN",
+    "nearby_laundry": "LAUNDRY TERDEKAT",
+    "nearby": "TEMPAT TERDEKAT",
+}
+
+def slice_fields(slice_: str, intent: Optional[str]) -> list[str]:
+    if slice_ == "rooms":
+        return ROOM_FIELDS.get(intent, ALL_ROOM_FIELDS)
+    return {
+        "rules": RULE_FIELDS,
+        "payments": PAYMENT_FIELDS,
+        "nearby_laundry": LAUNDRY_FIELDS,
+        "nearby": NEARBY_FIELDS,
+    }[slice_]
+
+def row_tokens(slice_: str, row: dict, intent: Optional[str]) -> int:
+    """Estimasi token satu baris tabel di snapshot (dipakai services/budget.py buat mangkas)."""
+    return estimate_tokens("|".join(_cell(row.get(f)) for f in slice_fields(slice_, intent)) + "\n")
+
+def compile_snapshot(ctx: dict, intent: Optional[str], raw: bool = False) -> Snapshot:
+    lines: list[str] = []
+
+    kost = ctx.get("kost") or {}
+    if kost:
+        lines.append("KOST: " + "; ".join(f"{f}={_cell(kost.get(f))}" for f in kost_fields(kost, intent)))
+
+    for slice_, title in TABLES.items():
+        lines += _table(title, ctx.get(slice_) or [], slice_fields(slice_, intent))
+
+    text = "\n".join(lines) if lines else "(data kost belum tersedia)"
+    snap = Snapshot(text=text, tokens=estimate_tokens(text))
+    if raw:
+        snap.raw_tokens = estimate_tokens(dumps_str(ctx))
+    return snap
+
+_memo: dict[tuple[int, Optional[str]], tuple[dict, Snapshot]] = {}
+_memo_lock = threading.Lock()
+
+def get_snapshot(ctx: dict, intent: Optional[str], kost_id: int, memo: bool = True) -> Snapshot:
+    """memo=False buat context per pertanyaan (hasil retrieval): dikompilasi langsung, nggak nimpa memo."""
+    key = (kost_id, intent)
+    with _memo_lock:
+        item = _memo.get(key) if memo else None
+    if item is not None and item[0] is ctx:
+        snap = item[1]
+    else:
+        snap = compile_snapshot(ctx, intent, raw=memo)
+        if memo:
+            with _memo_lock:
+                _memo[key] = (ctx, snap)
+        metrics.incr("context_snapshot_compiled_total")
+
+    if snap.raw_tokens is not None:
+        metrics.incr("prompt_tokens_saved_total", snap.saved)
+    return snap
+
+def snapshot_stats() -> list[dict]:
+    with _memo_lock:
+        items = list(_memo.items())
+    return [
+        {"kost_id": k, "intent": i, "tokens": s.tokens, "raw_tokens": s.raw_tokens, "saved": s.saved}
+        for (k, i), (_, s) in sorted(items, key=lambda x: (x[0][0], str(x[0][1])))
+    ]
@@ -0,0 +1,220 @@
+"""
+Jawaban template (tanpa Gemini) buat intent yang isinya cuma lookup data:
+alamat, WA, laundry, skema bayar. Dirender langsung dari context fetch_context,
+jadi nggak makan kuota dan nggak nunggu LLM.
+
+Kebijakan per intent (POLICY, bisa dioverride env):
+  template -> selalu jawab pakai template
+  llm      -> Gemini (template cuma dipakai kalau LLM nggak bisa dipanggil)
+
+  ANSWER_POLICY="harga=template,alamat=llm"
+"""
+
+import os
+from functools import lru_cache
+from typing import Callable, Optional
+
+from app.services import metrics
+from app.services.tenants import DEFAULT_NAME
+
+TEMPLATE = "template"
+LLM = "llm"
+
+# intent tanpa entry di sini = llm
+POLICY: dict[str, str] = {
+    "alamat": TEMPLATE,
+    "kontak": TEMPLATE,
+    "laundry_terdekat": TEMPLATE,
+    "pembayaran": TEMPLATE,
+}
+
+@lru_cache(maxsize=8)
+def _overrides(raw: str) -> dict[str, str]:
+    out = {}
+    for pair in raw.split(","):
+        intent, _, mode = pair.partition("=")
+        if intent.strip() and mode.strip() in (TEMPLATE, LLM):
+            out[intent.strip()] = mode.strip()
+    return out
+
+def policy(intent: Optional[str]) -> str:
+    if intent is None:
+        return LLM
+    mode = _overrides(os.getenv("ANSWER_POLICY", "")).get(intent) or POLICY.get(intent, LLM)
+    # intent yang belum punya renderer nggak bisa dipaksa template
+    return mode if mode == LLM or intent in RENDERERS else LLM
+
+# ---- helper format ----
+
+def rupiah(v) -> str:
+    if v in (None, ""):
+        return "-"
+    return "Rp" + f"{int(v):,}".replace(",", ".")
+
+def jarak(m) -> str:
+    if m in (None, ""):
+        return ""
+    return f"{m / 1000:.1f} km".replace(".", ",") if m >= 1000 else f"{m} m"
+
+def _kost(ctx: dict) -> dict:
+    return ctx.get("kost") or {}
+
+def _name(ctx: dict) -> str:
+    return _kost(ctx).get("name") or DEFAULT_NAME
+
+def _hubungi(ctx: dict) -> str:
+    wa = _kost(ctx).get("whatsapp")
+    return f"Info lebih lanjut bisa hubungi pemilik via WhatsApp {wa} ya." if wa else "Info lebih lanjut bisa tanya langsung ke pemilik kost ya."
+
+def _belum(ctx: dict, what: str) -> str:
+    return f"Maaf, data {what} {_name(ctx)} belum tersedia 🙏\n\n{_hubungi(ctx)}"
+
+# ---- template per intent: fn(ctx) -> str ----
+
+def render_alamat(ctx: dict) -> str:
+    k = _kost(ctx)
+    if not k.get("address") and not k.get("google_maps_url"):
+        return _belum(ctx, "alamat")
+    lines = [f"📍 **{_name(ctx)}**"]
+    if k.get("address"):
+        lines.append(f"Alamat: {k['address']}")
+    if k.get("google_maps_url"):
+        lines.append(f"🗺️ Google Maps: {k['google_maps_url']}")
+    if k.get("visiting_hours"):
+        lines.append(f"🕘 Jam kunjungan: {k['visiting_hours']}")
+    lines += ["", _hubungi(ctx)]
+    return "\n".join(lines)
+
+def render_kontak(ctx: dict) -> str:
+    k = _kost(ctx)
+    if not k.get("whatsapp"):
+        return _belum(ctx, "kontak")
+    lines = [f"💬 WhatsApp pemilik {_name(ctx)}: {k['whatsapp']}"]
+    if k.get("visiting_hours"):
+        lines.append(f"🕘 Jam kunjungan: {k['visiting_hours']}")
+    lines += ["", "Chat aja langsung buat tanya-tanya atau janjian survei 🙂"]
+    return "\n".join(lines)
+
+def render_laundry(ctx: dict) -> str:
+    laundry = ctx.get("nearby_laundry") or []
+    if not laundry:
+        return _belum(ctx, "laundry terdekat")
+    lines = [f"🧺 Laundry terdekat dari {_name(ctx)}:"]
+    for x in laundry:
+        bits = [f"**{x.get('name') or '-'}**", jarak(x.get("distance_m")), x.get("address") or ""]
+        lines.append("- " + " • ".join(b for b in bits if b))
+        if x.get("maps_url"):
+            lines.append(f"  🗺️ {x['maps_url']}")
+        if x.get("note"):
+            lines.append(f"  📝 {x['note']}")
+    return "\n".join(lines)
+
+def render_pembayaran(ctx: dict) -> str:
+    payments = ctx.get("payments") or []
+    if not payments:
+        return _belum(ctx, "skema pembayaran")
+    lines = [f"💳 Skema pembayaran di {_name(ctx)}:"]
+    for p in payments:
+        desc = f": {p['description']}" if p.get("description") else ""
+        lines.append(f"- **{p.get('scheme') or '-'}**{desc}")
+    lines += ["", _hubungi(ctx)]
+    return "\n".join(lines)
+
+def render_kamar(ctx: dict) -> str:
+    rooms = ctx.get("rooms") or []
+    available = [r for r in rooms if r.get("is_available")]
+    if not rooms:
+        return _belum(ctx, "kamar")
+    if not available:
+        return f"Saat ini semua kamar di {_name(ctx)} lagi penuh 🙏\n\n{_hubungi(ctx)}"
+    lines = [f"🏠 Kamar tersedia di {_name(ctx)} ({len(available)} kamar):"]
+    for r in available:
+        lines.append(f"- **{r.get('code') or '-'}** • {rupiah(r.get('price_monthly'))}/bulan")
+    return "\n".join(lines)
+
+def render_harga(ctx: dict) -> str:
+    prices = [r["price_monthly"] for r in ctx.get("rooms") or [] if r.get("price_monthly")]
+    if not prices:
+        return _belum(ctx, "harga kamar")
+    lo, hi = min(prices), max(prices)
+    rentang = rupiah(lo) if lo == hi else f"{rupiah(lo)} – {rupiah(hi)}"
+    return f"💰 Harga sewa kamar di {_name(ctx)}: {rentang} per bulan.\n\n{_hubungi(ctx)}"
+
+RENDERERS: dict[str, Callable[[dict], str]] = {
+    "alamat": render_alamat,
+    "kontak": render_kontak,
+    "laundry_terdekat": render_laundry,
+    "pembayaran": render_pembayaran,
+    # nggak dipakai default (policy llm), tapi bisa dinyalain lewat ANSWER_POLICY
+    # dan jadi jawaban fallback yang lebih rapi waktu kuota habis
+    "kamar_tersedia": render_kamar,
+    "harga": render_harga,
+}
+
+def template_stats() -> dict:
+    return {
+        "answered": metrics.get("answer_source_total", source="template"),
+        "policy": {i: policy(i) for i in RENDERERS},
+    }
+
+def render(intent: Optional[str], ctx: dict) -> Optional[str]:
+    fn = RENDERERS.get(intent)
+    return fn(ctx) if fn else None
+
+def fallback_answer(context: dict, intent: Optional[str] = None) -> str:
+    """
+    Jawaban waktu LLM nggak bisa dipanggil: template intent kalau ada,
+    selain itu ringkasan semua data yang ada di context.
+    """
+    answer = render(intent, context)
+    if answer is not None:
+        return answer
+
+    kost = context.get("kost") or {}
+    rooms = context.get("rooms") or []
+    rules = context.get("rules") or []
+    payments = context.get("payments") or []
+    laundry = context.get("nearby_laundry") or []
+
+    lines = []
+    if kost:
+        lines.append(f"**{kost.get('name', DEFAULT_NAME)}**")
+        if kost.get("address"): lines.append(f"📍 Alamat: {kost['address']}")
+        if kost.get("whatsapp"): lines.append(f"💬 WhatsApp: {kost['whatsapp']}")
+        if kost.get("google_maps_url"): lines.append(f"🗺️ Maps: {kost['google_maps_url']}")
+        if kost.get("visiting_hours"): lines.append(f"🕘 Jam kunjungan: {kost['visiting_hours']}")
+        lines.append("")
+
+    if rooms:
+        lines.append("🏠 **Kamar (ringkas):**")
+        for r in rooms[:6]:
+            code = r.get("code","-")
+            price = r.get("price_monthly") or r.get("price") or ""
+            fac = r.get("facilities") or ""
+            avail = "Tersedia" if r.get("is_available") else "Penuh"
+            lines.append(f"- {code} — {avail} — {price} {('• '+fac) if fac else ''}")
+        lines.append("")
+
+    if rules:
+        lines.append("📌 **Aturan (ringkas):**")
+        for rr in rules[:6]:
+            lines.append(f"- {rr.get('title','-')}: {rr.get('description','')}".strip())
+        lines.append("")
+
+    if payments:
+        lines.append("💳 **Pembayaran:**")
+        for p in payments[:6]:
+            lines.append(f"- {p.get('scheme','-')}: {p.get('description','')}".strip())
+        lines.append("")
+
+    if laundry:
+        lines.append("🧺 **Laundry terdekat:**")
+        for x in laundry[:5]:
+            d = f"{x.get('distance_m')} m" if x.get("distance_m") else ""
+            lines.append(f"- {x.get('name','-')} • {d} • {x.get('address','')}".strip())
+        lines.append("")
+
+    if not lines:
+        return "Quota Gemini lagi habis, dan data kost di database belum tersedia. Isi tabel kost/room dulu ya."
+
+    return "\n".join(lines)
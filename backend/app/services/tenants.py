@@ -0,0 +1,106 @@
+"""
+Multi-kost: satu deployment buat banyak kost (tenant = baris tabel kost).
+
+Urutan resolusi kost_id per request:
+  1. path   /api/kost/{kost_id}/...
+  2. query  ?kost_id= (endpoint public yang udah ada)
+  3. header X-Kost-Id
+  4. host   TENANT_HOSTS="binara.example.com=1,melati.example.com=2"
+  5. default TENANT_DEFAULT_KOST (1)
+
+Tenant bawa nama kost buat system prompt (guardrail/gemini) dan jadi kunci
+partisi cache jawaban, session, dan rate limit Gemini.
+"""
+
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db import get_async_db
+from app.services import versions
+
+DEFAULT_NAME = "Kost Binara"
+
+@dataclass(frozen=True)
+class Tenant:
+    kost_id: int
+    name: str
+
+def default_kost_id() -> int:
+    return int(os.getenv("TENANT_DEFAULT_KOST", "1"))
+
+DEFAULT_TENANT = Tenant(kost_id=default_kost_id(), name=DEFAULT_NAME)
+
+@lru_cache(maxsize=1)
+def _host_map(raw: str) -> dict[str, int]:
+    out = {}
+    for pair in raw.split(","):
+        host, _, kid = pair.partition("=")
+        if host.strip() and kid.strip().isdigit():
+            out[host.strip().lower()] = int(kid)
+    return out
+
+def host_map() -> dict[str, int]:
+    return _host_map(os.getenv("TENANT_HOSTS", ""))
+
+def _as_id(v) -> Optional[int]:
+    try:
+        return int(v) if v not in (None, "") else None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="kost_id tidak valid")
+
+def resolve_kost_id(request: Request, kost_id: Optional[int] = None) -> int:
+    """kost_id dari path/query/header/host (lihat docstring modul), tanpa query DB."""
+    for v in (request.path_params.get("kost_id"), kost_id, request.headers.get("x-kost-id")):
+        kid = _as_id(v)
+        if kid is not None:
+            return kid
+
+    host = (request.headers.get("host") or "").split(":")[0].lower()
+    return host_map().get(host, default_kost_id())
+
+# nama kost per kost_id, dibangun ulang kalau slice "kost" di-bump admin.
+# Cuma kost yang ada yang disimpan (id ngasal dari header/query nggak numpuk),
+# dan tetap dibatasi LRU TENANT_NAME_CACHE.
+_names: OrderedDict[int, tuple[str, str]] = OrderedDict()
+
+def _names_max() -> int:
+    return int(os.getenv("TENANT_NAME_CACHE", "1024"))
+
+def _load_name(db: Session, kost_id: int) -> Optional[str]:
+    row = db.execute(text("SELECT name FROM kost WHERE id = :id LIMIT 1"), {"id": kost_id}).first()
+    return row[0] if row else None
+
+async def get_tenant(db: AsyncSession, kost_id: int) -> Tenant:
+    stamp = versions.stamp(kost_id, ("kost",))
+    item = _names.get(kost_id)
+    if item is not None and item[0] == stamp:
+        _names.move_to_end(kost_id)
+        name = item[1]
+    else:
+        name = await db.run_sync(_load_name, kost_id)
+        if name is not None:
+            _names[kost_id] = (stamp, name)
+            _names.move_to_end(kost_id)
+            while len(_names) > _names_max():
+                _names.popitem(last=False)
+        else:
+            _names.pop(kost_id, None)
+
+    if name is None:
+        # kost default boleh belum ada barisnya (perilaku lama: fallback "Kost Binara")
+        if kost_id == default_kost_id():
+            return DEFAULT_TENANT
+        raise HTTPException(status_code=404, detail="Kost tidak ditemukan")
+    return Tenant(kost_id=kost_id, name=name)
+
+async def current_tenant(request: Request, db: AsyncSession = Depends(get_async_db)) -> Tenant:
+    """Dependency FastAPI buat endpoint chat."""
+    return await get_tenant(db, resolve_kost_id(request))
@@ -0,0 +1,7 @@
+import math
+
+# estimasi kasar ~4 karakter per token (cukup buat bandingin ukuran prompt)
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(s: str) -> int:
+    return math.ceil(len(s) / CHARS_PER_TOKEN) if s else 0
@@ -0,0 +1,36 @@
+"""
+Counter versi data per kost, dinaikin setiap admin nulis ke DB.
+
+Semua cache turunan (context chat, dll) nyimpen versi yang dipakai waktu
+dibangun; kalau versinya udah beda berarti entry itu basi. Ada dua level:
+- per (kost_id, slice): perubahan yang jelas punya kost (room, rule, ...)
+- global per slice: data lintas kost (mis. rename facility ngaruh ke semua room)
+"""
+
+import threading
+from collections import defaultdict
+
+# nama slice = tabel sumber datanya
+SLICES = ("kost", "rooms", "rules", "payments", "nearby")
+
+_lock = threading.Lock()
+_global: dict[str, int] = defaultdict(int)
+_per_kost: dict[tuple[int, str], int] = defaultdict(int)
+
+def bump(kost_id: int, *slices: str) -> None:
+    with _lock:
+        for s in slices:
+            _per_kost[(kost_id, s)] += 1
+
+def bump_all(*slices: str) -> None:
+    with _lock:
+        for s in slices:
+            _global[s] += 1
+
+def current(kost_id: int, slices) -> tuple:
+    with _lock:
+        # .get, bukan [] defaultdict: baca kost_id asal-asalan (query/header) nggak boleh nambah key
+        return tuple((s, _global.get(s, 0), _per_kost.get((kost_id, s), 0)) for s in slices)
+
+def stamp(kost_id: int, slices) -> str:
+    return ".".join(f"{g}-{k}" for _, g, k in current(kost_id, slices))
@@ -0,0 +1,115 @@
+"""
+Benchmark classifier lokal (fallback waktu kuota Gemini habis): pesan/detik
+dan akurasi di set berlabel, sebelum vs sesudah intent_matcher.
+
+  before: local_classify lama (any(k in s) per list, substring polos)
+  after:  guardrail.local_classify di atas intent_matcher (regex tunggal)
+
+  cd backend && python -m bench.classifier_bench --messages 50000
+"""
+
+import time
+import random
+import argparse
+
+from app.services.guardrail import GuardrailResult, local_classify
+
+# (pesan, intent yang benar; None = out of scope)
+LABELED = [
+    ("berapa harga kamar?", "harga"),
+    ("brp hrg kmr nya kak", "harga"),
+    ("Kak, kamar yang kosong masih ada?", "kamar_tersedia"),
+    ("kamarnyaaa masih kosonggg?", "kamar_tersedia"),
+    ("alamat kostnya dimana", "alamat"),
+    ("almt kosan dmn ya", "alamat"),
+    ("nomor wa pemilik?", "kontak"),
+    ("no wa ibu kosnya brp", "kontak"),
+    ("ada wifi sama AC ga di kamarnya?", "fasilitas"),
+    ("kamar mandi dalam ga?", "fasilitas"),
+    ("aturan jam malam gimana", "aturan"),
+    ("boleh nginep tamu ga", "aturan"),
+    ("bayar bulanan bisa?", "pembayaran"),
+    ("bisa tf bulanan?", "pembayaran"),
+    ("laundry terdekat dong", "laundry_terdekat"),
+    ("londri deket mana", "laundry_terdekat"),
+    ("listrik bayar sendiri?", "biaya_tambahan"),
+    ("kost ini putri atau campur?", "tipe_kost"),
+    ("kosan cewe atau cowo?", "tipe_kost"),
+    ("bisa parkir mobil?", "lainnya"),
+    ("kawan aku mau survei dulu", "lainnya"),
+    ("bacaan buat skripsi dong", None),
+    ("bantuin tugas matematika dong", None),
+    ("siapa presiden sekarang", None),
+    ("daerah situ banjir ga", None),
+]
+
+FILLER = ["kak", "min", "dong", "ya", "gan", "sis", "mau tanya", "permisi", "halo", "🙏"]
+
+def legacy_classify(q: str) -> GuardrailResult:
+    # salinan local_classify sebelum intent_matcher
+    s = q.lower()
+    oos = ["politik", "presiden", "drakor", "minecraft", "tugas", "koding", "python",
+           "nextjs", "skripsi", "matematika", "crypto", "game", "film"]
+    if any(k in s for k in oos) or "banjir" in s:
+        return GuardrailResult(in_scope=False, intent="lainnya")
+    for intent, keys in (
+        ("alamat", ["alamat", "lokasi", "jalan", "dimana"]),
+        ("kontak", ["wa", "whatsapp", "kontak", "nomor", "telp", "telepon"]),
+        ("kamar_tersedia", ["kamar", "tersedia", "kosong"]),
+        ("harga", ["harga", "biaya", "sewa", "rp"]),
+        ("fasilitas", ["fasilitas", "ac", "wifi", "kamar mandi", "kasur"]),
+        ("aturan", ["aturan", "peraturan", "jam malam", "tamu", "rokok"]),
+        ("pembayaran", ["bayar", "bulanan", "tahunan", "deposit", "listrik"]),
+        ("laundry_terdekat", ["laundry"]),
+    ):
+        if any(k in s for k in keys):
+            return GuardrailResult(in_scope=True, intent=intent)
+    return GuardrailResult(in_scope=True, intent="lainnya")
+
+def corpus(n: int, seed: int = 7) -> list[str]:
+    # variasi pesan berlabel: filler di depan/belakang + huruf besar acak
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        q, _ = rnd.choice(LABELED)
+        q = f"{rnd.choice(FILLER)} {q} {rnd.choice(FILLER)}"
+        out.append(q.upper() if rnd.random() < 0.1 else q)
+    return out
+
+def accuracy(fn) -> float:
+    ok = 0
+    for q, want in LABELED:
+        g = fn(q)
+        ok += (not g.in_scope) if want is None else (g.in_scope and g.intent == want)
+    return ok / len(LABELED)
+
+def throughput(fn, msgs: list[str]) -> float:
+    fn(msgs[0])  # warm-up
+    t0 = time.perf_counter()
+    for q in msgs:
+        fn(q)
+    return len(msgs) / (time.perf_counter() - t0)
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=50000)
+    args = ap.parse_args()
+
+    msgs = corpus(args.messages)
+    print(f"{args.messages} pesan, {len(LABELED)} contoh berlabel")
+    print(f"{'path':8} {'msg/s':>10} {'akurasi':>8}")
+    rates = {}
+    for name, fn in (("before", legacy_classify), ("after", local_classify)):
+        rates[name] = throughput(fn, msgs)
+        print(f"{name:8} {rates[name]:>10.0f} {accuracy(fn):>8.0%}")
+
+    misses = [(q, want, legacy_classify(q).intent) for q, want in LABELED
+              if legacy_classify(q).intent != (want or "lainnya") or legacy_classify(q).in_scope != (want is not None)]
+    if misses:
+        print("\nsalah di before (dibenerin after kalau akurasinya naik):")
+        for q, want, got in misses:
+            print(f"  {q!r}: {got} (harusnya {want or 'out of scope'})")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
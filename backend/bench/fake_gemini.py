@@ -0,0 +1,101 @@
+"""
+Client Gemini palsu buat benchmark (dipasang lewat app.services.llm.set_client): latency bisa diatur + injeksi 429.
+
+Bentuknya meniru bagian google.genai.Client yang dipakai app:
+  client.models.generate_content(...)
+  client.aio.models.generate_content(...)
+  client.aio.models.generate_content_stream(...)
+"""
+
+import time
+import random
+import asyncio
+from types import SimpleNamespace
+
+from google.genai.errors import ClientError
+
+from app.services.guardrail import local_classify
+from app.services.tokens import estimate_tokens
+
+def quota_error() -> ClientError:
+    # constructor ClientError beda-beda antar versi SDK, jadi dibikin manual
+    e = ClientError.__new__(ClientError)
+    Exception.__init__(e, "429 RESOURCE_EXHAUSTED (fake)")
+    e.code = 429
+    e.status_code = 429
+    e.status = "RESOURCE_EXHAUSTED"
+    e.message = "fake quota exhausted"
+    return e
+
+def usage(contents: str, config: dict, text: str) -> SimpleNamespace:
+    # bentuk usage_metadata SDK; angkanya estimasi ~4 char/token
+    prompt = estimate_tokens(contents) + estimate_tokens(str((config or {}).get("system_instruction") or ""))
+    out = estimate_tokens(text)
+    return SimpleNamespace(prompt_token_count=prompt, candidates_token_count=out,
+                           thoughts_token_count=0, total_token_count=prompt + out)
+
+def user_question(contents: str) -> str:
+    # prompt jawaban nyimpen pertanyaan setelah "USER QUESTION:"
+    if "USER QUESTION:" in contents:
+        return contents.split("USER QUESTION:", 1)[1].split("INSTRUKSI:", 1)[0].strip()
+    return contents
+
+class FakeModels:
+    def __init__(self, owner: "FakeGemini"):
+        self.owner = owner
+
+    def _response(self, contents: str, config: dict):
+        schema = (config or {}).get("response_schema")
+        q = user_question(contents)
+        answer = f"(fake) Jawaban untuk: {q[:60]}"
+        if schema is None:
+            return SimpleNamespace(text=answer, parsed=None, usage_metadata=usage(contents, config, answer))
+
+        g = local_classify(q)
+        fields = {"in_scope": g.in_scope, "intent": g.intent, "answer": answer}
+        parsed = schema(**{k: v for k, v in fields.items() if k in schema.model_fields})
+        text = parsed.model_dump_json()
+        return SimpleNamespace(text=text, parsed=parsed, usage_metadata=usage(contents, config, text))
+
+    def generate_content(self, model: str, contents: str, config: dict = None):
+        self.owner.calls += 1
+        self.owner.maybe_fail()
+        time.sleep(self.owner.sample_latency())
+        return self._response(contents, config)
+
+class FakeAsyncModels(FakeModels):
+    async def generate_content(self, model: str, contents: str, config: dict = None):
+        self.owner.calls += 1
+        self.owner.maybe_fail()
+        await asyncio.sleep(self.owner.sample_latency())
+        return self._response(contents, config)
+
+    async def generate_content_stream(self, model: str, contents: str, config: dict = None):
+        self.owner.calls += 1
+        self.owner.maybe_fail()
+        resp = self._response(contents, config)
+        words = resp.text.split(" ")
+        per_chunk = self.owner.sample_latency() / max(len(words), 1)
+        for i, w in enumerate(words):
+            await asyncio.sleep(per_chunk)
+            # kayak SDK asli: usage_metadata lengkap di chunk terakhir
+            last = i == len(words) - 1
+            yield SimpleNamespace(text=(w if i == 0 else " " + w), usage_metadata=resp.usage_metadata if last else None)
+
+class FakeGemini:
+    def __init__(self, latency_ms: float = 300, jitter_ms: float = 100, rate_429: float = 0.0, seed: int = 7):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.calls = 0
+        self._rnd = random.Random(seed)
+        self.models = FakeModels(self)
+        self.aio = SimpleNamespace(models=FakeAsyncModels(self))
+
+    def sample_latency(self) -> float:
+        ms = self.latency_ms + self._rnd.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(ms, 0) / 1000
+
+    def maybe_fail(self) -> None:
+        if self.rate_429 and self._rnd.random() < self.rate_429:
+            raise quota_error()
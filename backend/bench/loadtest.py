@@ -0,0 +1,184 @@
+"""
+Load test offline: app FastAPI asli + SQLite lokal + Gemini palsu, tanpa jaringan.
+
+  pip install -r requirements.txt -r bench/requirements.txt
+  python -m bench.loadtest --requests 2000 --concurrency 100 --latency-ms 300 --rate-429 0.05
+
+Output: p50/p95/p99 latency + RPS per skenario. --json nyimpen hasil buat
+dibandingin antar commit (regresi).
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from collections import defaultdict
+
+CHAT_MESSAGES = [
+    "berapa harga kamar?",
+    "Kak, kamar yang kosong masih ada?",
+    "alamat kostnya dimana",
+    "nomor wa pemilik?",
+    "ada wifi sama AC ga di kamarnya?",
+    "aturan jam malam gimana",
+    "bayar bulanan bisa?",
+    "laundry terdekat dong",
+    "listrik bayar sendiri?",
+    "kost ini putri atau campur?",
+    "bisa parkir mobil?",
+    "apa kabar min",
+    "bantuin tugas matematika dong",
+]
+
+def percentile(sorted_vals: list[float], p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * p
+    lo, hi = int(k), min(int(k) + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+def setup_app(db_path: str, args):
+    # env harus diset sebelum app.db ke-import
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ.setdefault("ADMIN_TOKEN", "bench-token")
+    os.environ.setdefault("ANSWER_CACHE_BACKEND", args.answer_cache)
+    # baris log usage per chat (services/budget.py) cuma bikin noise di output bench
+    os.environ.setdefault("USAGE_LOG", "0")
+
+    from bench.seed import seed
+    from bench import sqlite_compat
+    from bench.fake_gemini import FakeGemini
+
+    seed(db_path, kosts=args.kosts, rooms=args.rooms)
+
+    from app import db
+    from app.main import app
+    from app.services import llm
+
+    sqlite_compat.install(db.get_engine())
+    sqlite_compat.install(db.get_async_engine().sync_engine)
+
+    fake = FakeGemini(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_429=args.rate_429)
+    llm.set_client(fake)
+    return app, fake
+
+def scenarios(admin_token: str, kosts: int):
+    auth = {"Authorization": f"Bearer {admin_token}"}
+
+    def chat(rnd):
+        # tenant dipilih lewat header, sama kayak frontend multi-kost
+        return "chat", "POST", "/api/chat", {
+            "json": {"session_id": f"s{rnd.randint(1, 500)}", "message": rnd.choice(CHAT_MESSAGES)},
+            "headers": {"X-Kost-Id": str(rnd.randint(1, kosts))},
+        }
+
+    def public(rnd):
+        ep = rnd.choice(["kost", "rooms", "nearby", "rules"])
+        return f"public_{ep}", "GET", f"/api/public/{ep}", {"params": {"kost_id": rnd.randint(1, kosts)}}
+
+    def admin_list(rnd):
+        ep = rnd.choice(["rooms", "rules", "nearby", "facilities"])
+        return f"admin_list_{ep}", "GET", f"/api/admin/{ep}", {"params": {"page": rnd.randint(1, 4)}, "headers": auth}
+
+    def admin_write(rnd):
+        rid = rnd.randint(1, 15)
+        return "admin_update_rule", "PUT", f"/api/admin/rules/{rid}", {
+            "json": {"description": f"diubah {rnd.random():.4f}"}, "headers": auth,
+        }
+
+    # bobot kira-kira traffic produksi: chat + landing page dominan
+    return [(chat, 50), (public, 40), (admin_list, 8), (admin_write, 2)]
+
+async def run(app, args) -> dict:
+    import httpx
+
+    rnd = random.Random(args.seed)
+    picks = scenarios(os.environ["ADMIN_TOKEN"], args.kosts)
+    fns = [f for f, _ in picks]
+    weights = [w for _, w in picks]
+
+    lat: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    sem = asyncio.Semaphore(args.concurrency)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+
+        async def one(i: int):
+            name, method, url, kw = rnd.choices(fns, weights)[0](rnd)
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    r = await client.request(method, url, **kw)
+                    ok = r.status_code < 400
+                except Exception:
+                    ok = False
+                dt = time.perf_counter() - t0
+            lat[name].append(dt)
+            if not ok:
+                errors[name] += 1
+
+        t_start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        wall = time.perf_counter() - t_start
+
+    from app import db
+    from app.services.pool import pool_stats
+    pools = pool_stats()
+    # koneksi aiosqlite yang di-pool punya thread sendiri -> tutup biar proses bisa exit
+    await db.get_async_engine().dispose()
+    db.get_engine().dispose()
+
+    report = {"wall_s": round(wall, 3), "rps": round(args.requests / wall, 1), "db_pool": pools, "endpoints": {}}
+    all_lat = sorted(x for v in lat.values() for x in v)
+    for name, vals in sorted(lat.items()) + [("ALL", all_lat)]:
+        vals = sorted(vals)
+        report["endpoints"][name] = {
+            "n": len(vals),
+            "errors": errors.get(name, 0) if name != "ALL" else sum(errors.values()),
+            "p50_ms": round(percentile(vals, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(vals, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(vals, 0.99) * 1000, 1),
+            "mean_ms": round(statistics.fmean(vals) * 1000, 1) if vals else 0.0,
+        }
+    return report
+
+def print_report(report: dict, llm_calls: int) -> None:
+    print(f"wall {report['wall_s']}s  rps {report['rps']}  gemini calls {llm_calls}  pool {report['db_pool']['profile']}")
+    print(f"{'endpoint':28} {'n':>6} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, r in report["endpoints"].items():
+        print(f"{name:28} {r['n']:>6} {r['errors']:>5} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}")
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default="/tmp/binara-bench.sqlite3")
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--kosts", type=int, default=1)
+    ap.add_argument("--rooms", type=int, default=40)
+    ap.add_argument("--latency-ms", type=float, default=300)
+    ap.add_argument("--jitter-ms", type=float, default=100)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--answer-cache", default="memory", choices=["memory", "sqlite", "off"])
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", help="tulis hasil ke file JSON")
+    args = ap.parse_args(argv)
+
+    app, fake = setup_app(args.db, args)
+    report = asyncio.run(run(app, args))
+    report["gemini_calls"] = fake.calls
+    report["args"] = vars(args)
+
+    print_report(report, fake.calls)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
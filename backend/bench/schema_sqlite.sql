@@ -0,0 +1,62 @@
+-- Skema lokal buat bench/ (SQLite), meniru tabel MySQL produksi.
+CREATE TABLE IF NOT EXISTS kost (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL,
+  address TEXT NOT NULL DEFAULT '',
+  whatsapp TEXT NOT NULL DEFAULT '',
+  google_maps_url TEXT NOT NULL DEFAULT '',
+  visiting_hours TEXT NOT NULL DEFAULT ''
+);
+
+CREATE TABLE IF NOT EXISTS facility (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS room (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  kost_id INTEGER NOT NULL REFERENCES kost(id),
+  code TEXT NOT NULL,
+  price_monthly INTEGER,
+  deposit INTEGER,
+  electricity_included INTEGER NOT NULL DEFAULT 0,
+  electricity_note TEXT NOT NULL DEFAULT '',
+  size_m2 REAL,
+  is_available INTEGER NOT NULL DEFAULT 1,
+  notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ix_room_kost ON room (kost_id, is_available, id);
+
+CREATE TABLE IF NOT EXISTS room_facility (
+  room_id INTEGER NOT NULL REFERENCES room(id),
+  facility_id INTEGER NOT NULL REFERENCES facility(id),
+  PRIMARY KEY (room_id, facility_id)
+);
+
+CREATE TABLE IF NOT EXISTS rule (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  kost_id INTEGER NOT NULL REFERENCES kost(id),
+  title TEXT NOT NULL,
+  description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_rule_kost ON rule (kost_id, id);
+
+CREATE TABLE IF NOT EXISTS payment_scheme (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  kost_id INTEGER NOT NULL REFERENCES kost(id),
+  scheme TEXT NOT NULL,
+  description TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ix_payment_kost ON payment_scheme (kost_id);
+
+CREATE TABLE IF NOT EXISTS nearby_place (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  kost_id INTEGER NOT NULL REFERENCES kost(id),
+  category TEXT NOT NULL,
+  name TEXT NOT NULL,
+  address TEXT NOT NULL DEFAULT '',
+  distance_m INTEGER,
+  maps_url TEXT NOT NULL DEFAULT '',
+  note TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ix_nearby_kost_cat ON nearby_place (kost_id, category, distance_m);
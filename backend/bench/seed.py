@@ -0,0 +1,74 @@
+"""
+Bikin + isi database SQLite lokal buat benchmark.
+
+  python -m bench.seed --db /tmp/binara-bench.sqlite3 --kosts 3 --rooms 80
+"""
+
+import os
+import random
+import sqlite3
+import argparse
+
+SCHEMA = os.path.join(os.path.dirname(__file__), "schema_sqlite.sql")
+
+FACILITIES = ["AC", "Kasur", "Lemari", "Meja belajar", "WiFi", "Kamar mandi dalam", "Kipas", "Water heater", "TV", "Jendela"]
+CATEGORIES = ["laundry", "minimarket", "makan", "transport", "lainnya"]
+
+def seed(path: str, kosts: int = 1, rooms: int = 40, seed_value: int = 42) -> None:
+    rnd = random.Random(seed_value)
+    if os.path.exists(path):
+        os.remove(path)
+
+    conn = sqlite3.connect(path)
+    with open(SCHEMA) as f:
+        conn.executescript(f.read())
+
+    conn.executemany("INSERT INTO facility (name) VALUES (?)", [(n,) for n in FACILITIES])
+
+    for k in range(1, kosts + 1):
+        conn.execute(
+            "INSERT INTO kost (id, name, address, whatsapp, google_maps_url, visiting_hours) VALUES (?, ?, ?, ?, ?, ?)",
+            (k, f"Kost Binara {k}", f"Jl. Contoh No. {k}, Bandung", f"08123456{k:04d}",
+             f"https://maps.example/{k}", "08.00 - 21.00"),
+        )
+        for r in range(rooms):
+            cur = conn.execute(
+                """INSERT INTO room (kost_id, code, price_monthly, deposit, electricity_included,
+                                     electricity_note, size_m2, is_available, notes)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (k, f"{chr(65 + r // 20)}{r % 20 + 1}", rnd.choice([1200000, 1500000, 1800000]),
+                 500000, rnd.randint(0, 1), "token sendiri", rnd.choice([9.0, 12.0, 16.0]),
+                 rnd.randint(0, 1), ""),
+            )
+            fids = rnd.sample(range(1, len(FACILITIES) + 1), rnd.randint(2, 6))
+            conn.executemany(
+                "INSERT INTO room_facility (room_id, facility_id) VALUES (?, ?)",
+                [(cur.lastrowid, fid) for fid in fids],
+            )
+
+        conn.executemany(
+            "INSERT INTO rule (kost_id, title, description) VALUES (?, ?, ?)",
+            [(k, f"Aturan {i}", f"Deskripsi aturan nomor {i} untuk penghuni.") for i in range(1, 16)],
+        )
+        conn.executemany(
+            "INSERT INTO payment_scheme (kost_id, scheme, description) VALUES (?, ?, ?)",
+            [(k, "Bulanan", "Bayar tiap tanggal 5"), (k, "Tahunan", "Diskon 1 bulan")],
+        )
+        conn.executemany(
+            """INSERT INTO nearby_place (kost_id, category, name, address, distance_m, maps_url, note)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            [(k, c, f"{c.title()} {i}", f"Jl. Dekat {i}", rnd.choice([None, 50, 120, 300, 800]), "", "")
+             for c in CATEGORIES for i in range(1, 7)],
+        )
+
+    conn.commit()
+    conn.close()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default="/tmp/binara-bench.sqlite3")
+    ap.add_argument("--kosts", type=int, default=1)
+    ap.add_argument("--rooms", type=int, default=40)
+    a = ap.parse_args()
+    seed(a.db, a.kosts, a.rooms)
+    print(f"seeded {a.db}")
@@ -0,0 +1,96 @@
+"""
+Microbenchmark serialisasi list endpoint: biaya per row, sebelum vs sesudah.
+
+  before: {k: json_safe(v) ...} per row -> jsonable_encoder -> json.dumps
+          (jalur lama: endpoint return dict, FastAPI encode ulang)
+  after:  serialize.dumps() langsung di atas RowMapping (ORJSONResponse)
+
+Row diambil beneran dari SQLAlchemy (SQLite in-memory) dengan tipe yang sama
+kayak MySQL: Decimal (size_m2), datetime, bool, NULL.
+
+  cd backend && python -m bench.serialize_bench --rows 2000 --repeat 20
+"""
+
+import json
+import time
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, text, Numeric, DateTime, Boolean
+
+from app.services.serialize import dumps
+
+def load_rows(n: int):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE room (
+              id INTEGER PRIMARY KEY, kost_id INTEGER, code TEXT, price_monthly INTEGER,
+              deposit INTEGER, electricity_included INTEGER, electricity_note TEXT,
+              size_m2 NUMERIC, is_available INTEGER, notes TEXT, updated_at TIMESTAMP
+            )
+        """))
+        t0 = datetime(2025, 1, 1, 8, 0, 0)
+        conn.execute(
+            text("INSERT INTO room VALUES (:id, 1, :code, :price, :dep, :el, :eln, :size, :av, :notes, :upd)"),
+            [
+                {
+                    "id": i, "code": f"A{i:04d}", "price": 900000 + i * 1000, "dep": None if i % 3 else 500000,
+                    "el": i % 2, "eln": "token listrik" if i % 2 else "", "size": f"{9 + i % 7}.50",
+                    "av": i % 4 != 0, "notes": "dekat tangga, jendela ke timur", "upd": t0 + timedelta(minutes=i),
+                }
+                for i in range(1, n + 1)
+            ],
+        )
+    with engine.connect() as conn:
+        stmt = text("SELECT * FROM room ORDER BY id").columns(
+            size_m2=Numeric(6, 2, asdecimal=True), updated_at=DateTime(), is_available=Boolean(),
+        )
+        return conn.execute(stmt).mappings().all()
+
+def json_safe(v):
+    # salinan jalur lama (serialize.json_safe sebelum orjson)
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return v
+
+def before(rows) -> bytes:
+    content = {"items": [{k: json_safe(v) for k, v in dict(r).items()} for r in rows], "page": 1}
+    encoded = jsonable_encoder(content)
+    return json.dumps(encoded, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def after(rows) -> bytes:
+    return dumps({"items": rows, "page": 1})
+
+def bench(fn, rows, repeat: int) -> list[float]:
+    fn(rows)  # warm-up
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(rows)
+        out.append(time.perf_counter() - t0)
+    return out
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    rows = load_rows(args.rows)
+    assert json.loads(before(rows)) == json.loads(after(rows)), "output before/after beda"
+
+    print(f"{args.rows} row x {args.repeat} repeat")
+    print(f"{'path':8} {'median ms':>10} {'us/row':>8}")
+    medians = {}
+    for name, fn in (("before", before), ("after", after)):
+        med = statistics.median(bench(fn, rows, args.repeat))
+        medians[name] = med
+        print(f"{name:8} {med * 1000:>10.2f} {med / args.rows * 1e6:>8.2f}")
+    print(f"speedup  {medians['before'] / medians['after']:.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,24 @@
+"""
+Shim dialek: SQL di app ditulis buat MySQL, di sini ditulis ulang seperlunya
+biar jalan di SQLite. Cuma dipakai bench/, bukan kode produksi.
+"""
+
+import re
+from sqlalchemy import event
+
+REWRITES = [
+    (re.compile(r"LAST_INSERT_ID\(\)", re.I), "last_insert_rowid()"),
+    # SQLite (build default) nggak support UPDATE/DELETE ... LIMIT
+    (re.compile(r"^(\s*(?:UPDATE|DELETE)\b.*?)\s+LIMIT\s+1\s*$", re.I | re.S), r"\1"),
+    (re.compile(r"GROUP_CONCAT\(([^)]*?)\s+SEPARATOR\s+('[^']*')\)", re.I), r"GROUP_CONCAT(\1, \2)"),
+]
+
+def rewrite(statement: str) -> str:
+    for pattern, repl in REWRITES:
+        statement = pattern.sub(repl, statement)
+    return statement
+
+def install(engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _rewrite(conn, cursor, statement, parameters, context, executemany):
+        return rewrite(statement), parameters
@@ -0,0 +1,43 @@
+"""
+Env Alembic: pakai engine yang sama dengan app (app/db.py), jadi TLS Aiven
+dan DATABASE_URL ikut kepakai tanpa konfigurasi dobel.
+"""
+
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from dotenv import load_dotenv
+
+if not os.getenv("VERCEL"):
+    load_dotenv()
+
+from app.db import get_engine  # noqa: E402 (butuh env dari .env dulu)
+
+engine = get_engine()
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# skema ditulis manual di versions/ (app nggak punya ORM model)
+target_metadata = None
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
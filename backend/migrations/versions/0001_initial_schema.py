@@ -0,0 +1,89 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Tabel yang dipakai app/main.py & services. DB produksi yang udah jalan
+sebelum ada migrasi: tabel yang udah ada di-skip (CREATE ... IF NOT EXISTS),
+jadi cukup `alembic upgrade head` tanpa stamp manual.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+NEARBY_CATEGORIES = ("laundry", "minimarket", "makan", "transport", "lainnya")
+
+def _create(name: str, *columns, **kw) -> None:
+    # mode offline (--sql) nggak punya koneksi buat inspect
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table(name):
+        return
+    op.create_table(name, *columns, mysql_engine="InnoDB", mysql_charset="utf8mb4", **kw)
+
+def upgrade() -> None:
+    _create(
+        "kost",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(120), nullable=False),
+        sa.Column("address", sa.String(255), nullable=False, server_default=""),
+        sa.Column("whatsapp", sa.String(30), nullable=False, server_default=""),
+        sa.Column("google_maps_url", sa.String(500), nullable=False, server_default=""),
+        sa.Column("visiting_hours", sa.String(120), nullable=False, server_default=""),
+    )
+    _create(
+        "facility",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(120), nullable=False),
+    )
+    _create(
+        "room",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("kost_id", sa.Integer, sa.ForeignKey("kost.id"), nullable=False),
+        sa.Column("code", sa.String(30), nullable=False),
+        sa.Column("price_monthly", sa.Integer, nullable=True),
+        sa.Column("deposit", sa.Integer, nullable=True),
+        sa.Column("electricity_included", sa.Boolean, nullable=False, server_default=sa.false()),
+        sa.Column("electricity_note", sa.String(255), nullable=False, server_default=""),
+        sa.Column("size_m2", sa.Numeric(6, 2), nullable=True),
+        sa.Column("is_available", sa.Boolean, nullable=False, server_default=sa.true()),
+        sa.Column("notes", sa.Text, nullable=True),
+    )
+    _create(
+        "room_facility",
+        sa.Column("room_id", sa.Integer, sa.ForeignKey("room.id"), primary_key=True),
+        sa.Column("facility_id", sa.Integer, sa.ForeignKey("facility.id"), primary_key=True),
+    )
+    _create(
+        "rule",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("kost_id", sa.Integer, sa.ForeignKey("kost.id"), nullable=False),
+        sa.Column("title", sa.String(120), nullable=False),
+        sa.Column("description", sa.Text, nullable=False),
+    )
+    _create(
+        "payment_scheme",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("kost_id", sa.Integer, sa.ForeignKey("kost.id"), nullable=False),
+        sa.Column("scheme", sa.String(60), nullable=False),
+        sa.Column("description", sa.Text, nullable=True),
+    )
+    _create(
+        "nearby_place",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("kost_id", sa.Integer, sa.ForeignKey("kost.id"), nullable=False),
+        sa.Column("category", sa.Enum(*NEARBY_CATEGORIES, name="nearby_category"), nullable=False),
+        sa.Column("name", sa.String(160), nullable=False),
+        sa.Column("address", sa.String(255), nullable=False, server_default=""),
+        sa.Column("distance_m", sa.Integer, nullable=True),
+        sa.Column("maps_url", sa.String(500), nullable=False, server_default=""),
+        sa.Column("note", sa.String(255), nullable=False, server_default=""),
+    )
+
+def downgrade() -> None:
+    for name in ("nearby_place", "payment_scheme", "rule", "room_facility", "room", "facility", "kost"):
+        op.drop_table(name)
@@ -0,0 +1,67 @@
+"""hot path indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Index komposit buat query panas (answer.py, services/public.py, admin list
++ keyset cursor). Urutan kolom ngikutin WHERE lalu ORDER BY, jadi MySQL bisa
+baca range index tanpa full scan / filesort. scripts/explain_check.py ngecek ini.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (nama, tabel, kolom) -- sa.text dipakai buat functional key part / DESC (MySQL 8.0.13+)
+INDEXES = [
+    # admin facilities: ORDER BY name, id (+ cursor)
+    ("ix_facility_name_id", "facility", ["name", "id"]),
+    # public/admin rooms: WHERE kost_id ORDER BY is_available DESC, id DESC (backward scan)
+    ("ix_room_kost_avail_id", "room", ["kost_id", "is_available", "id"]),
+    # delete facility: cek FK room_facility.facility_id (room_id udah dicover PK)
+    ("ix_room_facility_facility", "room_facility", ["facility_id", "room_id"]),
+    # answer/public/admin rules: WHERE kost_id ORDER BY id
+    ("ix_rule_kost_id", "rule", ["kost_id", "id"]),
+    # answer payments: WHERE kost_id
+    ("ix_payment_scheme_kost", "payment_scheme", ["kost_id"]),
+    # answer laundry: WHERE kost_id AND category='laundry' ORDER BY distance_m
+    ("ix_nearby_kost_cat_dist", "nearby_place", ["kost_id", "category", "distance_m"]),
+    # public/admin nearby: ORDER BY category, COALESCE(distance_m, 999999), id DESC
+    (
+        "ix_nearby_kost_cat_coalesce_id",
+        "nearby_place",
+        ["kost_id", "category", sa.text("(COALESCE(distance_m, 999999))"), sa.text("id DESC")],
+    ),
+]
+
+def _existing(table: str) -> set[str]:
+    if op.get_context().as_sql:
+        return set()
+    bind = op.get_bind()
+    if bind.dialect.name == "mysql":
+        # inspector MySQL nge-skip functional index, jadi baca langsung dari information_schema
+        rows = bind.execute(
+            sa.text("""
+                SELECT DISTINCT index_name FROM information_schema.statistics
+                WHERE table_schema = DATABASE() AND table_name = :t
+            """),
+            {"t": table},
+        ).scalars().all()
+        return set(rows)
+    return {ix["name"] for ix in sa.inspect(bind).get_indexes(table)}
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        if name in _existing(table):
+            continue
+        op.create_index(name, table, columns)
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        if op.get_context().as_sql or name in _existing(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,98 @@
+"""
+Cek EXPLAIN buat query panas: gagal (exit 1) kalau ada yang full table scan.
+
+    cd backend && python -m scripts.explain_check
+
+Pakai DATABASE_URL yang sama dengan app. Jalanin setelah `alembic upgrade head`.
+MySQL: gagal kalau ada baris EXPLAIN dengan type = ALL.
+SQLite (bench/): gagal kalau plan-nya "SCAN <tabel>" tanpa index.
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+if not os.getenv("VERCEL"):
+    load_dotenv()
+
+from app.db import get_engine  # noqa: E402
+
+KOST = {"kost_id": 1}
+
+# (nama, sql, params) -- disalin dari answer.py / services/rooms.py / services/public.py / admin list
+HOT_QUERIES = [
+    ("kost", "SELECT * FROM kost WHERE id = :kost_id", KOST),
+    ("answer.rooms", """
+        SELECT r.* FROM room r WHERE r.kost_id = :kost_id
+        ORDER BY r.is_available DESC, r.code ASC
+    """, KOST),
+    ("answer.rules", "SELECT title, description FROM rule WHERE kost_id = :kost_id", KOST),
+    ("answer.payments", "SELECT scheme, description FROM payment_scheme WHERE kost_id = :kost_id", KOST),
+    ("answer.laundry", """
+        SELECT name, address, distance_m, maps_url, note FROM nearby_place
+        WHERE kost_id = :kost_id AND category = 'laundry'
+        ORDER BY (distance_m IS NULL), distance_m ASC LIMIT 5
+    """, KOST),
+    ("room_facilities", """
+        SELECT rf.room_id, f.id, f.name FROM room_facility rf
+        JOIN facility f ON f.id = rf.facility_id
+        WHERE rf.room_id IN (1, 2, 3) ORDER BY f.name ASC
+    """, {}),
+    ("public.rooms", """
+        SELECT id, code, is_available FROM room WHERE kost_id = :kost_id
+        ORDER BY is_available DESC, id DESC
+    """, KOST),
+    ("public.nearby", """
+        SELECT id, category, name, distance_m FROM nearby_place WHERE kost_id = :kost_id
+        ORDER BY category ASC, COALESCE(distance_m, 999999) ASC, id DESC
+    """, KOST),
+    ("public.rules", "SELECT id, title FROM rule WHERE kost_id = :kost_id ORDER BY id ASC", KOST),
+    ("admin.facilities", "SELECT id, name FROM facility ORDER BY name ASC, id ASC LIMIT 10", {}),
+    ("admin.rooms.cursor", """
+        SELECT id, code FROM room
+        WHERE kost_id = :kost_id AND (is_available < 1 OR (is_available = 1 AND id < 100))
+        ORDER BY is_available DESC, id DESC LIMIT 11
+    """, KOST),
+    ("admin.rules.cursor", """
+        SELECT id, title FROM rule WHERE kost_id = :kost_id AND id > 10 ORDER BY id ASC LIMIT 11
+    """, KOST),
+]
+
+def explain_mysql(conn, q: str, params: dict) -> list[str]:
+    rows = conn.execute(text(f"EXPLAIN {q}"), params).mappings().all()
+    bad = []
+    for r in rows:
+        if (r.get("type") or "").upper() == "ALL":
+            bad.append(f"type=ALL on {r.get('table')} (possible_keys={r.get('possible_keys')})")
+    return bad
+
+def explain_sqlite(conn, q: str, params: dict) -> list[str]:
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {q}"), params).all()
+    bad = []
+    for r in rows:
+        detail = r[-1]
+        if detail.startswith("SCAN ") and "INDEX" not in detail:
+            bad.append(detail)
+    return bad
+
+def main() -> int:
+    engine = get_engine()
+    explain = explain_mysql if engine.dialect.name == "mysql" else explain_sqlite
+    failed = 0
+    with engine.connect() as conn:
+        for name, q, params in HOT_QUERIES:
+            bad = explain(conn, q, params)
+            status = "FULL SCAN" if bad else "ok"
+            print(f"{name:<22} {status}")
+            for b in bad:
+                print(f"    {b}")
+            failed += bool(bad)
+    if failed:
+        print(f"\n{failed} query masih full scan -- cek index di migrations/versions/")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
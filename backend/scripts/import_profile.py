@@ -0,0 +1,91 @@
+"""
+Profil import-time cold start (`python -X importtime -c "import app.main"`).
+
+    cd backend && python -m scripts.import_profile --runs 5 --json import-profile.json
+
+Tiap run pakai interpreter baru (kayak cold start Vercel). Laporannya: median
+total import app.main, modul top-level paling mahal, dan modul berat yang
+harusnya lazy (google.genai dkk) -- kalau ada yang ke-import, ditandai.
+Simpan --json per rilis buat dibandingin; --max-ms bikin exit 1 kalau lewat batas.
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# modul yang cuma boleh ke-import waktu call pertama, bukan waktu cold start
+LAZY_MODULES = ["google.genai", "aiomysql"]
+
+def run_once(target: str) -> list[tuple[str, int, int, int]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND, env=dict(os.environ), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {target} gagal:\n{proc.stderr[-2000:]}")
+
+    # format: "import time: self [us] | cumulative | imported package"
+    # kedalaman import = indent nama (2 spasi per level)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, raw = line[len("import time:"):].split("|")
+        name = raw.strip()
+        depth = (len(raw) - len(raw.lstrip()) - 1) // 2
+        rows.append((name, depth, int(self_us), int(cum_us)))
+    return rows
+
+def summarize(rows: list[tuple[str, int, int, int]], target: str, top: int) -> dict:
+    cum = {name: c for name, _, _, c in rows}
+    # import langsung dari target (depth 1) -- ini yang nyusun total cold start
+    direct = sorted(((n, c) for n, d, _, c in rows if d == 1), key=lambda x: -x[1])
+    heaviest = sorted(((n, s) for n, _, s, _ in rows), key=lambda x: -x[1])
+    return {
+        "total_ms": round(cum.get(target, 0) / 1000, 1),
+        "modules": len(rows),
+        "direct_imports": [{"module": n, "ms": round(c / 1000, 1)} for n, c in direct[:top]],
+        "heaviest_self": [{"module": n, "ms": round(s / 1000, 1)} for n, s in heaviest[:top]],
+        "lazy_violations": [m for m in LAZY_MODULES if m in cum],
+    }
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Profil import-time cold start backend")
+    ap.add_argument("--target", default="app.main")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--json", help="simpan laporan ke file (buat dibandingin antar rilis)")
+    ap.add_argument("--max-ms", type=float, help="exit 1 kalau median total lebih dari ini")
+    args = ap.parse_args()
+
+    reports = [summarize(run_once(args.target), args.target, args.top) for _ in range(args.runs)]
+    totals = [r["total_ms"] for r in reports]
+    report = {**reports[-1], "target": args.target, "runs": totals, "median_ms": statistics.median(totals)}
+
+    print(f"import {args.target}: median {report['median_ms']} ms  (runs: {totals}, {report['modules']} modul)")
+    print(f"\nimport langsung dari {args.target} (cumulative):")
+    for r in report["direct_imports"]:
+        print(f"  {r['ms']:>8.1f} ms  {r['module']}")
+    print("\nself time terbesar:")
+    for r in report["heaviest_self"]:
+        print(f"  {r['ms']:>8.1f} ms  {r['module']}")
+    if report["lazy_violations"]:
+        print(f"\n!! modul lazy ke-import waktu cold start: {', '.join(report['lazy_violations'])}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+    failed = bool(report["lazy_violations"])
+    if args.max_ms is not None and report["median_ms"] > args.max_ms:
+        print(f"\n!! median {report['median_ms']} ms > batas {args.max_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
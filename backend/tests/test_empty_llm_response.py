@@ -0,0 +1,41 @@
+"""Respon Gemini kosong (kepotong MAX_TOKENS) harus jatuh ke fallback lokal, bukan 500 / repr objek."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import llm, guardrail, gemini
+
+TRUNCATED = SimpleNamespace(
+    text=None, parsed=None, usage_metadata=None,
+    candidates=[SimpleNamespace(finish_reason="FinishReason.MAX_TOKENS")],
+)
+
+class TruncatedModels:
+    async def generate_content(self, **kw):
+        return TRUNCATED
+
+@pytest.fixture(autouse=True)
+def truncated_client(monkeypatch):
+    monkeypatch.setattr(llm, "breaker", llm.CircuitBreaker(failures=3, cooldown=30))
+    monkeypatch.setattr(llm, "limiter", llm.RateLimiter(rpm=1000, tpm=1e9))
+    monkeypatch.setattr(llm, "_client", SimpleNamespace(aio=SimpleNamespace(models=TruncatedModels())))
+
+def test_classify_falls_back_to_local():
+    g = asyncio.run(guardrail.classify("kost ini enak nggak sih?"))
+    assert isinstance(g, guardrail.GuardrailResult)
+    assert g == guardrail.local_classify("kost ini enak nggak sih?")
+
+def test_generate_answer_uses_fallback_answer():
+    ctx = {"rooms": [{"code": "A1", "price_monthly": 900000, "is_available": 1}]}
+    answer = asyncio.run(gemini.generate_answer("berapa harga kamar?", ctx, intent="harga"))
+    assert "namespace" not in answer
+    assert answer == gemini.fallback_answer(ctx, "harga")
+
+def test_output_cap_only_with_thinking_budget(monkeypatch):
+    from app.services import budget
+    monkeypatch.delenv("GEMINI_THINKING_BUDGET", raising=False)
+    assert budget.classify_config() == {}
+    monkeypatch.setenv("GEMINI_THINKING_BUDGET", "0")
+    assert budget.classify_config() == {"max_output_tokens": 64, "thinking_config": {"thinking_budget": 0}}
@@ -0,0 +1,51 @@
+"""Probe half-open yang batal di tengah jalan harus ngelepas slot probe-nya."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import llm
+
+class SlowModels:
+    async def generate_content(self, **kw):
+        await asyncio.sleep(10)
+
+    async def generate_content_stream(self, **kw):
+        async def gen():
+            for _ in range(3):
+                yield SimpleNamespace(text="x", usage_metadata=None)
+                await asyncio.sleep(0)
+        return gen()
+
+@pytest.fixture
+def half_open(monkeypatch):
+    b = llm.CircuitBreaker(failures=1, cooldown=0)
+    b.record_failure()  # open, cooldown 0 -> call berikutnya jadi probe
+    monkeypatch.setattr(llm, "breaker", b)
+    monkeypatch.setattr(llm, "limiter", llm.RateLimiter(rpm=1000, tpm=1e9))
+    monkeypatch.setattr(llm, "_client", SimpleNamespace(aio=SimpleNamespace(models=SlowModels())))
+    return b
+
+def test_cancelled_probe_releases_breaker(half_open):
+    async def run():
+        task = asyncio.ensure_future(llm.generate("halo", {}))
+        await asyncio.sleep(0.01)
+        assert half_open.state == llm.HALF_OPEN and half_open.probing
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert not half_open.probing
+    assert half_open.allow()
+
+def test_abandoned_stream_probe_releases_breaker(half_open):
+    async def run():
+        stream = llm.generate_stream("halo", {})
+        await stream.__anext__()
+        await stream.aclose()  # consumer berhenti sebelum stream habis
+
+    asyncio.run(run())
+    assert not half_open.probing
+    assert half_open.allow()
@@ -0,0 +1,35 @@
+"""Keyword out-of-scope yang nempel di pertanyaan kost nggak boleh ditolak lokal."""
+
+import pytest
+
+from app.services.guardrail import local_classify
+from app.services.router import route_local
+
+KOST_WITH_OOS_WORD = [
+    "boleh nonton film di kamar?",
+    "boleh main game sampai malam?",
+    "ada tempat buat ngerjain tugas?",
+]
+
+PURE_OOS = [
+    "bantuin tugas matematika dong",
+    "siapa presiden sekarang",
+]
+
+@pytest.mark.parametrize("q", KOST_WITH_OOS_WORD)
+def test_mixed_oos_goes_to_llm(q):
+    assert route_local(q) is None
+
+@pytest.mark.parametrize("q", KOST_WITH_OOS_WORD)
+def test_mixed_oos_fallback_stays_in_scope(q):
+    assert local_classify(q).in_scope
+
+@pytest.mark.parametrize("q", PURE_OOS)
+def test_pure_oos_rejected_locally(q):
+    g = route_local(q)
+    assert g is not None and not g.in_scope
+    assert not local_classify(q).in_scope
+
+def test_plain_kost_question_stays_local():
+    g = route_local("berapa harga kamar?")
+    assert g is not None and g.in_scope and g.intent == "harga"
@@ -109,26 +109,60 @@ export default function Page() {
     setLoading(true);
 
     try {
-      const res = await fetch(`${apiBase}/api/chat`, {
+      const res = await fetch(`${apiBase}/api/chat/stream`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ session_id: sessionId, message: text }),
       });
 
-      if (!res.ok) {
+      if (!res.ok || !res.body) {
         const errText = await res.text().catch(() => "");
         throw new Error(`Backend error ${res.status}: ${errText || "No body"}`);
       }
 
-      const data = await res.json();
-      setMsgs((m) => [
-        ...m,
-        {
-          role: "bot",
-          text: data.answer ?? "(Jawaban kosong)",
-          ts: Date.now(),
-        },
-      ]);
+      // bubble bot kosong, diisi token demi token dari SSE
+      let started = false;
+      const appendText = (piece: string) => {
+        if (!started) {
+          started = true;
+          setLoading(false);
+          setMsgs((m) => [...m, { role: "bot", text: piece, ts: Date.now() }]);
+          return;
+        }
+        setMsgs((m) => {
+          const last = m[m.length - 1];
+          return [...m.slice(0, -1), { ...last, text: last.text + piece }];
+        });
+      };
+
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buf = "";
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buf += decoder.decode(value, { stream: true });
+
+        // event SSE dipisah baris kosong
+        let idx;
+        while ((idx = buf.indexOf("\n\n")) >= 0) {
+          const raw = buf.slice(0, idx);
+          buf = buf.slice(idx + 2);
+
+          let event = "message";
+          let data = "";
+          for (const line of raw.split("\n")) {
+            if (line.startsWith("event:")) event = line.slice(6).trim();
+            else if (line.startsWith("data:")) data += line.slice(5).trim();
+          }
+          if (event === "token" && data) {
+            appendText(JSON.parse(data).text ?? "");
+          }
+        }
+      }
+
+      if (!started) appendText("(Jawaban kosong)");
     } catch (e: any) {
       setMsgs((m) => [
         ...m,
@@ -188,7 +188,7 @@ export default function Home() {
       try {
         // 1) info kost
         const kostRes = await fetch(`${apiBase}/api/public/kost`, {
-          cache: "no-store",
+          cache: "no-cache", // revalidate pakai ETag -> 304 kalau data belum berubah
         });
         const kostJson = kostRes.ok ? await kostRes.json() : null;
 
@@ -196,7 +196,7 @@ export default function Home() {
         let roomsJson: Room[] = [];
         try {
           const roomRes = await fetch(`${apiBase}/api/public/rooms`, {
-            cache: "no-store",
+            cache: "no-cache", // revalidate pakai ETag -> 304 kalau data belum berubah
           });
           if (roomRes.ok) roomsJson = await roomRes.json();
         } catch {}